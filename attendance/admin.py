@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Attendance
+from .models import Attendance, AttendanceDailyRollup, EmployeeMonthlyRollup
 
 # Attendance admin
 @admin.register(Attendance)
@@ -29,10 +29,39 @@ class AttendanceAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_hours_worked()
+
     # Displays hours worked
     def hours_worked_display(self, obj):
         hours = obj.hours_worked
         if hours is not None:
             return f"{hours:.2f} hours"
         return "-"
-    hours_worked_display.short_description = 'Hours Worked'
\ No newline at end of file
+    hours_worked_display.short_description = 'Hours Worked'
+    hours_worked_display.admin_order_field = 'hours_worked'
+
+
+# Read-only views of the attendance rollups
+@admin.register(AttendanceDailyRollup)
+class AttendanceDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'department', 'status', 'count']
+    list_filter = ['status', 'department']
+    ordering = ['-date', 'department__name', 'status']
+    date_hierarchy = 'date'
+    readonly_fields = ['date', 'department', 'status', 'count']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(EmployeeMonthlyRollup)
+class EmployeeMonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ['employee', 'month', 'status', 'count']
+    list_filter = ['status', 'month']
+    search_fields = ['employee__first_name', 'employee__last_name', 'employee__employee_id']
+    ordering = ['-month', 'employee__last_name', 'status']
+    readonly_fields = ['employee', 'month', 'status', 'count']
+
+    def has_add_permission(self, request):
+        return False
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class AttendanceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "attendance"
\ No newline at end of file
+    name = "attendance"
+
+    def ready(self):
+        # Registers the rollup maintenance signal handlers
+        from . import signals  # noqa: F401
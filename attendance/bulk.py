@@ -0,0 +1,123 @@
+from django.db import transaction
+from rest_framework import serializers
+from employees.models import Employee
+from .models import Attendance
+from .serializers import AttendanceBulkRowSerializer
+
+# Largest batch accepted by one request
+MAX_BATCH_ROWS = 10000
+
+# Rows per INSERT statement
+INSERT_BATCH_SIZE = 1000
+
+# Columns overwritten when an upsert hits an existing (employee, date)
+UPSERT_FIELDS = ['status', 'check_in_time', 'check_out_time', 'notes', 'updated_at']
+
+
+def row_error(index, detail):
+    if not isinstance(detail, dict):
+        detail = {'non_field_errors': detail}
+    return {'row': index, 'errors': detail}
+
+
+# Validates a batch of attendance rows without a query per row
+def validate_rows(rows, upsert=False):
+    """
+    Returns (valid, errors, existing): `valid` is a list of (index, data)
+    pairs, `errors` the per-row error dicts and `existing` the set of
+    (employee_id, date) keys that are already recorded. Field checks run
+    in Python; employee existence and the unique (employee, date) check
+    are one query each for the whole batch.
+    """
+    row_serializer = AttendanceBulkRowSerializer()
+    errors = []
+    parsed = []
+    seen = {}
+
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append(row_error(index, ['Expected an object.']))
+            continue
+        try:
+            data = row_serializer.run_validation(row)
+        except serializers.ValidationError as e:
+            errors.append(row_error(index, e.detail))
+            continue
+
+        key = (data['employee'], data['date'])
+        if key in seen:
+            errors.append(row_error(index, [f'Duplicate of row {seen[key]} in this batch.']))
+            continue
+        seen[key] = index
+        parsed.append((index, data))
+
+    employee_ids = {data['employee'] for _, data in parsed}
+    known_employees = set(
+        Employee.objects.filter(pk__in=employee_ids).values_list('pk', flat=True)
+    )
+    existing = set(
+        Attendance.objects.filter(
+            employee_id__in=known_employees,
+            date__in={data['date'] for _, data in parsed}
+        ).values_list('employee_id', 'date')
+    ) if known_employees else set()
+
+    valid = []
+    for index, data in parsed:
+        if data['employee'] not in known_employees:
+            errors.append(row_error(index, {
+                'employee': [f'Invalid pk "{data["employee"]}" - object does not exist.']
+            }))
+        elif not upsert and (data['employee'], data['date']) in existing:
+            errors.append(row_error(index, [
+                'Attendance record already exists for this employee on this date.'
+            ]))
+        else:
+            valid.append((index, data))
+
+    errors.sort(key=lambda error: error['row'])
+    return valid, errors, existing
+
+
+# Inserts (or upserts) the valid rows of a batch in one transaction
+def save_rows(rows, upsert=False, atomic=False):
+    """
+    With `upsert`, rows for an existing (employee, date) overwrite its
+    status, times and notes through INSERT ... ON CONFLICT instead of being
+    rejected. With `atomic`, nothing is written unless every row is valid.
+    Rollups are maintained by AttendanceQuerySet.bulk_create.
+    """
+    valid, errors, existing = validate_rows(rows, upsert=upsert)
+    if atomic and errors:
+        valid = []
+
+    objs = [
+        Attendance(
+            employee_id=data['employee'],
+            date=data['date'],
+            status=data['status'],
+            check_in_time=data.get('check_in_time'),
+            check_out_time=data.get('check_out_time'),
+            notes=data['notes'],
+        )
+        for _, data in valid
+    ]
+
+    updated = 0
+    if objs:
+        options = {'batch_size': INSERT_BATCH_SIZE}
+        if upsert:
+            options.update(
+                update_conflicts=True,
+                unique_fields=['employee', 'date'],
+                update_fields=UPSERT_FIELDS,
+            )
+            updated = sum((obj.employee_id, obj.date) in existing for obj in objs)
+        with transaction.atomic():
+            Attendance.objects.bulk_create(objs, **options)
+
+    return {
+        'created': len(objs) - updated,
+        'updated': updated,
+        'errors': errors,
+    }
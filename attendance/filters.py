@@ -0,0 +1,12 @@
+import django_filters
+from .models import Attendance
+
+
+# Filters for AttendanceListCreateView; the querysets carry with_hours_worked()
+class AttendanceFilter(django_filters.FilterSet):
+    min_hours = django_filters.NumberFilter(field_name='hours_worked', lookup_expr='gte')
+    max_hours = django_filters.NumberFilter(field_name='hours_worked', lookup_expr='lte')
+
+    class Meta:
+        model = Attendance
+        fields = ['employee', 'status', 'date']
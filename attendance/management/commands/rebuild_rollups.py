@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import datetime
+import time
+from attendance.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily and monthly attendance rollups from raw attendance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start-date',
+            help='First date to rebuild, YYYY-MM-DD (widened to the start of its month)'
+        )
+        parser.add_argument(
+            '--end-date',
+            help='Last date to rebuild, YYYY-MM-DD (widened to the end of its month)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start_date = self.parse_date(options['start_date'])
+            end_date = self.parse_date(options['end_date'])
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        self.stdout.write('Rebuilding attendance rollups...')
+        started = time.perf_counter()
+        daily_rows, monthly_rows = rebuild(start_date, end_date)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt rollups in {elapsed:.2f}s:\n'
+                f'- {daily_rows} daily department rows\n'
+                f'- {monthly_rows} monthly employee rows'
+            )
+        )
+
+    def parse_date(self, value):
+        if not value:
+            return None
+        return datetime.strptime(value, '%Y-%m-%d').date()
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-17 05:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Backfills the rollups from the attendance already in the table
+def backfill_rollups(apps, schema_editor):
+    from django.db.models import Count
+    from django.db.models.functions import TruncMonth
+
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceDailyRollup = apps.get_model('attendance', 'AttendanceDailyRollup')
+    EmployeeMonthlyRollup = apps.get_model('attendance', 'EmployeeMonthlyRollup')
+
+    daily = Attendance.objects.values(
+        'date', 'employee__department_id', 'status'
+    ).annotate(n=Count('id')).order_by()
+    AttendanceDailyRollup.objects.bulk_create(
+        [
+            AttendanceDailyRollup(
+                date=row['date'], department_id=row['employee__department_id'],
+                status=row['status'], count=row['n']
+            )
+            for row in daily.iterator()
+        ],
+        batch_size=5000
+    )
+
+    monthly = Attendance.objects.annotate(month=TruncMonth('date')).values(
+        'employee_id', 'month', 'status'
+    ).annotate(n=Count('id')).order_by()
+    EmployeeMonthlyRollup.objects.bulk_create(
+        [
+            EmployeeMonthlyRollup(
+                employee_id=row['employee_id'], month=row['month'],
+                status=row['status'], count=row['n']
+            )
+            for row in monthly.iterator()
+        ],
+        batch_size=5000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0001_initial'),
+        ('attendance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('status', models.CharField(choices=[('present', 'Present'), ('absent', 'Absent'), ('late', 'Late'), ('half_day', 'Half Day')], max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='employees.employee')),
+            ],
+            options={
+                'ordering': ['month', 'employee', 'status'],
+                'unique_together': {('employee', 'month', 'status')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('present', 'Present'), ('absent', 'Absent'), ('late', 'Late'), ('half_day', 'Half Day')], max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='employees.department')),
+            ],
+            options={
+                'ordering': ['date', 'department', 'status'],
+                'unique_together': {('date', 'department', 'status')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
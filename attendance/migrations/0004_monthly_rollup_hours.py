@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:24
+
+from django.db import migrations, models
+
+
+# Recreates the monthly rollup with the new columns filled in
+def backfill_hours(apps, schema_editor):
+    from django.db.models import Count, Sum
+    from django.db.models.functions import Round, TruncMonth
+    from attendance.models import hours_worked_expression
+
+    Attendance = apps.get_model('attendance', 'Attendance')
+    EmployeeMonthlyRollup = apps.get_model('attendance', 'EmployeeMonthlyRollup')
+
+    hours = hours_worked_expression()
+    monthly = Attendance.objects.annotate(month=TruncMonth('date')).values(
+        'employee_id', 'month', 'status'
+    ).annotate(
+        n=Count('id'),
+        worked_days=Count(hours),
+        worked_seconds=Sum(Round(hours * 3600))
+    ).order_by()
+
+    EmployeeMonthlyRollup.objects.all().delete()
+    EmployeeMonthlyRollup.objects.bulk_create(
+        [
+            EmployeeMonthlyRollup(
+                employee_id=row['employee_id'], month=row['month'], status=row['status'],
+                count=row['n'], worked_days=row['worked_days'],
+                worked_seconds=round(row['worked_seconds'] or 0)
+            )
+            for row in monthly.iterator()
+        ],
+        batch_size=5000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeemonthlyrollup',
+            name='worked_days',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='employeemonthlyrollup',
+            name='worked_seconds',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_hours, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,121 @@
-from django.db import models
-from employees.models import Employee
+from django.db import connection, models
+from django.db.models import Case, F, FloatField, Func, Q, Value, When
+from django.db.models.functions import Cast, ExtractHour, ExtractMinute, ExtractSecond, Round
+from django.utils import timezone
+from employee_project import cache as analytics_cache
+from employees.models import Department, Employee
+
+SECONDS_PER_DAY = 24 * 3600
+
+
+# Hours between two check times, wrapping past midnight for night shifts
+def hours_between(check_in_time, check_out_time):
+    if check_in_time is None or check_out_time is None:
+        return None
+    check_in = ((check_in_time.hour * 60 + check_in_time.minute) * 60 + check_in_time.second) * 10**6 + check_in_time.microsecond
+    check_out = ((check_out_time.hour * 60 + check_out_time.minute) * 60 + check_out_time.second) * 10**6 + check_out_time.microsecond
+
+    # Handle when check out is next day
+    if check_out < check_in:
+        check_out += SECONDS_PER_DAY * 10**6
+    return (check_out - check_in) / 10**6 / 3600
+
+
+def _seconds_of_day(field):
+    return ExtractHour(field) * 3600 + ExtractMinute(field) * 60 + ExtractSecond(field)
+
+
+# check_out - check_in in seconds, negative across midnight
+def _seconds_between(check_in, check_out):
+    if connection.vendor == 'postgresql':
+        return Func(
+            F(check_out), F(check_in),
+            template='EXTRACT(EPOCH FROM (%(expressions)s))',
+            arg_joiner=' - ',
+            output_field=FloatField()
+        )
+    if connection.vendor == 'sqlite':
+        # julianday() is native, unlike Django's Python time extract functions
+        julian = lambda field: Func(F(field), function='julianday', output_field=FloatField())
+        return Round((julian(check_out) - julian(check_in)) * 86400)
+    return _seconds_of_day(check_out) - _seconds_of_day(check_in)
+
+
+# hours_between() as a SQL expression
+def hours_worked_expression(prefix=''):
+    """
+    NULL unless both check times are set. PostgreSQL keeps fractional
+    seconds; SQLite rounds to whole seconds. `prefix` is the lookup path to
+    Attendance, e.g. 'attendances__' when aggregating from Employee.
+    """
+    check_in = f'{prefix}check_in_time'
+    check_out = f'{prefix}check_out_time'
+    worked = _seconds_between(check_in, check_out)
+    seconds = Case(
+        When(Q(**{f'{check_out}__lt': F(check_in)}), then=worked + SECONDS_PER_DAY),
+        default=worked
+    )
+    return Cast(seconds, FloatField()) / Value(3600.0)
+
+
+# Keeps the attendance rollups current for set-based writes
+class AttendanceQuerySet(models.QuerySet):
+    """
+    Model.save() and Model.delete() are covered by the signal handlers in
+    attendance.signals. These overrides cover the bulk paths that bypass
+    signals, by diffing the rollup keys of the touched rows before and after.
+    Every bulk write also bumps the attendance generation, since edits that
+    move no count (check times, notes) still change API responses.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .rollups import are_rollups_deferred, track_rollups
+
+        objs = list(objs)
+        if not objs or are_rollups_deferred():
+            return super().bulk_create(objs, *args, **kwargs)
+
+        touched = self.model.objects.filter(
+            employee_id__in={obj.employee_id for obj in objs},
+            date__in={obj.date for obj in objs}
+        )
+        with track_rollups(touched):
+            created = super().bulk_create(objs, *args, **kwargs)
+        analytics_cache.invalidate(analytics_cache.ATTENDANCES)
+        return created
+
+    def update(self, **kwargs):
+        from .rollups import ROLLUP_FIELDS, are_rollups_deferred, track_rollups
+
+        # auto_now only applies to save()
+        kwargs.setdefault('updated_at', timezone.now())
+        if are_rollups_deferred():
+            return super().update(**kwargs)
+
+        if ROLLUP_FIELDS & kwargs.keys():
+            touched = self.model.objects.filter(pk__in=list(self.values_list('pk', flat=True)))
+            with track_rollups(touched):
+                updated = super().update(**kwargs)
+        else:
+            updated = super().update(**kwargs)
+        analytics_cache.invalidate(analytics_cache.ATTENDANCES)
+        return updated
+
+    # Adds hours_worked in SQL, so it can be filtered, ordered and aggregated
+    def with_hours_worked(self):
+        return self.annotate(hours_worked=hours_worked_expression())
+
+    def delete(self):
+        from .rollups import are_rollups_deferred, signals_suppressed, track_rollups
+
+        if are_rollups_deferred():
+            return super().delete()
+
+        touched = self.model.objects.filter(pk__in=list(self.values_list('pk', flat=True)))
+        with track_rollups(touched):
+            with signals_suppressed():
+                return super().delete()
+
 
 # Attendance tracking model
 class Attendance(models.Model):
@@ -21,25 +137,80 @@ class Attendance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AttendanceQuerySet.as_manager()
+
     @property
     def hours_worked(self):
         """Calculate hours worked if both check-in and check-out times are available"""
-        if self.check_in_time and self.check_out_time:
-            from datetime import datetime, timedelta
-            check_in = datetime.combine(self.date, self.check_in_time)
-            check_out = datetime.combine(self.date, self.check_out_time)
-            
-            # Handle when check out is next day
-            if check_out < check_in:
-                check_out += timedelta(days=1)
-                
-            duration = check_out - check_in
-            return duration.total_seconds() / 3600  
-        return None
+        # Loaded by AttendanceQuerySet.with_hours_worked()
+        if '_hours_worked' in self.__dict__:
+            return self.__dict__['_hours_worked']
+        return hours_between(self.check_in_time, self.check_out_time)
+
+    @hours_worked.setter
+    def hours_worked(self, value):
+        self.__dict__['_hours_worked'] = value
 
     def __str__(self):
         return f"{self.employee.full_name} - {self.date} ({self.get_status_display()})"
 
     class Meta:
         ordering = ['-date', 'employee__last_name']
-        unique_together = ['employee', 'date']
\ No newline at end of file
+        unique_together = ['employee', 'date']
+        indexes = [
+            # Keyset pagination on (-date, -id), and date__range windows
+            models.Index(fields=['date', 'id'], name='attendance_date_id_idx'),
+        ]
+
+# Attendance counts per day, department and status
+class AttendanceDailyRollup(models.Model):
+    """
+    Materialized daily attendance totals, kept current by attendance.rollups
+
+    Example data:
+        date: 2025-01-15
+        department: Department object
+        status: "present"
+        count: 42
+    """
+    date = models.DateField()
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='attendance_rollups')
+    status = models.CharField(max_length=10, choices=Attendance.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.date} {self.department} {self.status}: {self.count}"
+
+    class Meta:
+        ordering = ['date', 'department', 'status']
+        unique_together = ['date', 'department', 'status']
+
+
+# Attendance counts and hours per employee, month and status
+class EmployeeMonthlyRollup(models.Model):
+    """
+    Materialized monthly attendance totals per employee. worked_days counts
+    the records with both check times, worked_seconds sums their hours
+    worked in whole seconds.
+
+    Example data:
+        employee: Employee object
+        month: 2025-01-01 (always the first day of the month)
+        status: "late"
+        count: 3
+        worked_days: 2
+        worked_seconds: 55800
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='monthly_rollups')
+    month = models.DateField()
+    status = models.CharField(max_length=10, choices=Attendance.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    worked_days = models.PositiveIntegerField(default=0)
+    worked_seconds = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.employee.full_name} {self.month:%Y-%m} {self.status}: {self.count}"
+
+    class Meta:
+        ordering = ['month', 'employee', 'status']
+        unique_together = ['employee', 'month', 'status']
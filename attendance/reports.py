@@ -0,0 +1,133 @@
+from datetime import timedelta
+from django.db.models import Exists, OuterRef, Q
+from employees.models import Employee
+from .models import Attendance
+from .rollups import month_end
+from .stats import STATUS_COLUMNS, round_hours
+
+# One-letter day cells for the timesheet matrix
+STATUS_CODES = {
+    'present': 'P',
+    'absent': 'A',
+    'late': 'L',
+    'half_day': 'H',
+}
+
+# Per-employee total columns, in report order
+TOTAL_COLUMNS = ['total_days', *STATUS_COLUMNS.values(), 'total_hours']
+
+
+# Builds the department x employee x day timesheet for a month
+def monthly_timesheet(month, department_id=None):
+    """
+    `month` is the first day of the month. Returns a columnar dict: every
+    employee attribute is a list with one entry per employee, and `status`
+    and `hours` are employee x day matrices (lists of per-day lists) with
+    None where nothing was recorded.
+
+    Two queries: the employees, and the month's (employee, day, status,
+    hours) rows with hours_worked computed in SQL. The per-employee and
+    per-department totals are accumulated while the rows are placed, so
+    attendance is read once.
+    """
+    first_day = month
+    last_day = month_end(month)
+    days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+
+    attendances = Attendance.objects.filter(date__range=[first_day, last_day])
+    employees = Employee.objects.all()
+    if department_id is not None:
+        attendances = attendances.filter(employee__department_id=department_id)
+        employees = employees.filter(department_id=department_id)
+
+    # Active employees, plus leavers who still have records that month
+    employees = employees.filter(
+        Q(is_active=True) | Exists(attendances.filter(employee=OuterRef('pk')))
+    ).values_list(
+        'id', 'employee_id', 'first_name', 'last_name', 'department_id', 'department__name'
+    ).order_by('department__name', 'last_name', 'first_name', 'id')
+
+    departments = {'id': [], 'name': [], 'employee_count': []}
+    columns = {'id': [], 'employee_id': [], 'employee_name': [], 'department': []}
+    positions = {}
+    for pk, employee_id, first_name, last_name, department, department_name in employees:
+        if not departments['id'] or departments['id'][-1] != department:
+            departments['id'].append(department)
+            departments['name'].append(department_name)
+            departments['employee_count'].append(0)
+        departments['employee_count'][-1] += 1
+
+        positions[pk] = len(columns['id'])
+        columns['id'].append(pk)
+        columns['employee_id'].append(employee_id)
+        columns['employee_name'].append(f'{first_name} {last_name}')
+        columns['department'].append(len(departments['id']) - 1)
+
+    count = len(columns['id'])
+    totals = {column: [0] * count for column in TOTAL_COLUMNS}
+    status_matrix = [[None] * len(days) for _ in range(count)]
+    hours_matrix = [[None] * len(days) for _ in range(count)]
+
+    rows = attendances.with_hours_worked().values_list(
+        'employee_id', 'date', 'status', 'hours_worked'
+    ).order_by()
+    for employee, day, status, hours in rows.iterator(chunk_size=5000):
+        position = positions.get(employee)
+        if position is None:
+            continue
+        offset = (day - first_day).days
+        status_matrix[position][offset] = STATUS_CODES.get(status, status)
+        totals['total_days'][position] += 1
+        totals[STATUS_COLUMNS[status]][position] += 1
+        if hours is not None:
+            hours_matrix[position][offset] = round_hours(hours)
+            totals['total_hours'][position] += hours
+
+    # Department totals are sums over each department's run of employees
+    department_of = columns['department']
+    for column in TOTAL_COLUMNS:
+        department_totals = [0] * len(departments['id'])
+        for position, value in enumerate(totals[column]):
+            department_totals[department_of[position]] += value
+        departments[column] = department_totals
+    departments['total_hours'] = [round_hours(value) for value in departments['total_hours']]
+    totals['total_hours'] = [round_hours(value) for value in totals['total_hours']]
+
+    columns.update(totals)
+    columns['status'] = status_matrix
+    columns['hours'] = hours_matrix
+    return {
+        'month': first_day.strftime('%Y-%m'),
+        'days': [day.isoformat() for day in days],
+        'status_codes': {code: status for status, code in STATUS_CODES.items()},
+        'departments': departments,
+        'employees': columns,
+    }
+
+
+# Flattens a timesheet into CSV rows: one per employee, one column per day
+def timesheet_csv_rows(report):
+    """
+    A day cell holds the hours worked when both check times were recorded,
+    otherwise the status code; totals follow the day columns.
+    """
+    header = ['department', 'employee_id', 'employee_name', *report['days'], *TOTAL_COLUMNS]
+    columns = report['employees']
+    department_names = report['departments']['name']
+
+    def rows():
+        for position, employee_id in enumerate(columns['employee_id']):
+            statuses = columns['status'][position]
+            hours = columns['hours'][position]
+            yield [
+                department_names[columns['department'][position]],
+                employee_id,
+                columns['employee_name'][position],
+                *(
+                    f'{worked:.2f}' if worked is not None else status
+                    for status, worked in zip(statuses, hours)
+                ),
+                *(columns[column][position] for column in TOTAL_COLUMNS),
+            ]
+
+    return header, rows()
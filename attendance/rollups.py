@@ -0,0 +1,243 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Round, TruncMonth
+from employee_project import cache as analytics_cache
+from .models import (
+    Attendance, AttendanceDailyRollup, EmployeeMonthlyRollup, hours_between, hours_worked_expression
+)
+
+# Attendance fields whose changes move a row between rollup keys or change
+# the hours it adds to its month
+ROLLUP_FIELDS = {'employee', 'employee_id', 'date', 'status', 'check_in_time', 'check_out_time'}
+
+# Set while a bulk path maintains the rollups itself
+_signals_suppressed = ContextVar('attendance_rollup_signals_suppressed', default=False)
+
+# Set while a loader skips all maintenance and calls rebuild() at the end
+_deferred = ContextVar('attendance_rollups_deferred', default=False)
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def month_end(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+# Disables the per-row signal handlers while a bulk path does the bookkeeping
+@contextmanager
+def signals_suppressed():
+    token = _signals_suppressed.set(True)
+    try:
+        yield
+    finally:
+        _signals_suppressed.reset(token)
+
+
+def are_signals_suppressed():
+    return _signals_suppressed.get() or _deferred.get()
+
+
+def are_rollups_deferred():
+    return _deferred.get()
+
+
+# Skips rollup maintenance entirely, for bulk loaders that rebuild afterwards
+@contextmanager
+def deferred():
+    token = _deferred.set(True)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+
+
+# hours_between() in whole seconds, the unit the monthly rollup sums
+def worked_seconds(check_in_time, check_out_time):
+    hours = hours_between(check_in_time, check_out_time)
+    return None if hours is None else round(hours * 3600)
+
+
+# Rollup deltas for a single attendance row
+def row_deltas(employee_id, department_id, date, status, seconds=None, sign=1):
+    """
+    Deltas are keyed by the rollup row's key plus the column they add to:
+    (date, department_id, status, 'count') for the daily rollup, and
+    (employee_id, month, status, column) for the monthly one, where rows
+    with both check times also add to worked_days and worked_seconds.
+    """
+    daily = Counter({(date, department_id, status, 'count'): sign})
+    key = (employee_id, month_start(date), status)
+    monthly = Counter({(*key, 'count'): sign})
+    if seconds is not None:
+        monthly[(*key, 'worked_days')] = sign
+        monthly[(*key, 'worked_seconds')] = sign * seconds
+    return daily, monthly
+
+
+# Rollup deltas for every row in a queryset, grouped in the database
+def snapshot(queryset):
+    daily = Counter()
+    for row in queryset.values('date', 'employee__department_id', 'status').annotate(n=Count('id')).order_by():
+        daily[(row['date'], row['employee__department_id'], row['status'], 'count')] += row['n']
+
+    # Seconds are rounded per row, as worked_seconds() does, so a row adds
+    # the same amount here as through the signals
+    hours = hours_worked_expression()
+    monthly = Counter()
+    rows = queryset.annotate(month=TruncMonth('date')).values(
+        'employee_id', 'month', 'status'
+    ).annotate(
+        n=Count('id'),
+        worked_days=Count(hours),
+        worked_seconds=Sum(Round(hours * 3600))
+    ).order_by()
+    for row in rows:
+        key = (row['employee_id'], row['month'], row['status'])
+        monthly[(*key, 'count')] += row['n']
+        if row['worked_days']:
+            monthly[(*key, 'worked_days')] += row['worked_days']
+            monthly[(*key, 'worked_seconds')] += round(row['worked_seconds'])
+
+    return daily, monthly
+
+
+def _difference(after, before):
+    delta = Counter(after)
+    delta.subtract(before)
+    return delta
+
+
+# Applies the rollup change caused by a write to the rows matched by `queryset`
+@contextmanager
+def track_rollups(queryset):
+    """
+    Snapshots the rollup keys of `queryset` before and after the wrapped
+    write and applies the difference. The queryset must select the same
+    rows before and after, so callers pin it by primary key or natural key.
+    """
+    if _deferred.get():
+        yield
+        return
+
+    with transaction.atomic():
+        daily_before, monthly_before = snapshot(queryset)
+        yield
+        daily_after, monthly_after = snapshot(queryset)
+        apply_deltas(
+            _difference(daily_after, daily_before),
+            _difference(monthly_after, monthly_before)
+        )
+
+
+def apply_deltas(daily, monthly):
+    changed = _apply(AttendanceDailyRollup, ('date', 'department_id', 'status'), daily)
+    changed = _apply(EmployeeMonthlyRollup, ('employee_id', 'month', 'status'), monthly) or changed
+
+    # Every count-changing attendance write lands here, signals or bulk
+    if changed:
+        analytics_cache.invalidate(analytics_cache.ATTENDANCES)
+
+
+# Adds signed deltas to the rollup rows, creating and dropping rows as needed
+def _apply(model, key_fields, deltas):
+    changes = {}
+    for (*key, column), delta in deltas.items():
+        if delta:
+            changes.setdefault(tuple(key), Counter())[column] += delta
+    if not changes:
+        return False
+
+    columns = sorted({column for change in changes.values() for column in change})
+    lookups = {
+        f'{field}__in': {key[index] for key in changes}
+        for index, field in enumerate(key_fields)
+    }
+
+    # A concurrent writer may create the same new key first; retry once
+    # so the second pass locks and increments the row it created.
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                existing = {
+                    tuple(getattr(row, field) for field in key_fields): row
+                    for row in model.objects.select_for_update().filter(**lookups)
+                }
+
+                to_create, to_update, to_delete = [], [], []
+                for key, change in changes.items():
+                    row = existing.get(key)
+                    if row is None:
+                        if change['count'] > 0:
+                            to_create.append(model(**dict(zip(key_fields, key)), **change))
+                        continue
+
+                    for column, delta in change.items():
+                        setattr(row, column, getattr(row, column) + delta)
+                    if row.count > 0:
+                        to_update.append(row)
+                    else:
+                        to_delete.append(row.pk)
+
+                if to_update:
+                    model.objects.bulk_update(to_update, columns, batch_size=1000)
+                if to_delete:
+                    model.objects.filter(pk__in=to_delete).delete()
+                if to_create:
+                    model.objects.bulk_create(to_create, batch_size=1000)
+            return True
+        except IntegrityError:
+            if attempt:
+                raise
+
+
+# Recomputes the rollups from raw attendance, optionally for a date window
+def rebuild(start_date=None, end_date=None, batch_size=5000):
+    """
+    Rebuilds both rollup tables from Attendance. A window is widened to
+    whole months so the monthly rollup stays exact. Returns the number of
+    daily and monthly rows written.
+    """
+    attendances = Attendance.objects.all()
+    daily_rows = AttendanceDailyRollup.objects.all()
+    monthly_rows = EmployeeMonthlyRollup.objects.all()
+
+    if start_date:
+        start_date = month_start(start_date)
+        attendances = attendances.filter(date__gte=start_date)
+        daily_rows = daily_rows.filter(date__gte=start_date)
+        monthly_rows = monthly_rows.filter(month__gte=start_date)
+    if end_date:
+        end_date = month_end(end_date)
+        attendances = attendances.filter(date__lte=end_date)
+        daily_rows = daily_rows.filter(date__lte=end_date)
+        monthly_rows = monthly_rows.filter(month__lte=end_date)
+
+    with transaction.atomic():
+        daily_rows.delete()
+        monthly_rows.delete()
+
+        daily, monthly = snapshot(attendances)
+        daily_rollups = _rows(AttendanceDailyRollup, ('date', 'department_id', 'status'), daily)
+        monthly_rollups = _rows(EmployeeMonthlyRollup, ('employee_id', 'month', 'status'), monthly)
+        AttendanceDailyRollup.objects.bulk_create(daily_rollups, batch_size=batch_size)
+        EmployeeMonthlyRollup.objects.bulk_create(monthly_rollups, batch_size=batch_size)
+
+    analytics_cache.invalidate(analytics_cache.ATTENDANCES)
+    return len(daily_rollups), len(monthly_rollups)
+
+
+# Unsaved rollup rows for snapshot() deltas
+def _rows(model, key_fields, deltas):
+    rows = {}
+    for (*key, column), value in deltas.items():
+        key = tuple(key)
+        if key not in rows:
+            rows[key] = model(**dict(zip(key_fields, key)))
+        setattr(rows[key], column, value)
+    return list(rows.values())
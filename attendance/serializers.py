@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Attendance
 from employees.models import Employee
+from employee_project.fast import ValuesSerializer, render_datetime, render_isoformat
 
 
 class AttendanceSerializer(serializers.ModelSerializer):
@@ -23,6 +24,39 @@ class AttendanceSerializer(serializers.ModelSerializer):
         return obj.hours_worked
 
 
+class AttendanceFastSerializer(ValuesSerializer):
+    """Read-only AttendanceSerializer for list responses, built from .values() rows"""
+    values_fields = (
+        'id', 'employee_id', 'employee__first_name', 'employee__last_name',
+        'employee__employee_id', 'date', 'status', 'check_in_time',
+        'check_out_time', 'hours_worked', 'notes', 'created_at', 'updated_at'
+    )
+    status_labels = dict(Attendance.STATUS_CHOICES)
+
+    @classmethod
+    def values(cls, queryset):
+        if 'hours_worked' not in queryset.query.annotations:
+            queryset = queryset.with_hours_worked()
+        return super().values(queryset)
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'employee': row['employee_id'],
+            'employee_name': f"{row['employee__first_name']} {row['employee__last_name']}",
+            'employee_id': row['employee__employee_id'],
+            'date': render_isoformat(row['date']),
+            'status': row['status'],
+            'status_display': self.status_labels.get(row['status'], row['status']),
+            'check_in_time': render_isoformat(row['check_in_time']),
+            'check_out_time': render_isoformat(row['check_out_time']),
+            'hours_worked': row['hours_worked'],
+            'notes': row['notes'],
+            'created_at': render_datetime(row['created_at']),
+            'updated_at': render_datetime(row['updated_at']),
+        }
+
+
 class AttendanceCreateUpdateSerializer(serializers.ModelSerializer):
     """Serializer for creating and updating attendance records"""
     
@@ -79,4 +113,28 @@ class AttendanceStatsSerializer(serializers.Serializer):
     absent_days = serializers.IntegerField()
     late_days = serializers.IntegerField()
     half_days = serializers.IntegerField()
-    attendance_percentage = serializers.FloatField()
\ No newline at end of file
+    attendance_percentage = serializers.FloatField()
+    total_hours = serializers.FloatField()
+    average_hours = serializers.FloatField(allow_null=True)
+
+
+class AttendanceBulkRowSerializer(serializers.Serializer):
+    """
+    One row of a batch check-in. Only per-row checks live here; employee
+    existence and the (employee, date) duplicate check run set-based in
+    attendance.bulk
+    """
+    employee = serializers.IntegerField()
+    date = serializers.DateField()
+    status = serializers.ChoiceField(choices=Attendance.STATUS_CHOICES)
+    check_in_time = serializers.TimeField(required=False, allow_null=True)
+    check_out_time = serializers.TimeField(required=False, allow_null=True)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, data):
+        # If status is present, require check-in time
+        if data['status'] == 'present' and not data.get('check_in_time'):
+            raise serializers.ValidationError(
+                "Check-in time is required for present status."
+            )
+        return data
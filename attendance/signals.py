@@ -0,0 +1,103 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from employee_project import cache as analytics_cache
+from employees.models import Employee
+from .models import Attendance
+from .rollups import apply_deltas, are_signals_suppressed, row_deltas, snapshot, worked_seconds
+
+
+def _rollup_key(attendance):
+    if Attendance.employee.is_cached(attendance):
+        department_id = attendance.employee.department_id
+    else:
+        department_id = Employee.objects.filter(
+            pk=attendance.employee_id
+        ).values_list('department_id', flat=True).first()
+    # Times assigned as strings are only parsed when the row is read back
+    check_in_time, check_out_time = (
+        Attendance._meta.get_field(field).to_python(getattr(attendance, field))
+        for field in ('check_in_time', 'check_out_time')
+    )
+    return (
+        attendance.employee_id, department_id, attendance.date, attendance.status,
+        worked_seconds(check_in_time, check_out_time)
+    )
+
+
+# Remembers the stored rollup key so post_save can move the row's count and hours
+@receiver(pre_save, sender=Attendance)
+def remember_attendance_key(sender, instance, **kwargs):
+    instance._rollup_previous = None
+    if instance.pk is None or are_signals_suppressed():
+        return
+
+    previous = Attendance.objects.filter(pk=instance.pk).values_list(
+        'employee_id', 'employee__department_id', 'date', 'status', 'check_in_time', 'check_out_time'
+    ).first()
+    if previous:
+        *key, check_in_time, check_out_time = previous
+        instance._rollup_previous = (*key, worked_seconds(check_in_time, check_out_time))
+
+
+@receiver(post_save, sender=Attendance)
+def update_rollups_on_save(sender, instance, **kwargs):
+    if are_signals_suppressed():
+        return
+
+    current = _rollup_key(instance)
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous == current:
+        return
+
+    daily, monthly = row_deltas(*current)
+    if previous:
+        previous_daily, previous_monthly = row_deltas(*previous, sign=-1)
+        daily.update(previous_daily)
+        monthly.update(previous_monthly)
+    apply_deltas(daily, monthly)
+
+
+@receiver(post_delete, sender=Attendance)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    if are_signals_suppressed():
+        return
+
+    apply_deltas(*row_deltas(*_rollup_key(instance), sign=-1))
+
+
+# Hours, notes and check times change responses without moving any count
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def invalidate_analytics(sender, **kwargs):
+    if not are_signals_suppressed():
+        analytics_cache.invalidate(analytics_cache.ATTENDANCES)
+
+
+# Moving an employee between departments moves their daily rollup counts
+@receiver(pre_save, sender=Employee)
+def remember_employee_department(sender, instance, **kwargs):
+    instance._rollup_previous_department = None
+    if instance.pk is None:
+        return
+
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and {'department', 'department_id'}.isdisjoint(update_fields):
+        return
+
+    instance._rollup_previous_department = Employee.objects.filter(
+        pk=instance.pk
+    ).values_list('department_id', flat=True).first()
+
+
+@receiver(post_save, sender=Employee)
+def move_employee_rollups(sender, instance, **kwargs):
+    previous_department = getattr(instance, '_rollup_previous_department', None)
+    if previous_department is None or previous_department == instance.department_id:
+        return
+
+    daily, _ = snapshot(Attendance.objects.filter(employee=instance))
+    moved = {}
+    for (date, department_id, status, column), count in daily.items():
+        moved[(date, previous_department, status, column)] = -count
+        moved[(date, department_id, status, column)] = count
+    apply_deltas(moved, {})
@@ -0,0 +1,166 @@
+from collections import Counter
+from datetime import timedelta
+from django.db.models import Count, Q, Sum
+from employees.models import Employee
+from .models import Attendance, EmployeeMonthlyRollup
+from .rollups import month_end, month_start
+
+# Status columns reported by AttendanceStatsSerializer, keyed by Attendance.status
+STATUS_COLUMNS = {
+    'present': 'present_days',
+    'absent': 'absent_days',
+    'late': 'late_days',
+    'half_day': 'half_days',
+}
+
+
+# Splits a date window into whole calendar months and the partial-month edges
+def split_on_months(start_date, end_date):
+    """
+    Returns ((first_month, last_month) or None, [(edge_start, edge_end), ...]).
+    Whole months are read from EmployeeMonthlyRollup, edges from Attendance.
+    """
+    first_full = start_date if start_date.day == 1 else month_end(start_date) + timedelta(days=1)
+    last_full = end_date if end_date == month_end(end_date) else month_start(end_date) - timedelta(days=1)
+
+    if first_full > last_full:
+        return None, [(start_date, end_date)]
+
+    edges = []
+    if start_date < first_full:
+        edges.append((start_date, first_full - timedelta(days=1)))
+    if last_full < end_date:
+        edges.append((last_full + timedelta(days=1), end_date))
+    return (first_full, month_start(last_full)), edges
+
+
+# Matches rows whose date falls in any of the ranges
+def in_date_ranges(ranges, prefix=''):
+    in_range = Q()
+    for start_date, end_date in ranges:
+        in_range |= Q(**{f'{prefix}date__range': [start_date, end_date]})
+    return in_range
+
+
+# Builds the conditional Count aggregates for a set of date ranges
+def status_count_aggregates(ranges, prefix=''):
+    """
+    Returns the total_days / present_days / ... aggregates as a dict of
+    filtered Count expressions. `prefix` is the lookup path from the model
+    being aggregated to Attendance, e.g. 'attendances__' for Employee.
+    """
+    in_range = in_date_ranges(ranges, prefix)
+    aggregates = {
+        'total_days': Count(f'{prefix}id', filter=in_range),
+    }
+    for status, column in STATUS_COLUMNS.items():
+        aggregates[column] = Count(
+            f'{prefix}id',
+            filter=in_range & Q(**{f'{prefix}status': status})
+        )
+    return aggregates
+
+
+# Gets per-employee status counts and worked time for whole months from the monthly rollup
+def monthly_rollup_counts(employees, months):
+    first_month, last_month = months
+    rows = EmployeeMonthlyRollup.objects.filter(
+        employee__in=employees,
+        month__range=[first_month, last_month]
+    ).values('employee_id', 'status').annotate(
+        n=Sum('count'),
+        worked_days=Sum('worked_days'),
+        worked_seconds=Sum('worked_seconds')
+    ).order_by()
+
+    counts = {}
+    for row in rows:
+        employee_counts = counts.setdefault(row['employee_id'], Counter())
+        employee_counts[STATUS_COLUMNS[row['status']]] += row['n']
+        employee_counts['total_days'] += row['n']
+        employee_counts['worked_days'] += row['worked_days']
+        employee_counts['worked_hours'] += row['worked_seconds'] / 3600
+    return counts
+
+
+# Gets the same per-employee figures for the partial-month edges, from Attendance
+def edge_counts(employees, edges):
+    """
+    Reads only the attendance rows inside the edges, which together span
+    less than two months whatever the window. Hours come from the SQL
+    hours_worked annotation; records without both check times count as
+    days but not as worked days.
+    """
+    rows = Attendance.objects.filter(
+        in_date_ranges(edges), employee__in=employees
+    ).with_hours_worked().values('employee_id').annotate(
+        **status_count_aggregates(edges),
+        worked_days=Count('hours_worked'),
+        worked_hours=Sum('hours_worked')
+    ).order_by()
+
+    return {
+        row.pop('employee_id'): Counter({column: value for column, value in row.items() if value})
+        for row in rows
+    }
+
+
+def round_hours(value):
+    return None if value is None else round(value, 2)
+
+
+# Turns an employee's counts into the AttendanceStatsSerializer shape
+def build_stats_row(employee_id, employee_name, counts):
+    total_days = counts['total_days']
+    present_days = counts['present_days']
+    attendance_percentage = (present_days / total_days * 100) if total_days > 0 else 0
+    worked_hours = counts['worked_hours']
+    worked_days = counts['worked_days']
+
+    return {
+        'employee_id': employee_id,
+        'employee_name': employee_name,
+        'total_days': total_days,
+        'present_days': present_days,
+        'absent_days': counts['absent_days'],
+        'late_days': counts['late_days'],
+        'half_days': counts['half_days'],
+        'attendance_percentage': round(attendance_percentage, 2),
+        'total_hours': round_hours(float(worked_hours)),
+        'average_hours': round_hours(worked_hours / worked_days) if worked_days else None,
+    }
+
+
+# Gets the attendance stats for every active employee
+def iter_employee_stats(start_date, end_date, employees=None, chunk_size=2000):
+    """
+    Yields one stats dict per employee, in employee order.
+
+    Whole months, counts and hours alike, come from the monthly rollup;
+    only the partial months at either end are read from Attendance. With
+    the employee list that is at most three queries, and a year costs
+    about the same as a week: the raw rows read never span more than the
+    two edges.
+    """
+    if employees is None:
+        employees = Employee.objects.filter(is_active=True)
+
+    months, edges = split_on_months(start_date, end_date)
+    rollup_counts = monthly_rollup_counts(employees, months) if months else {}
+    window_counts = edge_counts(employees, edges) if edges else {}
+
+    rows = employees.values('id', 'employee_id', 'first_name', 'last_name')
+    for row in rows.iterator(chunk_size=chunk_size):
+        counts = Counter(rollup_counts.get(row['id'], {}))
+        counts.update(window_counts.get(row['id'], {}))
+        yield build_stats_row(
+            row['employee_id'],
+            f"{row['first_name']} {row['last_name']}",
+            counts
+        )
+
+
+# Gets the attendance stats for a single employee
+def employee_stats(employee, start_date, end_date):
+    employees = Employee.objects.filter(pk=employee.pk)
+    return next(iter_employee_stats(start_date, end_date, employees=employees))
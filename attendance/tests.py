@@ -0,0 +1,927 @@
+import base64
+import csv
+import io
+import json
+from datetime import date, time, timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from employees.models import Department, Employee
+from . import rollups
+from .models import Attendance, AttendanceDailyRollup, EmployeeMonthlyRollup
+from .serializers import AttendanceFastSerializer, AttendanceSerializer
+from .stats import employee_stats, iter_employee_stats, split_on_months
+from .views import AttendanceListCreateView
+
+# Nothing cached, so every request runs its queries
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+# A cache of the test's own, emptied before each test
+LOCAL_CACHE = {'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'attendance-tests',
+}}
+
+
+class SplitOnMonthsTests(TestCase):
+    def test_window_inside_one_month(self):
+        self.assertEqual(
+            split_on_months(date(2024, 3, 5), date(2024, 3, 20)),
+            (None, [(date(2024, 3, 5), date(2024, 3, 20))])
+        )
+
+    def test_exactly_one_month(self):
+        self.assertEqual(
+            split_on_months(date(2024, 2, 1), date(2024, 2, 29)),
+            ((date(2024, 2, 1), date(2024, 2, 1)), [])
+        )
+
+    def test_partial_months_at_both_ends(self):
+        self.assertEqual(
+            split_on_months(date(2024, 1, 15), date(2024, 3, 10)),
+            (
+                (date(2024, 2, 1), date(2024, 2, 1)),
+                [(date(2024, 1, 15), date(2024, 1, 31)), (date(2024, 3, 1), date(2024, 3, 10))]
+            )
+        )
+
+    def test_starts_on_month_boundary(self):
+        self.assertEqual(
+            split_on_months(date(2024, 1, 1), date(2024, 2, 10)),
+            ((date(2024, 1, 1), date(2024, 1, 1)), [(date(2024, 2, 1), date(2024, 2, 10))])
+        )
+
+    def test_ends_on_month_boundary(self):
+        self.assertEqual(
+            split_on_months(date(2024, 1, 20), date(2024, 2, 29)),
+            ((date(2024, 2, 1), date(2024, 2, 1)), [(date(2024, 1, 20), date(2024, 1, 31))])
+        )
+
+    def test_adjacent_days_across_a_boundary(self):
+        self.assertEqual(
+            split_on_months(date(2024, 1, 31), date(2024, 2, 1)),
+            (None, [(date(2024, 1, 31), date(2024, 2, 1))])
+        )
+
+    def test_partial_months_across_a_year(self):
+        # No whole month in between: one edge covering both partial months
+        self.assertEqual(
+            split_on_months(date(2023, 12, 20), date(2024, 1, 10)),
+            (None, [(date(2023, 12, 20), date(2024, 1, 10))])
+        )
+
+    def test_whole_months_across_a_year(self):
+        self.assertEqual(
+            split_on_months(date(2023, 11, 15), date(2024, 2, 10)),
+            (
+                (date(2023, 12, 1), date(2024, 1, 1)),
+                [(date(2023, 11, 15), date(2023, 11, 30)), (date(2024, 2, 1), date(2024, 2, 10))]
+            )
+        )
+
+
+@override_settings(CACHES=NO_CACHE)
+class BulkStatsQueryTests(TestCase):
+    # A window with a whole month and a partial month at either end, so
+    # the rollup, edge and hours queries all run
+    START_DATE = date(2024, 1, 20)
+    END_DATE = date(2024, 3, 10)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Engineering')
+        cls.user = get_user_model().objects.create_user('stats', password='x')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_employees(self, count):
+        start = Employee.objects.count()
+        for number in range(start, start + count):
+            employee = Employee.objects.create(
+                first_name='Test',
+                last_name=f'Employee{number}',
+                email=f'employee{number}@example.com',
+                phone_number='+1234567890',
+                address='1 Main St',
+                department=self.department,
+                date_joined=date(2023, 1, 1),
+                employee_id=f'EMP{number:03d}',
+            )
+            # One record in each edge and two in the whole month
+            for day, status in [
+                (date(2024, 1, 25), 'present'),
+                (date(2024, 2, 5), 'late'),
+                (date(2024, 2, 6), 'absent'),
+                (date(2024, 3, 4), 'present'),
+            ]:
+                Attendance.objects.create(employee=employee, date=day, status=status)
+
+    def stats_queries(self):
+        url = reverse('attendance:bulk-attendance-stats')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {
+                'start_date': self.START_DATE.isoformat(),
+                'end_date': self.END_DATE.isoformat(),
+            })
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()['employee_stats']
+
+    def test_query_count_does_not_grow_with_employees(self):
+        self.add_employees(2)
+        few_queries, few = self.stats_queries()
+        self.add_employees(8)
+        many_queries, many = self.stats_queries()
+
+        self.assertEqual(len(few), 2)
+        self.assertEqual(len(many), 10)
+        self.assertEqual(few_queries, many_queries)
+
+    def test_stats_are_three_queries(self):
+        self.add_employees(5)
+        with self.assertNumQueries(3):
+            stats = list(iter_employee_stats(self.START_DATE, self.END_DATE))
+
+        self.assertEqual(len(stats), 5)
+        for row in stats:
+            self.assertEqual(row['total_days'], 4)
+            self.assertEqual(row['present_days'], 2)
+            self.assertEqual(row['late_days'], 1)
+            self.assertEqual(row['absent_days'], 1)
+
+    def test_window_outside_the_records(self):
+        self.add_employees(1)
+        end_date = self.START_DATE - timedelta(days=1)
+        stats = list(iter_employee_stats(end_date - timedelta(days=10), end_date))
+        self.assertEqual(stats[0]['total_days'], 0)
+        self.assertEqual(stats[0]['attendance_percentage'], 0)
+
+
+@override_settings(CACHES=NO_CACHE)
+class RollupMaintenanceTests(TestCase):
+    """Every write path must leave the rollups as rebuild() would"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.engineering = Department.objects.create(name='Engineering')
+        cls.sales = Department.objects.create(name='Sales')
+        cls.employees = []
+        for number in range(2):
+            employee = Employee.objects.create(
+                first_name='Test',
+                last_name=f'Employee{number}',
+                email=f'employee{number}@example.com',
+                phone_number='+1234567890',
+                address='1 Main St',
+                department=cls.engineering,
+                date_joined=date(2023, 1, 1),
+                employee_id=f'EMP{number:03d}',
+            )
+            cls.employees.append(employee)
+            for day, status in [(30, 'present'), (31, 'late')]:
+                Attendance.objects.create(
+                    employee=employee, date=date(2024, 1, day), status=status,
+                    check_in_time=time(9), check_out_time=time(17)
+                )
+            Attendance.objects.create(employee=employee, date=date(2024, 2, 1), status='absent')
+
+    def rollup_rows(self):
+        return (
+            sorted(AttendanceDailyRollup.objects.values_list('date', 'department_id', 'status', 'count')),
+            sorted(EmployeeMonthlyRollup.objects.values_list(
+                'employee_id', 'month', 'status', 'count', 'worked_days', 'worked_seconds'
+            )),
+        )
+
+    def assertRollupsCurrent(self):
+        maintained = self.rollup_rows()
+        rollups.rebuild()
+        self.assertEqual(maintained, self.rollup_rows())
+
+    def test_create(self):
+        self.assertRollupsCurrent()
+        Attendance.objects.create(
+            employee=self.employees[0], date=date(2024, 2, 2), status='present',
+            check_in_time='22:00', check_out_time='06:30'
+        )
+        self.assertRollupsCurrent()
+
+    def test_update(self):
+        attendance = Attendance.objects.filter(status='present').first()
+        attendance.notes = 'Moves no count'
+        attendance.save()
+        self.assertRollupsCurrent()
+
+        attendance.check_out_time = time(18, 15)
+        attendance.save(update_fields=['check_out_time'])
+        self.assertRollupsCurrent()
+
+        # Across a month boundary
+        attendance.date = date(2024, 2, 5)
+        attendance.save()
+        self.assertRollupsCurrent()
+
+    def test_status_change(self):
+        attendance = Attendance.objects.filter(status='late').first()
+        attendance.status = 'half_day'
+        attendance.check_out_time = None
+        attendance.save()
+        self.assertRollupsCurrent()
+
+    def test_delete(self):
+        Attendance.objects.filter(status='present').first().delete()
+        self.assertRollupsCurrent()
+        Attendance.objects.filter(date=date(2024, 1, 31)).delete()
+        self.assertRollupsCurrent()
+
+    def test_department_move(self):
+        employee, other = self.employees
+        employee.department = self.sales
+        employee.save()
+        self.assertRollupsCurrent()
+
+        other.department_id = self.sales.pk
+        other.save(update_fields=['department_id'])
+        self.assertRollupsCurrent()
+
+        Employee.objects.filter(pk=employee.pk).update(department=self.engineering)
+        self.assertRollupsCurrent()
+
+    def test_queryset_update(self):
+        Attendance.objects.filter(date=date(2024, 1, 30)).update(status='late')
+        self.assertRollupsCurrent()
+        Attendance.objects.filter(date=date(2024, 2, 1)).update(check_in_time=time(8), check_out_time=time(12))
+        self.assertRollupsCurrent()
+
+        rows = list(Attendance.objects.filter(date=date(2024, 1, 31)))
+        for row in rows:
+            row.status = 'present'
+            row.check_in_time = time(10)
+        Attendance.objects.bulk_update(rows, ['status', 'check_in_time'])
+        self.assertRollupsCurrent()
+
+    def test_bulk_create(self):
+        Attendance.objects.bulk_create([
+            Attendance(
+                employee=employee, date=date(2024, 2, 2), status='present',
+                check_in_time=time(9), check_out_time=time(17, 30)
+            )
+            for employee in self.employees
+        ])
+        self.assertRollupsCurrent()
+
+
+@override_settings(CACHES=NO_CACHE)
+class HoursWorkedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Engineering')
+        cls.employee = Employee.objects.create(
+            first_name='Test',
+            last_name='Employee',
+            email='employee@example.com',
+            phone_number='+1234567890',
+            address='1 Main St',
+            department=department,
+            date_joined=date(2023, 1, 1),
+            employee_id='EMP001',
+        )
+
+    def add(self, day, check_in_time=None, check_out_time=None, status='present'):
+        return Attendance.objects.create(
+            employee=self.employee, date=day, status=status,
+            check_in_time=check_in_time, check_out_time=check_out_time
+        )
+
+    def test_annotation_matches_the_property(self):
+        shifts = {
+            'day': self.add(date(2024, 1, 2), time(9, 0), time(17, 30)),
+            'overnight': self.add(date(2024, 1, 3), time(22, 0), time(6, 0)),
+            'no_check_out': self.add(date(2024, 1, 4), time(9, 0)),
+            'no_times': self.add(date(2024, 1, 5), status='absent'),
+        }
+        annotated = dict(Attendance.objects.with_hours_worked().values_list('id', 'hours_worked'))
+
+        self.assertAlmostEqual(annotated[shifts['day'].pk], 8.5)
+        self.assertAlmostEqual(annotated[shifts['overnight'].pk], 8.0)
+        self.assertIsNone(annotated[shifts['no_check_out'].pk])
+        self.assertIsNone(annotated[shifts['no_times'].pk])
+        for attendance in shifts.values():
+            if attendance.hours_worked is None:
+                self.assertIsNone(annotated[attendance.pk])
+            else:
+                self.assertAlmostEqual(annotated[attendance.pk], attendance.hours_worked)
+
+    def test_stats_hours_combine_rollup_months_and_edges(self):
+        # January 20 - March 10: February from the monthly rollup, the
+        # January and March days from Attendance
+        self.add(date(2024, 1, 25), time(9, 0), time(17, 0))
+        february = self.add(date(2024, 2, 5), time(22, 0), time(6, 0))
+        self.add(date(2024, 2, 6), time(9, 0))
+        self.add(date(2024, 3, 4), time(8, 0), time(12, 30))
+        # Outside the window
+        self.add(date(2024, 3, 20), time(9, 0), time(17, 0))
+
+        stats = employee_stats(self.employee, date(2024, 1, 20), date(2024, 3, 10))
+        self.assertEqual(stats['total_days'], 4)
+        self.assertEqual(stats['total_hours'], 20.5)
+        self.assertEqual(stats['average_hours'], round(20.5 / 3, 2))
+
+        # Check-time edits keep the rollup's hours current
+        february.check_out_time = time(7, 0)
+        february.save()
+        stats = employee_stats(self.employee, date(2024, 1, 20), date(2024, 3, 10))
+        self.assertEqual(stats['total_hours'], 21.5)
+
+    def test_stats_without_check_times(self):
+        self.add(date(2024, 2, 5), status='absent')
+        stats = employee_stats(self.employee, date(2024, 2, 1), date(2024, 2, 29))
+        self.assertEqual(stats['total_days'], 1)
+        self.assertEqual(stats['total_hours'], 0.0)
+        self.assertIsNone(stats['average_hours'])
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Engineering')
+        cls.employee = Employee.objects.create(
+            first_name='Test',
+            last_name='Employee',
+            email='employee@example.com',
+            phone_number='+1234567890',
+            address='1 Main St',
+            department=department,
+            date_joined=date(2023, 1, 1),
+            employee_id='EMP001',
+        )
+        for day in (1, 2, 3):
+            Attendance.objects.create(employee=cls.employee, date=date(2024, 1, day), status='present')
+        cls.user = get_user_model().objects.create_user('conditional', password='x')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('attendance:attendance-list-create')
+
+    def etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_unchanged_table_is_not_modified(self):
+        etag = self.etag()
+        # Answered from the cached generations, without touching the table
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_update_changes_the_etag(self):
+        etag = self.etag()
+        attendance = Attendance.objects.first()
+        attendance.notes = 'Left early'
+        with self.captureOnCommitCallbacks(execute=True):
+            attendance.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_queryset_update_changes_the_etag(self):
+        etag = self.etag()
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.filter(date=date(2024, 1, 1)).update(notes='Remote')
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_delete_changes_the_etag(self):
+        etag = self.etag()
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.first().delete()
+        second = self.etag()
+        self.assertNotEqual(second, etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.filter(date=date(2024, 1, 2)).delete()
+        self.assertNotEqual(self.etag(), second)
+
+    def test_related_model_change_changes_the_etag(self):
+        # The list embeds employee names
+        etag = self.etag()
+        self.employee.last_name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.save()
+        self.assertNotEqual(self.etag(), etag)
+
+
+@override_settings(CACHES=NO_CACHE)
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Engineering')
+        # Three records on every date, so pages split ties on date
+        for number in range(3):
+            employee = Employee.objects.create(
+                first_name='Test',
+                last_name=f'Employee{number}',
+                email=f'employee{number}@example.com',
+                phone_number='+1234567890',
+                address='1 Main St',
+                department=department,
+                date_joined=date(2023, 1, 1),
+                employee_id=f'EMP{number:03d}',
+            )
+            for day in range(1, 16):
+                Attendance.objects.create(employee=employee, date=date(2024, 1, day), status='present')
+        cls.user = get_user_model().objects.create_user('keyset', password='x')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('attendance:attendance-list-create')
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def cursor(self, position, reverse=False):
+        token = json.dumps({'p': position, 'r': int(reverse)})
+        return base64.urlsafe_b64encode(token.encode()).decode()
+
+    def test_pages_forward_and_back(self):
+        expected = list(Attendance.objects.order_by('-date', '-id').values_list('id', flat=True))
+
+        pages = []
+        page = self.get(self.url, cursor='')
+        self.assertIsNone(page['previous'])
+        while True:
+            pages.append([row['id'] for row in page['results']])
+            if not page['next']:
+                break
+            page = self.get(page['next'])
+        self.assertEqual([len(ids) for ids in pages], [20, 20, 5])
+        self.assertEqual([pk for ids in pages for pk in ids], expected)
+
+        # Back from the last page through the previous links
+        back = []
+        while page['previous']:
+            page = self.get(page['previous'])
+            back.insert(0, [row['id'] for row in page['results']])
+        self.assertEqual(back, pages[:-1])
+
+    def test_ties_on_date_split_on_id(self):
+        # Start inside January 10th: only the lower ids of that date follow
+        tied = list(Attendance.objects.filter(date=date(2024, 1, 10)).order_by('-id').values_list('id', flat=True))
+        page = self.get(self.url, cursor=self.cursor(['2024-01-10', tied[0]]))
+        self.assertEqual([row['id'] for row in page['results'][:2]], tied[1:])
+        self.assertEqual(page['results'][2]['date'], '2024-01-09')
+
+    def test_malformed_and_tampered_cursors_are_not_found(self):
+        for cursor in [
+            'not-a-cursor',
+            base64.urlsafe_b64encode(b'not json').decode(),
+            base64.urlsafe_b64encode(b'{"r": 0}').decode(),
+            self.cursor(['2024-01-10']),
+            self.cursor('2024-01-10'),
+            self.cursor(['notadate', 1]),
+            self.cursor(['2024-02-30', 1]),
+            self.cursor(['2024-01-10', 'x']),
+            self.cursor(['2024-01-10', None]),
+            self.cursor(['2024-01-10', [1]]),
+        ] + (
+            # Out of the id column's range, where the backend has one
+            [self.cursor(['2024-01-10', 10 ** 30])]
+            if connection.ops.integer_field_range(Attendance._meta.pk.get_internal_type()) != (None, None) else []
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json()['detail'], 'Invalid cursor')
+
+
+@override_settings(CACHES=NO_CACHE)
+class FastListSerializerTests(TestCase):
+    """AttendanceFastSerializer must render what AttendanceSerializer does"""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Engineering')
+        employee = Employee.objects.create(
+            first_name='Zoë',
+            last_name="O'Brien",
+            email='employee@example.com',
+            phone_number='+1234567890',
+            address='1 Main St',
+            department=department,
+            date_joined=date(2023, 1, 1),
+            employee_id='EMP001',
+        )
+        Attendance.objects.create(
+            employee=employee, date=date(2024, 1, 2), status='present',
+            check_in_time=time(8, 59, 30), check_out_time=time(17, 45), notes='Released at 17:45'
+        )
+        # Overnight, fractional hours
+        Attendance.objects.create(
+            employee=employee, date=date(2024, 1, 3), status='late',
+            check_in_time=time(22, 10), check_out_time=time(6, 5)
+        )
+        # No check times, no notes
+        Attendance.objects.create(employee=employee, date=date(2024, 2, 29), status='absent')
+        cls.user = get_user_model().objects.create_user('fast', password='x')
+
+    def test_same_rendering(self):
+        queryset = AttendanceListCreateView.queryset.order_by('pk')
+        fast = AttendanceFastSerializer(AttendanceFastSerializer.values(queryset)).data
+        model = AttendanceSerializer(queryset, many=True).data
+
+        self.assertEqual(len(fast), 3)
+        self.assertEqual(JSONRenderer().render(fast), JSONRenderer().render(model))
+
+    def test_list_endpoint_matches(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        results = client.get(reverse('attendance:attendance-list-create')).json()['results']
+        model = AttendanceSerializer(AttendanceListCreateView.queryset.all(), many=True).data
+        self.assertEqual(
+            {row['id']: row for row in results},
+            {row['id']: row for row in json.loads(JSONRenderer().render(model))}
+        )
+        self.assertEqual({row['employee_name'] for row in results}, {"Zoë O'Brien"})
+
+
+@override_settings(CACHES=NO_CACHE)
+class BulkCheckInTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Engineering')
+        cls.employees = [
+            Employee.objects.create(
+                first_name='Test',
+                last_name=f'Employee{number}',
+                email=f'employee{number}@example.com',
+                phone_number='+1234567890',
+                address='1 Main St',
+                department=department,
+                date_joined=date(2023, 1, 1),
+                employee_id=f'EMP{number:03d}',
+            )
+            for number in range(3)
+        ]
+        cls.existing = Attendance.objects.create(
+            employee=cls.employees[0], date=date(2024, 1, 2), status='absent'
+        )
+        cls.user = get_user_model().objects.create_user('bulk', password='x')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('attendance:attendance-bulk-create')
+
+    def row(self, employee, day, status='present', **fields):
+        row = {'employee': employee.pk, 'date': f'2024-01-{day:02d}', 'status': status}
+        if status == 'present':
+            row['check_in_time'] = '09:00:00'
+        row.update(fields)
+        return row
+
+    def post(self, rows, query=''):
+        return self.client.post(f'{self.url}{query}', rows, format='json')
+
+    def rollup_rows(self):
+        return (
+            sorted(AttendanceDailyRollup.objects.values_list('date', 'department_id', 'status', 'count')),
+            sorted(EmployeeMonthlyRollup.objects.values_list(
+                'employee_id', 'month', 'status', 'count', 'worked_days', 'worked_seconds'
+            )),
+        )
+
+    def assertRollupsRebuilt(self):
+        rows = self.rollup_rows()
+        rollups.rebuild()
+        self.assertEqual(rows, self.rollup_rows())
+
+    def test_all_valid_is_created(self):
+        rows = [
+            self.row(employee, day, check_out_time='17:30:00')
+            for employee in self.employees for day in (3, 4)
+        ]
+        response = self.post(rows)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'created': 6, 'updated': 0, 'errors': []})
+        self.assertEqual(Attendance.objects.count(), 7)
+        record = Attendance.objects.with_hours_worked().get(employee=self.employees[1], date=date(2024, 1, 4))
+        self.assertEqual(record.hours_worked, 8.5)
+        self.assertRollupsRebuilt()
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        counts = []
+        for days in (range(3, 5), range(5, 25)):
+            rows = [self.row(employee, day) for employee in self.employees for day in days]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post(rows)
+            self.assertEqual(response.status_code, 201)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_some_rejected_is_multi_status(self):
+        rows = [
+            self.row(self.employees[1], 3),
+            self.row(self.employees[1], 4, status='sleeping'),
+            self.row(self.employees[1], 5, status='present', check_in_time=None),
+            {'employee': 0, 'date': '2024-01-03', 'status': 'absent'},
+            self.row(self.employees[1], 3, status='late'),
+            self.row(self.employees[0], 2),
+            'not a row',
+            self.row(self.employees[2], 3, status='absent', notes='Sick'),
+        ]
+        response = self.post(rows)
+
+        self.assertEqual(response.status_code, 207)
+        body = response.json()
+        self.assertEqual((body['created'], body['updated']), (2, 0))
+        self.assertEqual([error['row'] for error in body['errors']], [1, 2, 3, 4, 5, 6])
+        self.assertIn('status', body['errors'][0]['errors'])
+        self.assertIn('employee', body['errors'][2]['errors'])
+        self.assertEqual(body['errors'][3]['errors'], {'non_field_errors': ['Duplicate of row 0 in this batch.']})
+        self.assertEqual(
+            set(Attendance.objects.exclude(pk=self.existing.pk).values_list('employee', 'date', 'status')),
+            {
+                (self.employees[1].pk, date(2024, 1, 3), 'present'),
+                (self.employees[2].pk, date(2024, 1, 3), 'absent'),
+            }
+        )
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.status, 'absent')
+        self.assertRollupsRebuilt()
+
+    def test_none_written_is_bad_request(self):
+        response = self.post([self.row(self.employees[0], 2), self.row(self.employees[1], 3, status='sleeping')])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['created'], 0)
+        self.assertEqual(len(response.json()['errors']), 2)
+        self.assertEqual(Attendance.objects.count(), 1)
+
+    def test_atomic_writes_nothing_on_any_error(self):
+        rows = [self.row(self.employees[1], 3), self.row(self.employees[1], 4, status='sleeping')]
+        response = self.post(rows, '?atomic=true')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['created'], 0)
+        self.assertEqual(Attendance.objects.count(), 1)
+        self.assertRollupsRebuilt()
+
+    def test_upsert_overwrites_existing(self):
+        rows = [
+            self.row(self.employees[0], 2, check_out_time='13:00:00', notes='Half day'),
+            self.row(self.employees[0], 3, status='late'),
+        ]
+        response = self.post(rows, '?upsert=true')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'created': 1, 'updated': 1, 'errors': []})
+        self.existing.refresh_from_db()
+        self.assertEqual(
+            (self.existing.status, self.existing.check_in_time, self.existing.notes),
+            ('present', time(9), 'Half day')
+        )
+        self.assertEqual(Attendance.objects.count(), 2)
+        self.assertRollupsRebuilt()
+
+    def test_ndjson_body(self):
+        rows = [self.row(self.employees[1], 3), self.row(self.employees[2], 3, status='absent')]
+        body = '\n'.join(json.dumps(row) for row in rows) + '\n\n'
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 2)
+
+        response = self.client.post(self.url, '{"employee": 1}\nnot json\n', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('line 2', response.json()['detail'])
+
+    def test_rejects_non_array_and_oversized_bodies(self):
+        response = self.post(self.row(self.employees[1], 3))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+        with mock.patch('attendance.views.MAX_BATCH_ROWS', 2):
+            response = self.post([self.row(self.employees[1], day) for day in (3, 4, 5)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'At most 2 rows per request.'})
+        self.assertEqual(Attendance.objects.count(), 1)
+
+    def test_requires_authentication(self):
+        response = APIClient().post(self.url, [self.row(self.employees[1], 3)], format='json')
+        self.assertIn(response.status_code, (401, 403))
+        self.assertEqual(Attendance.objects.count(), 1)
+
+
+@override_settings(CACHES=NO_CACHE)
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Engineering')
+        cls.employee = Employee.objects.create(
+            first_name='Zoë',
+            last_name="O'Brien",
+            email='employee@example.com',
+            phone_number='+1234567890',
+            address='1 Main St',
+            department=department,
+            date_joined=date(2023, 1, 1),
+            employee_id='EMP001',
+        )
+        Attendance.objects.create(
+            employee=cls.employee, date=date(2024, 1, 2), status='present',
+            check_in_time=time(9), check_out_time=time(17, 45), notes='Left, "early"'
+        )
+        Attendance.objects.create(
+            employee=cls.employee, date=date(2024, 1, 3), status='late',
+            check_in_time=time(22, 10), check_out_time=time(6, 5)
+        )
+        Attendance.objects.create(employee=cls.employee, date=date(2024, 1, 4), status='present', check_in_time=time(9))
+        Attendance.objects.create(employee=cls.employee, date=date(2024, 2, 1), status='absent')
+        cls.user = get_user_model().objects.create_user('export', password='x')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('attendance:attendance-export')
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response, body = self.export(ordering='date')
+
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertRegex(response['Content-Disposition'], r'filename="attendance-\d{8}\.csv"$')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([row['date'] for row in rows], ['2024-01-02', '2024-01-03', '2024-01-04', '2024-02-01'])
+        self.assertEqual(rows[0]['employee_name'], "Zoë O'Brien")
+        self.assertEqual(rows[0]['notes'], 'Left, "early"')
+        self.assertEqual((rows[0]['check_out_time'], rows[0]['hours_worked']), ('17:45:00', '8.75'))
+        self.assertAlmostEqual(float(rows[1]['hours_worked']), 7 + 55 / 60)
+        self.assertEqual((rows[2]['check_out_time'], rows[2]['hours_worked']), ('', ''))
+        self.assertEqual((rows[3]['check_in_time'], rows[3]['hours_worked']), ('', ''))
+
+    def test_ndjson_matches_serializer(self):
+        response, body = self.export(format='ndjson')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in body.splitlines()]
+        expected = {
+            row['id']: row for row in json.loads(JSONRenderer().render(
+                AttendanceSerializer(AttendanceListCreateView.queryset.all(), many=True).data
+            ))
+        }
+        self.assertEqual(len(rows), 4)
+        for row in rows:
+            shared = set(row) & set(expected[row['id']])
+            self.assertEqual({key: row[key] for key in shared}, {key: expected[row['id']][key] for key in shared})
+        self.assertEqual({row['date']: row['hours_worked'] for row in rows}['2024-01-04'], None)
+
+    def test_takes_the_list_filters(self):
+        _, body = self.export(format='ndjson', status='present', ordering='-date')
+        self.assertEqual([json.loads(line)['date'] for line in body.splitlines()], ['2024-01-04', '2024-01-02'])
+
+
+@override_settings(CACHES=NO_CACHE)
+class TimesheetReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.engineering = Department.objects.create(name='Engineering')
+        cls.sales = Department.objects.create(name='Sales')
+
+        def employee(number, department, is_active=True):
+            return Employee.objects.create(
+                first_name='Test',
+                last_name=f'Employee{number}',
+                email=f'employee{number}@example.com',
+                phone_number='+1234567890',
+                address='1 Main St',
+                department=department,
+                date_joined=date(2023, 1, 1),
+                employee_id=f'EMP{number:03d}',
+                is_active=is_active,
+            )
+
+        cls.active = employee(1, cls.engineering)
+        # A leaver with records that month is listed, one without is not
+        cls.leaver = employee(2, cls.engineering, is_active=False)
+        employee(3, cls.engineering, is_active=False)
+        cls.idle = employee(4, cls.sales)
+
+        for day, status, check_in, check_out in [
+            (date(2024, 1, 31), 'present', time(9), time(17)),
+            (date(2024, 2, 1), 'present', time(9), time(17, 30)),
+            (date(2024, 2, 2), 'present', time(9), None),
+            (date(2024, 2, 29), 'late', time(22), time(6)),
+            (date(2024, 3, 1), 'present', time(9), time(17)),
+        ]:
+            Attendance.objects.create(
+                employee=cls.active, date=day, status=status, check_in_time=check_in, check_out_time=check_out
+            )
+        Attendance.objects.create(employee=cls.leaver, date=date(2024, 2, 5), status='absent')
+        cls.user = get_user_model().objects.create_user('timesheet', password='x')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('attendance:timesheet-report')
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_json(self):
+        with CaptureQueriesContext(connection) as queries:
+            report = self.get(month='2024-02').json()
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(report['month'], '2024-02')
+        self.assertEqual(len(report['days']), 29)
+        self.assertEqual((report['days'][0], report['days'][-1]), ('2024-02-01', '2024-02-29'))
+        self.assertEqual(report['status_codes'], {'P': 'present', 'A': 'absent', 'L': 'late', 'H': 'half_day'})
+
+        departments = report['departments']
+        self.assertEqual(departments['name'], ['Engineering', 'Sales'])
+        self.assertEqual(departments['employee_count'], [2, 1])
+        self.assertEqual(departments['total_days'], [4, 0])
+        self.assertEqual(departments['total_hours'], [16.5, 0])
+
+        employees = report['employees']
+        self.assertEqual(employees['employee_id'], ['EMP001', 'EMP002', 'EMP004'])
+        self.assertEqual(employees['department'], [0, 0, 1])
+        self.assertEqual(employees['total_days'], [3, 1, 0])
+        self.assertEqual(employees['present_days'], [2, 0, 0])
+        self.assertEqual(employees['late_days'], [1, 0, 0])
+        self.assertEqual(employees['absent_days'], [0, 1, 0])
+        self.assertEqual(employees['total_hours'], [16.5, 0, 0])
+
+        statuses, hours = employees['status'][0], employees['hours'][0]
+        self.assertEqual((statuses[0], hours[0]), ('P', 8.5))
+        # No check-out: a status but no hours
+        self.assertEqual((statuses[1], hours[1]), ('P', None))
+        # Overnight shift
+        self.assertEqual((statuses[28], hours[28]), ('L', 8.0))
+        self.assertEqual(sum(cell is not None for cell in statuses), 3)
+        self.assertEqual(employees['status'][1][4], 'A')
+        self.assertEqual(employees['status'][2], [None] * 29)
+
+    def test_department_filter(self):
+        report = self.get(month='2024-02', department=self.sales.pk).json()
+        self.assertEqual(report['departments']['name'], ['Sales'])
+        self.assertEqual(report['employees']['employee_id'], ['EMP004'])
+
+    def test_csv(self):
+        response = self.get(month='2024-02', format='csv')
+
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="timesheet-2024-02.csv"')
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:4], ['department', 'employee_id', 'employee_name', '2024-02-01'])
+        self.assertEqual(rows[0][-7:], [
+            '2024-02-29', 'total_days', 'present_days', 'absent_days', 'late_days', 'half_days', 'total_hours'
+        ])
+        self.assertEqual(len(rows), 4)
+
+        first = rows[1]
+        self.assertEqual(first[:3], ['Engineering', 'EMP001', 'Test Employee1'])
+        self.assertEqual(first[3:5], ['8.50', 'P'])
+        self.assertEqual(first[31], '8.00')
+        self.assertEqual(first[32:], ['3', '2', '0', '1', '0', '16.5'])
+        self.assertEqual(rows[2][7], 'A')
+        self.assertEqual(rows[3][3:32], [''] * 29)
+
+    def test_bad_parameters(self):
+        for params in [{'month': '2024-13'}, {'month': 'February'}, {'month': '2024-02', 'department': 'sales'}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.json())
+
+    @override_settings(CACHES=LOCAL_CACHE)
+    def test_cached_report_follows_writes(self):
+        cache.clear()
+        self.assertEqual(self.get(month='2024-02').json()['departments']['total_days'], [4, 0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(employee=self.idle, date=date(2024, 2, 6), status='half_day')
+        report = self.get(month='2024-02').json()
+        self.assertEqual(report['departments']['total_days'], [4, 1])
+        self.assertEqual(report['employees']['status'][2][5], 'H')
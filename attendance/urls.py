@@ -6,10 +6,15 @@ app_name = 'attendance'
 urlpatterns = [
     # Attendance URLs
     path('attendances/', views.AttendanceListCreateView.as_view(), name='attendance-list-create'),
+    path('attendances/bulk/', views.AttendanceBulkCreateView.as_view(), name='attendance-bulk-create'),
+    path('attendances/export/', views.AttendanceExportView.as_view(), name='attendance-export'),
+    path('attendances/analytics/', views.attendance_analytics, name='attendance-analytics'),
     path('attendances/<int:pk>/', views.AttendanceDetailView.as_view(), name='attendance-detail'),
     
     # Analytics URLs
-    path('analytics/', views.attendance_analytics, name='attendance-analytics'),
     path('employees/<int:employee_id>/stats/', views.employee_attendance_stats, name='employee-attendance-stats'),
     path('bulk-stats/', views.bulk_attendance_stats, name='bulk-attendance-stats'),
+    
+    # Reports
+    path('reports/timesheet/', views.timesheet_report, name='timesheet-report'),
 ]
\ No newline at end of file
@@ -1,217 +1,258 @@
 from django.shortcuts import render
 from rest_framework import generics, status, filters
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Q
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
+from django.db.models import Value
+from django.db.models.functions import Concat
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime
 from .models import Attendance
 from employees.models import Employee
+from employee_project import analytics, cache as analytics_cache
+from employee_project.conditional import ConditionalGetMixin, conditional_get
+from employee_project.export import CSVRenderer, ExportMixin, csv_chunks
+from employee_project.fast import FastListMixin
+from employee_project.parsers import NDJSONParser
 
 from .serializers import (
     AttendanceSerializer,
     AttendanceCreateUpdateSerializer,
-    AttendanceStatsSerializer
+    AttendanceFastSerializer
 )
+from .bulk import MAX_BATCH_ROWS, save_rows
+from .filters import AttendanceFilter
+from .reports import monthly_timesheet, timesheet_csv_rows
+from .stats import employee_stats, iter_employee_stats
 
 # Retrieves a list of all attendance records or create a new attendance record
-class AttendanceListCreateView(generics.ListCreateAPIView):
-    queryset = Attendance.objects.select_related('employee').all()
+class AttendanceListCreateView(ConditionalGetMixin, FastListMixin, generics.ListCreateAPIView):
+    queryset = Attendance.objects.select_related('employee').with_hours_worked()
     permission_classes = [IsAuthenticated]
+    etag_depends_on = [analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['employee', 'status', 'date']
+    filterset_class = AttendanceFilter
     search_fields = ['employee__first_name', 'employee__last_name', 'employee__employee_id']
-    ordering_fields = ['date', 'created_at']
+    ordering_fields = ['date', 'created_at', 'hours_worked']
     ordering = ['-date', 'employee__last_name']
+    # Used by ?cursor= keyset pagination, backed by attendance_date_id_idx
+    cursor_ordering = ['-date', '-id']
+    # GET lists render .values() rows; see employee_project.fast
+    fast_serializer_class = AttendanceFastSerializer
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return AttendanceCreateUpdateSerializer
         return AttendanceSerializer
 
+# Streams the filtered attendance list as CSV or NDJSON
+class AttendanceExportView(ExportMixin, AttendanceListCreateView):
+    export_name = 'attendance'
+    export_columns = [
+        ('id', 'id'),
+        ('employee', 'employee_id'),
+        ('employee_id', 'employee__employee_id'),
+        ('employee_name', Concat('employee__first_name', Value(' '), 'employee__last_name')),
+        ('date', 'date'),
+        ('status', 'status'),
+        ('check_in_time', 'check_in_time'),
+        ('check_out_time', 'check_out_time'),
+        ('hours_worked', 'hours_worked'),
+        ('notes', 'notes'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ]
+
 # Retrieves, updates or deletes a specific attendance record
-class AttendanceDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Attendance.objects.select_related('employee').all()
+class AttendanceDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Attendance.objects.select_related('employee').with_hours_worked()
     permission_classes = [IsAuthenticated]
+    etag_depends_on = [analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES]
     
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return AttendanceCreateUpdateSerializer
         return AttendanceSerializer
 
+# Records a batch of attendance rows, e.g. a burst of badge scans
+class AttendanceBulkCreateView(APIView):
+    """
+    Accepts a JSON array or an NDJSON body (Content-Type:
+    application/x-ndjson) of rows shaped like a single attendance POST.
+
+    - `?upsert=true` overwrites existing (employee, date) records instead
+      of rejecting them.
+    - `?atomic=true` writes nothing unless every row is valid.
+
+    Valid rows are inserted and invalid ones reported by position: 201 when
+    every row was written, 207 when some were rejected, 400 when none were.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {'error': 'Expected a JSON array or NDJSON rows.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > MAX_BATCH_ROWS:
+            return Response(
+                {'error': f'At most {MAX_BATCH_ROWS} rows per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        upsert = request.query_params.get('upsert', '').lower() in ('true', '1')
+        atomic = request.query_params.get('atomic', '').lower() in ('true', '1')
+        try:
+            result = save_rows(rows, upsert=upsert, atomic=atomic)
+        except IntegrityError:
+            # Another request recorded one of these (employee, date) pairs
+            # between the duplicate check and the insert
+            return Response(
+                {'error': 'Conflicting attendance records were written concurrently; retry the batch.'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        written = result['created'] + result['updated']
+        if not result['errors']:
+            response_status = status.HTTP_201_CREATED
+        elif written:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(result, status=response_status)
+
 # Gets attendance analytics data
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS)
 def attendance_analytics(request):
-    from datetime import datetime, timedelta
-    from django.db.models import Count
+    """
+    Daily counts, status split and attendance rate for
+    ?start_date=&end_date= (default: the last 30 days). ?sections= picks
+    the sections as on the combined analytics endpoint, e.g.
+    ?sections=daily,status,rate,records,hours adds total_records and the
+    hours worked per department.
+    """
+    try:
+        names = (
+            analytics.parse_sections(request.GET['sections']) if 'sections' in request.GET
+            else analytics.ATTENDANCE_SECTIONS
+        )
+        window = analytics.parse_window(request.GET, timezone.localdate())
+    except ValueError as error:
+        return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Get date range from query params
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    
-    if not start_date:
-        start_date = timezone.now().date() - timedelta(days=30)
-    else:
-        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-    
-    if not end_date:
-        end_date = timezone.now().date()
-    else:
-        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-    
-    # Overall attendance stats
-    total_records = Attendance.objects.filter(
-        date__range=[start_date, end_date]
-    ).count()
-    
-    status_distribution = Attendance.objects.filter(
-        date__range=[start_date, end_date]
-    ).values('status').annotate(count=Count('status'))
-    
-    # Daily attendance count
-    daily_attendance = Attendance.objects.filter(
-        date__range=[start_date, end_date],
-        status='present'
-    ).values('date').annotate(count=Count('id')).order_by('date')
-    
+    return Response(analytics.get_sections(names, window))
 
-    status_distribution = Attendance.objects.filter(
-        date__range=[start_date, end_date]
-    ).values('status').annotate(
-        count=Count('id')
-    ).order_by('status')
-    
-    # Attendance rate 
-    total_possible = Employee.objects.filter(is_active=True).count() * (end_date - start_date).days
-    total_present = Attendance.objects.filter(
-        date__range=[start_date, end_date],
-        status__in=['present', 'late']
-    ).count()
+# Builds one employee's stats payload; None if the employee does not exist
+def employee_stats_payload(employee_id, window):
+    employee = Employee.objects.filter(id=employee_id).first()
+    if employee is None:
+        return None
     
-    attendance_rate = (total_present / total_possible * 100) if total_possible > 0 else 0
-
-
-    return Response({
-        'daily_attendance': [
-            {
-                'date': item['date'].strftime('%Y-%m-%d'),
-                'count': item['count']
-            } for item in daily_attendance
-        ],
-        'status_distribution': list(status_distribution),
-        'attendance_rate': round(attendance_rate, 1),
+    return {
+        'employee_id': employee.employee_id,
+        'employee_name': employee.full_name,
         'date_range': {
-            'start_date': start_date.strftime('%Y-%m-%d'),
-            'end_date': end_date.strftime('%Y-%m-%d')
-        }
-    })
+            'start_date': window.start_date,
+            'end_date': window.end_date
+        },
+        **employee_stats(employee, window.start_date, window.end_date)
+    }
 
-# Gets attendance statistics for a specific employee
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def employee_attendance_stats(request, employee_id):    
-    try:
-        employee = Employee.objects.get(id=employee_id)
-    except Employee.DoesNotExist:
-        return Response({'error': 'Employee not found'}, status=404)
-    
-    # Get date range
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    
-    if not start_date:
-        start_date = timezone.now().date() - timedelta(days=30)
-    else:
-        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-    
-    if not end_date:
-        end_date = timezone.now().date()
-    else:
-        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-    
-    attendances = Attendance.objects.filter(
-        employee=employee,
-        date__range=[start_date, end_date]
+# Builds the stats payload for all employees
+def bulk_stats_payload(window):
+    # Whole months from the monthly rollup, raw rows only for the edges
+    stats_list = analytics_cache.get_or_compute(
+        'bulk_attendance_stats',
+        {'start_date': window.start_date, 'end_date': window.end_date},
+        lambda: list(iter_employee_stats(window.start_date, window.end_date)),
+        depends_on=[analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES]
     )
     
-    total_days = attendances.count()
-    present_days = attendances.filter(status='present').count()
-    absent_days = attendances.filter(status='absent').count()
-    late_days = attendances.filter(status='late').count()
-    half_days = attendances.filter(status='half_day').count()
-    
-    attendance_percentage = (present_days / total_days * 100) if total_days > 0 else 0
-    
-    stats = {
-        'employee_id': employee.employee_id,
-        'employee_name': employee.full_name,
+    return {
         'date_range': {
-            'start_date': start_date,
-            'end_date': end_date
+            'start_date': window.start_date,
+            'end_date': window.end_date
         },
-        'total_days': total_days,
-        'present_days': present_days,
-        'absent_days': absent_days,
-        'late_days': late_days,
-        'half_days': half_days,
-        'attendance_percentage': round(attendance_percentage, 2)
+        'employee_stats': stats_list
     }
+
+# Gets attendance statistics for a specific employee
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_get(analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES)
+def employee_attendance_stats(request, employee_id):
+    # ?start_date=&end_date=, defaulting to the last 30 days
+    try:
+        window = analytics.parse_window(request.GET, timezone.localdate())
+    except ValueError as error:
+        return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
     
+    stats = employee_stats_payload(employee_id, window)
+    if stats is None:
+        return Response({'error': 'Employee not found'}, status=404)
     return Response(stats)
 
 # Gets attendance statistics for all employees
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES)
 def bulk_attendance_stats(request):
-    # Get date range
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
+    # ?start_date=&end_date=, defaulting to the last 30 days
+    try:
+        window = analytics.parse_window(request.GET, timezone.localdate())
+    except ValueError as error:
+        return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
     
-    if not start_date:
-        start_date = timezone.now().date() - timedelta(days=30)
-    else:
-        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+    return Response(bulk_stats_payload(window))
+
+# Gets the monthly timesheet: hours and status per employee and day, by department
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, BrowsableAPIRenderer, CSVRenderer])
+@conditional_get(analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS)
+def timesheet_report(request):
+    """
+    ?month=YYYY-MM (default: the current month) and optional ?department=<id>.
+    JSON is columnar (see attendance.reports.monthly_timesheet); ?format=csv
+    returns one row per employee with a column per day.
+    """
+    month = request.GET.get('month')
+    department_id = request.GET.get('department')
     
-    if not end_date:
-        end_date = timezone.now().date()
-    else:
-        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+    try:
+        if month:
+            month = datetime.strptime(month, '%Y-%m').date()
+        else:
+            month = timezone.now().date().replace(day=1)
+        department_id = int(department_id) if department_id else None
+    except ValueError:
+        return Response(
+            {'error': 'Use ?month=YYYY-MM and a numeric ?department='},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    employees = Employee.objects.filter(is_active=True)
-    stats_list = []
+    report = analytics_cache.get_or_compute(
+        'timesheet_report',
+        {'month': month, 'department': department_id},
+        lambda: monthly_timesheet(month, department_id),
+        depends_on=[analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS]
+    )
     
-    for employee in employees:
-        attendances = Attendance.objects.filter(
-            employee=employee,
-            date__range=[start_date, end_date]
-        )
-        
-        total_days = attendances.count()
-        present_days = attendances.filter(status='present').count()
-        absent_days = attendances.filter(status='absent').count()
-        late_days = attendances.filter(status='late').count()
-        half_days = attendances.filter(status='half_day').count()
-        
-        attendance_percentage = (present_days / total_days * 100) if total_days > 0 else 0
-        
-        stats_list.append({
-            'employee_id': employee.employee_id,
-            'employee_name': employee.full_name,
-            'total_days': total_days,
-            'present_days': present_days,
-            'absent_days': absent_days,
-            'late_days': late_days,
-            'half_days': half_days,
-            'attendance_percentage': round(attendance_percentage, 2)
-        })
+    if request.accepted_renderer.format == 'csv':
+        header, rows = timesheet_csv_rows(report)
+        response = StreamingHttpResponse(csv_chunks(header, rows), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="timesheet-{report["month"]}.csv"'
+        return response
     
-    return Response({
-        'date_range': {
-            'start_date': start_date,
-            'end_date': end_date
-        },
-        'employee_stats': stats_list
-    })
\ No newline at end of file
+    return Response(report)
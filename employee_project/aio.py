@@ -0,0 +1,41 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+
+
+# Bounded pool the async views run ORM work in
+def get_executor():
+    """
+    Each pool thread opens its own database connection, so the pool size
+    caps the connections the async views hold (ASYNC_ORM_WORKERS).
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_ORM_WORKERS,
+            thread_name_prefix='async-orm'
+        )
+    return _executor
+
+
+def _call(func, args, kwargs):
+    # Pool threads never see request_started/request_finished; retire their
+    # connections on the same CONN_MAX_AGE and health-check rules instead
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+# Runs a blocking (ORM) call in the pool; independent calls run concurrently
+async def run_sync(func, *args, **kwargs):
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(), partial(context.run, _call, func, args, kwargs)
+    )
@@ -0,0 +1,249 @@
+import asyncio
+from collections import namedtuple
+from datetime import datetime, timedelta
+from django.db.models import Count, IntegerField, Q, Subquery, Sum
+from attendance.models import Attendance, AttendanceDailyRollup, EmployeeMonthlyRollup
+from attendance.stats import in_date_ranges, round_hours, split_on_months
+from employees.models import Department, Employee, Performance
+from . import cache as analytics_cache
+from .aio import run_sync
+
+# Days covered by an attendance window when no start_date is given
+DEFAULT_WINDOW_DAYS = 30
+
+# Recent joiners are active employees who joined within this many days
+RECENT_JOINER_DAYS = 30
+
+# The dates an analytics request covers; sections read only what they need
+Window = namedtuple('Window', ['start_date', 'end_date', 'today'])
+
+# Statuses counted as attended in the attendance rate
+ATTENDED_STATUSES = ('present', 'late')
+
+# `compute(window)` returns a dict of response keys; windowed aggregates
+# depend on the date range, the others only on today
+Aggregate = namedtuple('Aggregate', ['compute', 'depends_on', 'windowed'])
+
+# A section is the slice of one aggregate's keys a client can ask for
+Section = namedtuple('Section', ['aggregate', 'keys'])
+
+
+# Reads ?start_date=&end_date= (YYYY-MM-DD); raises ValueError on bad input
+def parse_window(params, today, default_days=DEFAULT_WINDOW_DAYS):
+    end_date = params.get('end_date')
+    end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else today
+    start_date = params.get('start_date')
+    start_date = (
+        datetime.strptime(start_date, '%Y-%m-%d').date() if start_date
+        else end_date - timedelta(days=default_days)
+    )
+    if start_date > end_date:
+        raise ValueError('start_date must not be after end_date')
+    return Window(start_date, end_date, today)
+
+
+# Reads ?sections=a,b; raises ValueError naming any unknown section
+def parse_sections(value):
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise ValueError(
+            f"Unknown sections: {', '.join(unknown)}. Available: {', '.join(SECTIONS)}"
+        )
+    return list(dict.fromkeys(names))
+
+
+def headcount(window):
+    return Employee.objects.aggregate(
+        total_employees=Count('pk', filter=Q(is_active=True)),
+        recent_joiners=Count('pk', filter=Q(
+            is_active=True,
+            date_joined__gte=window.today - timedelta(days=RECENT_JOINER_DAYS)
+        ))
+    )
+
+
+def departments(window):
+    return {
+        'department_distribution': list(Department.objects.annotate(
+            employee_count=Count('employees')
+        ).values('name', 'employee_count')),
+    }
+
+
+def performance(window):
+    return {
+        'performance_distribution': list(Performance.objects.values('rating').annotate(
+            count=Count('rating')
+        ).order_by('rating')),
+    }
+
+
+# Daily counts, status split, totals and attendance rate in one query
+def attendance_window(window):
+    """
+    Groups the window's daily rollup rows by (date, status), at most four
+    rows per day, with the active head-count as a scalar subquery on each
+    row; every figure is summed from that one result set.
+    """
+    active = Employee.objects.filter(is_active=True).order_by().values('is_active').annotate(
+        n=Count('pk')
+    ).values('n')
+    rows = AttendanceDailyRollup.objects.filter(
+        date__range=[window.start_date, window.end_date]
+    ).values('date', 'status').annotate(
+        count=Sum('count'),
+        active_employees=Subquery(active, output_field=IntegerField())
+    ).order_by('date', 'status')
+
+    daily = {}
+    statuses = {}
+    active_employees = 0
+    for row in rows:
+        statuses[row['status']] = statuses.get(row['status'], 0) + row['count']
+        if row['status'] == 'present':
+            daily[row['date']] = row['count']
+        active_employees = row['active_employees'] or 0
+
+    total_possible = active_employees * (window.end_date - window.start_date).days
+    total_present = sum(statuses.get(status, 0) for status in ATTENDED_STATUSES)
+    attendance_rate = (total_present / total_possible * 100) if total_possible > 0 else 0.0
+    return {
+        'daily_attendance': [
+            {'date': date.strftime('%Y-%m-%d'), 'count': count}
+            for date, count in daily.items()
+        ],
+        'status_distribution': [
+            {'status': status, 'count': statuses[status]} for status in sorted(statuses)
+        ],
+        'total_records': sum(statuses.values()),
+        'attendance_rate': round(attendance_rate, 1),
+    }
+
+
+# Hours per department: whole months from the monthly rollup, only the
+# partial months at either end from attendance rows. Overall figures are
+# summed from the per-department rows.
+def hours(window):
+    months, edges = split_on_months(window.start_date, window.end_date)
+    totals = {}
+
+    if months:
+        rows = EmployeeMonthlyRollup.objects.filter(month__range=months).values(
+            'employee__department__name'
+        ).annotate(worked_seconds=Sum('worked_seconds'), worked=Sum('worked_days')).order_by()
+        for row in rows:
+            department = totals.setdefault(row['employee__department__name'], [0.0, 0])
+            department[0] += row['worked_seconds'] / 3600
+            department[1] += row['worked']
+    if edges:
+        rows = Attendance.objects.filter(in_date_ranges(edges)).with_hours_worked().values(
+            'employee__department__name'
+        ).annotate(total_hours=Sum('hours_worked'), worked=Count('hours_worked')).order_by()
+        for row in rows:
+            department = totals.setdefault(row['employee__department__name'], [0.0, 0])
+            department[0] += row['total_hours'] or 0.0
+            department[1] += row['worked']
+
+    department_hours = []
+    total_hours = 0.0
+    worked = 0
+    for name in sorted(totals):
+        department_total, department_worked = totals[name]
+        total_hours += department_total
+        worked += department_worked
+        department_hours.append({
+            'department': name,
+            'total_hours': round_hours(department_total),
+            'average_hours': round_hours(department_total / department_worked if department_worked else None)
+        })
+
+    return {
+        'total_hours': round_hours(total_hours),
+        'average_hours': round_hours(total_hours / worked if worked else None),
+        'department_hours': department_hours,
+    }
+
+
+HEADCOUNT = Aggregate(headcount, (analytics_cache.EMPLOYEES,), False)
+DEPARTMENTS = Aggregate(departments, (analytics_cache.DEPARTMENTS, analytics_cache.EMPLOYEES), False)
+PERFORMANCE = Aggregate(performance, (analytics_cache.PERFORMANCES,), False)
+ATTENDANCE_WINDOW = Aggregate(
+    attendance_window, (analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES), True
+)
+HOURS = Aggregate(
+    hours, (analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS), True
+)
+
+SECTIONS = {
+    'headcount': Section(HEADCOUNT, ['total_employees', 'recent_joiners']),
+    'departments': Section(DEPARTMENTS, ['department_distribution']),
+    'performance': Section(PERFORMANCE, ['performance_distribution']),
+    'daily': Section(ATTENDANCE_WINDOW, ['daily_attendance']),
+    'status': Section(ATTENDANCE_WINDOW, ['status_distribution']),
+    'records': Section(ATTENDANCE_WINDOW, ['total_records']),
+    'rate': Section(ATTENDANCE_WINDOW, ['attendance_rate']),
+    'hours': Section(HOURS, ['total_hours', 'average_hours', 'department_hours']),
+}
+
+# Default sections of the employee and attendance analytics responses, the
+# keys those endpoints have always returned; records and hours are opt-in
+EMPLOYEE_SECTIONS = ['headcount', 'departments', 'performance', 'daily', 'status']
+ATTENDANCE_SECTIONS = ['daily', 'status', 'rate']
+
+
+# The distinct aggregates that serve these sections, in first-use order
+def plan(names):
+    return list(dict.fromkeys(SECTIONS[name].aggregate for name in names))
+
+
+# Returns one aggregate's result for the window, from cache when it is current
+def get_aggregate(aggregate, window):
+    params = (
+        {'start_date': window.start_date, 'end_date': window.end_date}
+        if aggregate.windowed else {'today': window.today}
+    )
+    return analytics_cache.get_or_compute(
+        f'aggregate:{aggregate.compute.__name__}',
+        params,
+        lambda: aggregate.compute(window),
+        depends_on=aggregate.depends_on
+    )
+
+
+def _assemble(names, window, results):
+    data = {}
+    for name in names:
+        section = SECTIONS[name]
+        data.update((key, results[section.aggregate][key]) for key in section.keys)
+
+    if any(aggregate.windowed for aggregate in results):
+        data['date_range'] = {
+            'start_date': window.start_date.strftime('%Y-%m-%d'),
+            'end_date': window.end_date.strftime('%Y-%m-%d')
+        }
+    return data
+
+
+# Builds a response from the named sections
+def get_sections(names, window):
+    """
+    Sections backed by the same aggregate share one query: daily, status
+    and rate all come from attendance_window(). Each aggregate is cached on
+    its own, so a new attendance row leaves the head-count, department and
+    performance entries hot. Responses with a windowed section also carry
+    the date_range.
+    """
+    return _assemble(names, window, {
+        aggregate: get_aggregate(aggregate, window) for aggregate in plan(names)
+    })
+
+
+# get_sections() for async views: the aggregates run concurrently, each in
+# a pool thread with its own connection
+async def aget_sections(names, window):
+    aggregates = plan(names)
+    results = await asyncio.gather(*(
+        run_sync(get_aggregate, aggregate, window) for aggregate in aggregates
+    ))
+    return _assemble(names, window, dict(zip(aggregates, results)))
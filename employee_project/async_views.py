@@ -0,0 +1,143 @@
+from functools import wraps
+from django.http import HttpResponseNotAllowed
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from attendance.views import bulk_stats_payload, employee_stats_payload
+from . import analytics, cache as analytics_cache
+from .aio import run_sync
+from .conditional import aconditional_response
+from .dashboard import DEPENDS_ON as DASHBOARD_DEPENDS_ON, aget_dashboard
+
+
+# Runs DRF's authentication, permission and throttle checks for an async view
+class AsyncAccess(APIView):
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer]
+
+
+def _authorize(request, args, kwargs):
+    view = AsyncAccess()
+    view.args = args
+    view.kwargs = kwargs
+    view.headers = view.default_response_headers
+    drf_request = view.initialize_request(request, *args, **kwargs)
+    view.request = drf_request
+    try:
+        view.initial(drf_request, *args, **kwargs)
+    except Exception as exc:
+        return view, drf_request, view.handle_exception(exc)
+    return view, drf_request, None
+
+
+# Async counterpart of @api_view(['GET']) with IsAuthenticated
+def async_api_view(view_func):
+    """
+    DRF views are synchronous, so under ASGI every one of them queues for
+    the single thread sync views share. These run on the event loop; the
+    checks and the queries go to the bounded pool in employee_project.aio,
+    and `view_func` awaits whatever it can run concurrently. Responses are
+    JSON only.
+    """
+    @wraps(view_func)
+    async def wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+
+        view, drf_request, response = await run_sync(_authorize, request, args, kwargs)
+        if response is None:
+            response = await view_func(drf_request, *args, **kwargs)
+        response = view.finalize_response(drf_request, response, *args, **kwargs)
+        return response.render() if isinstance(response, Response) else response
+    return wrapped
+
+
+def _bad_request(error):
+    return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+# Combined analytics; the same parameters as employees.views.employee_analytics
+@async_api_view
+async def employee_analytics(request):
+    today = timezone.localdate()
+    try:
+        if 'sections' in request.GET:
+            names = analytics.parse_sections(request.GET['sections'])
+            window = analytics.parse_window(request.GET, today)
+        else:
+            names = analytics.EMPLOYEE_SECTIONS
+            window = analytics.parse_window({}, today, default_days=7)
+    except ValueError as error:
+        return _bad_request(error)
+
+    async def respond():
+        return Response(await analytics.aget_sections(names, window))
+
+    return await aconditional_response(request, [
+        analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS,
+        analytics_cache.PERFORMANCES, analytics_cache.ATTENDANCES
+    ], respond)
+
+
+# The same parameters as attendance.views.attendance_analytics
+@async_api_view
+async def attendance_analytics(request):
+    try:
+        names = (
+            analytics.parse_sections(request.GET['sections']) if 'sections' in request.GET
+            else analytics.ATTENDANCE_SECTIONS
+        )
+        window = analytics.parse_window(request.GET, timezone.localdate())
+    except ValueError as error:
+        return _bad_request(error)
+
+    async def respond():
+        return Response(await analytics.aget_sections(names, window))
+
+    return await aconditional_response(request, [
+        analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS
+    ], respond)
+
+
+@async_api_view
+async def dashboard_data(request):
+    async def respond():
+        return Response(await aget_dashboard(timezone.localdate()))
+
+    return await aconditional_response(request, DASHBOARD_DEPENDS_ON, respond)
+
+
+@async_api_view
+async def employee_attendance_stats(request, employee_id):
+    try:
+        window = analytics.parse_window(request.GET, timezone.localdate())
+    except ValueError as error:
+        return _bad_request(error)
+
+    async def respond():
+        stats = await run_sync(employee_stats_payload, employee_id, window)
+        if stats is None:
+            return Response({'error': 'Employee not found'}, status=404)
+        return Response(stats)
+
+    return await aconditional_response(
+        request, [analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES], respond
+    )
+
+
+@async_api_view
+async def bulk_attendance_stats(request):
+    try:
+        window = analytics.parse_window(request.GET, timezone.localdate())
+    except ValueError as error:
+        return _bad_request(error)
+
+    async def respond():
+        return Response(await run_sync(bulk_stats_payload, window))
+
+    return await aconditional_response(
+        request, [analytics_cache.ATTENDANCES, analytics_cache.EMPLOYEES], respond
+    )
@@ -0,0 +1,169 @@
+import hashlib
+import time
+from functools import partial
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import transaction
+from .metrics import record_cache
+
+# Invalidation is a write to the cache backend, not a message between
+# processes: a bump reaches exactly the processes that read the same
+# backend. With the per-process locmem default, a write handled by one
+# gunicorn worker leaves every other worker serving its stale entries (and
+# ETags, which are built from the same generations), so any multi-process
+# deployment needs a shared CACHE_URL (redis, memcached, or a file cache on
+# one host). Bumps come from the model signals and from the bulk queryset
+# overrides (update, bulk_create) that bypass them; writes made outside
+# the ORM are never seen.
+
+# Models the analytics responses are computed from
+EMPLOYEES = 'employees.Employee'
+DEPARTMENTS = 'employees.Department'
+PERFORMANCES = 'employees.Performance'
+ATTENDANCES = 'attendance.Attendance'
+
+# Generation counters expire like any other entry, so a backend without
+# eviction never keeps them forever; a recreated counter starts from the
+# clock, above every value it had before
+GENERATION_TIMEOUT = 24 * 3600
+
+# Lifetime of the lock on a key being computed, so a worker that dies
+# while holding it only blocks the key until then
+LOCK_TIMEOUT = 30
+
+# How long a second request waits for the lock holder before computing
+# itself, well below the request timeout
+LOCK_WAIT = 2
+LOCK_POLL_INTERVAL = 0.05
+
+_MISSING = object()
+
+
+# System check: locmem outside DEBUG means per-process invalidation
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.DEBUG or not backend.endswith('.LocMemCache'):
+        return []
+    return [checks.Warning(
+        'The default cache is per-process locmem, so analytics cache '
+        'invalidation and ETags only follow writes handled by the same process.',
+        hint='Set CACHE_URL to a shared cache (e.g. rediscache://host:6379/1) '
+             'when more than one process serves requests.',
+        id='employee_project.W001',
+    )]
+
+
+def generation_key(label):
+    return f'analytics:generation:{label}'
+
+
+def modified_key(label):
+    return f'analytics:modified:{label}'
+
+
+# Starting value for a missing generation counter
+def _initial_generation():
+    # Time-based, so a counter that was evicted or flushed never comes back
+    # at a value that earlier cache keys were built from
+    return time.time_ns() // 1000
+
+
+# Marks every cached response computed from these models as stale
+def invalidate(*labels):
+    """
+    Bumps a per-model generation counter. Cache keys embed the generations
+    of the models they depend on, so only responses built from a changed
+    model miss afterwards; the stale entries simply age out.
+
+    Inside a transaction the bump waits for the commit: bumping earlier
+    would let a concurrent reader cache pre-commit data under the new
+    generation.
+    """
+    transaction.on_commit(partial(_bump, labels))
+
+
+def _bump(labels):
+    now = time.time()
+    for label in labels:
+        key = generation_key(label)
+        cache.add(key, _initial_generation(), GENERATION_TIMEOUT)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, _initial_generation(), GENERATION_TIMEOUT)
+    cache.set_many({modified_key(label): now for label in labels}, GENERATION_TIMEOUT)
+
+
+def get_generations(labels):
+    keys = [generation_key(label) for label in labels]
+    generations = cache.get_many(keys)
+    for label, key in zip(labels, keys):
+        if key not in generations:
+            initial = _initial_generation()
+            cache.add(key, initial, GENERATION_TIMEOUT)
+            generations[key] = cache.get(key, initial)
+            # The last change is unknown; now is a safe upper bound
+            cache.add(modified_key(label), time.time(), GENERATION_TIMEOUT)
+    return [generations[key] for key in keys]
+
+
+# Timestamp of the latest change to any of these models, if it is known
+def last_modified(labels):
+    keys = [modified_key(label) for label in labels]
+    timestamps = cache.get_many(keys)
+    if len(timestamps) < len(keys):
+        return None
+    return max(timestamps.values())
+
+
+def make_key(endpoint, params, depends_on):
+    digest = hashlib.md5(repr(sorted(params.items())).encode()).hexdigest()
+    version = '.'.join(str(generation) for generation in get_generations(depends_on))
+    return f'analytics:{endpoint}:{digest}:{version}'
+
+
+# Returns the cached value for (endpoint, params), computing it at most once
+def get_or_compute(endpoint, params, compute, depends_on, timeout=None):
+    """
+    `params` is a dict of everything the result depends on besides the
+    models in `depends_on`. On a miss the first caller takes a lock with
+    cache.add() and computes; concurrent callers for the same key poll for
+    the value instead of running the same aggregates, and compute it
+    themselves if the lock holder has not finished within LOCK_WAIT.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'ANALYTICS_CACHE_TIMEOUT', 300)
+
+    key = make_key(endpoint, params, depends_on)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        record_cache(f'analytics:{endpoint}', True)
+        return value
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        record_cache(f'analytics:{endpoint}', False)
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            # Computed once, by the lock holder
+            record_cache(f'analytics:{endpoint}', True)
+            return value
+        if cache.get(lock_key) is None:
+            # The holder failed; take over instead of waiting out the timeout
+            return get_or_compute(endpoint, params, compute, depends_on, timeout)
+
+    record_cache(f'analytics:{endpoint}', False)
+    return compute()
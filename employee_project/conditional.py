@@ -0,0 +1,118 @@
+import hashlib
+from functools import wraps
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from . import cache as analytics_cache
+from .aio import run_sync
+from .metrics import record_cache
+
+# Methods answered with 304 when the client's copy is current
+CONDITIONAL_METHODS = ('GET', 'HEAD')
+
+
+# Weak validator for the response a GET would produce right now
+def compute_etag(request, depends_on):
+    """
+    Built from the generations of the models the response is read from,
+    plus everything else the body depends on: the path and query string,
+    the negotiated format and the current date (analytics windows default
+    to today). Every ORM write to one of the models bumps its generation
+    (employee_project.cache), deletes and bulk writes included, so telling
+    whether the data changed costs no database query whatever the table
+    sizes.
+    """
+    parts = [
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        timezone.localdate().isoformat(),
+        *(str(generation) for generation in analytics_cache.get_generations(depends_on)),
+    ]
+    return f'W/"{hashlib.md5("|".join(parts).encode()).hexdigest()}"'
+
+
+def _set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Clients may keep the body but must revalidate before reusing it
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def _validators(request, depends_on):
+    etag = compute_etag(request, depends_on)
+    last_modified = analytics_cache.last_modified(depends_on)
+    if last_modified is not None:
+        # HTTP dates have whole-second resolution
+        last_modified = int(last_modified)
+    return etag, last_modified
+
+
+# Returns 304 for a current If-None-Match/If-Modified-Since, else respond()
+def conditional_response(request, depends_on, respond):
+    """
+    The validators are read before respond() runs, so a write that lands
+    while the body is being built shows up as a new ETag on the next
+    request instead of being hidden behind this one.
+    """
+    if request.method not in CONDITIONAL_METHODS:
+        return respond()
+
+    etag, last_modified = _validators(request, depends_on)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    record_cache('conditional_get', not_modified is not None)
+    if not_modified is not None:
+        return _set_validators(not_modified, etag, last_modified)
+
+    response = respond()
+    if response.status_code == 200:
+        _set_validators(response, etag, last_modified)
+    return response
+
+
+# conditional_response() for async views; respond() is a coroutine function
+async def aconditional_response(request, depends_on, respond):
+    if request.method not in CONDITIONAL_METHODS:
+        return await respond()
+
+    etag, last_modified = await run_sync(_validators, request, depends_on)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    record_cache('conditional_get', not_modified is not None)
+    if not_modified is not None:
+        return _set_validators(not_modified, etag, last_modified)
+
+    response = await respond()
+    if response.status_code == 200:
+        _set_validators(response, etag, last_modified)
+    return response
+
+
+# Conditional GET for function views; put it below @api_view so it runs
+# after authentication
+def conditional_get(*depends_on):
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            return conditional_response(request, depends_on, lambda: view(request, *args, **kwargs))
+        return wrapped
+    return decorator
+
+
+# Conditional GET for generic views
+class ConditionalGetMixin:
+    """
+    `etag_depends_on` lists every model the serialized response reads,
+    including related models whose fields are embedded (department names,
+    employee counts). A current client copy gets a 304 before the queryset
+    is built or the serializer runs.
+    """
+    etag_depends_on = ()
+
+    def get(self, request, *args, **kwargs):
+        return conditional_response(
+            request,
+            self.etag_depends_on,
+            lambda: super(ConditionalGetMixin, self).get(request, *args, **kwargs)
+        )
@@ -0,0 +1,61 @@
+from datetime import timedelta
+from . import analytics
+
+# Days covered by the attendance widgets, today included
+ATTENDANCE_DAYS = 7
+
+# Analytics sections behind the dashboard widgets. The figures are the ones
+# /api/v1/analytics/ reports: total_employees counts active employees (the
+# server-rendered tile used to count everyone until the script replaced it
+# with the API's figure), and attendance_rate is attendance_window()'s.
+SECTIONS = ['headcount', 'departments', 'performance', 'daily', 'status', 'rate']
+
+# Models the dashboard payload is computed from
+DEPENDS_ON = list(dict.fromkeys(
+    label for aggregate in analytics.plan(SECTIONS) for label in aggregate.depends_on
+))
+
+
+def get_window(today):
+    return analytics.parse_window({}, today, default_days=ATTENDANCE_DAYS - 1)
+
+
+# Shapes the analytics sections into the dashboard widgets
+def build_dashboard(data, window):
+    """
+    Only presentation happens here: the department count, and a daily
+    line with a point for every day of the window, zero where no one was
+    present.
+    """
+    present = {row['date']: row['count'] for row in data['daily_attendance']}
+    days = [
+        (window.start_date + timedelta(days=offset)).strftime('%Y-%m-%d')
+        for offset in range((window.end_date - window.start_date).days + 1)
+    ]
+
+    return {
+        'stats': {
+            'total_employees': data['total_employees'],
+            'recent_joiners': data['recent_joiners'],
+            'total_departments': len(data['department_distribution']),
+            'attendance_rate': data['attendance_rate'],
+        },
+        'department_distribution': data['department_distribution'],
+        'performance_distribution': data['performance_distribution'],
+        'daily_attendance': [{'date': day, 'count': present.get(day, 0)} for day in days],
+        'status_distribution': [row for row in data['status_distribution'] if row['count']],
+        'date_range': data['date_range'],
+    }
+
+
+# Returns the dashboard payload, shared by the page and the API; each
+# aggregate is cached by analytics.get_sections()
+def get_dashboard(today):
+    window = get_window(today)
+    return build_dashboard(analytics.get_sections(SECTIONS, window), window)
+
+
+# get_dashboard() for async views, with the aggregates run concurrently
+async def aget_dashboard(today):
+    window = get_window(today)
+    return build_dashboard(await analytics.aget_sections(SECTIONS, window), window)
@@ -0,0 +1,64 @@
+from rest_framework.response import Response
+from .export import to_text
+from .profiling import serializing
+
+
+# Renders a DateTimeField value as DRF does (current timezone, UTC as 'Z')
+def render_datetime(value):
+    return None if value is None else to_text(value)
+
+
+# Renders a DateField/TimeField value as DRF does
+def render_isoformat(value):
+    return None if value is None else value.isoformat()
+
+
+# Read-only serializer over .values() rows
+class ValuesSerializer:
+    """
+    Builds the same dicts as a read-only ModelSerializer, but from plain
+    .values() rows: no model instances, no per-field objects, and choice
+    labels from precomputed maps. Subclasses list the .values() lookups in
+    `values_fields` and implement `to_representation(row)`; the key order
+    of the result has to follow the ModelSerializer's field order so the
+    rendered JSON stays byte-identical.
+    """
+    values_fields = ()
+
+    def __init__(self, rows, many=True):
+        self.rows = rows
+        self.many = many
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values(*cls.values_fields)
+
+    @property
+    def data(self):
+        # Not a DRF serializer, so the profiler's .data timer never sees it
+        with serializing():
+            if self.many:
+                return [self.to_representation(row) for row in self.rows]
+            return self.to_representation(self.rows)
+
+    def to_representation(self, row):
+        raise NotImplementedError
+
+
+# Serves GET list requests through a ValuesSerializer
+class FastListMixin:
+    """
+    Filtering, ordering and pagination are unchanged; only the rows are
+    fetched with .values() and rendered by `fast_serializer_class`. Writes
+    and detail views keep their ModelSerializers.
+    """
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.fast_serializer_class
+        rows = serializer_class.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer_class(page).data)
+        return Response(serializer_class(rows).data)
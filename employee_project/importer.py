@@ -0,0 +1,492 @@
+import csv
+import json
+import re
+import time
+from datetime import date, time as time_of_day
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from attendance import rollups
+from attendance.models import Attendance
+from employees import typeahead
+from employees.models import Department, Employee
+from employee_project import cache as analytics_cache
+
+# Rows validated and written per transaction
+DEFAULT_CHUNK_SIZE = 2000
+
+# Errors kept in the summary; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+PHONE_RE = re.compile(r'^\+?1?\d{9,15}$')
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'f', 'no', 'n'}
+ATTENDANCE_STATUSES = {choice for choice, _ in Attendance.STATUS_CHOICES}
+
+
+class RowError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+
+
+# The input stopped being readable (bad encoding, malformed CSV) midway
+class InputError(Exception):
+    """
+    Carries the summary of the run up to that point: the chunks before the
+    one holding the unreadable line are committed, the rest of the input
+    is not imported.
+    """
+
+    def __init__(self, message, summary):
+        super().__init__(message)
+        self.summary = summary
+
+
+# Input readers: each yields one dict per row
+
+def read_csv(lines):
+    """`lines` is any iterable of text lines, e.g. an open file"""
+    yield from csv.DictReader(lines)
+
+
+def read_ndjson(lines):
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield RowError({'non_field_errors': [f'Invalid JSON on line {line_number}: {e}']})
+
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Field parsers for the fast validation path. Each takes the raw value
+# (a string from CSV or any JSON value) and returns the Python value or
+# raises ValueError with the message for the row report
+
+def blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def parse_text(value, max_length=None, required=True):
+    if blank(value):
+        if required:
+            raise ValueError('This field is required.')
+        return ''
+    value = str(value).strip()
+    if max_length and len(value) > max_length:
+        raise ValueError(f'Ensure this field has no more than {max_length} characters.')
+    return value
+
+
+def parse_date(value):
+    if blank(value):
+        raise ValueError('This field is required.')
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError('Date has wrong format. Use one of these formats instead: YYYY-MM-DD.')
+
+
+def parse_time(value):
+    if blank(value):
+        return None
+    try:
+        return time_of_day.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError('Time has wrong format. Use one of these formats instead: hh:mm[:ss[.uuuuuu]].')
+
+
+def parse_bool(value, default):
+    if blank(value):
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError('Must be a valid boolean.')
+
+
+def parse_salary(value):
+    if blank(value):
+        return None
+    try:
+        salary = Decimal(str(value).strip()).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError('A valid number is required.')
+    if abs(salary) >= Decimal('100000000'):
+        raise ValueError('Ensure that there are no more than 10 digits in total.')
+    return salary
+
+
+def parse_fields(row, parsers):
+    """Runs every parser and collects all field errors for the row"""
+    if isinstance(row, RowError):
+        raise row
+    if not isinstance(row, dict):
+        raise RowError({'non_field_errors': ['Expected an object.']})
+
+    values = {}
+    errors = {}
+    for field, parse in parsers.items():
+        try:
+            values[field] = parse(row.get(field))
+        except ValueError as e:
+            errors[field] = [str(e)]
+    if errors:
+        raise RowError(errors)
+    return values
+
+
+# Chunked, set-based importer; subclasses define the row shape and writes
+class Importer:
+    """
+    Rows are validated in Python against lookup maps loaded once per run
+    (departments by name, employees by employee_id), so validating a row
+    costs no queries. Each chunk is written with bulk_create/bulk_update in
+    its own transaction. With `dry_run` nothing is written and every row is
+    still validated.
+    """
+    label = None
+
+    def __init__(self, dry_run=False, update=False, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        self.dry_run = dry_run
+        self.update = update
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.stats = {
+            'rows': 0,
+            'created': 0,
+            'updated': 0,
+            'failed': 0,
+            'errors': [],
+        }
+
+    def run(self, rows):
+        started = time.perf_counter()
+        self.load_maps()
+
+        offset = 0
+        try:
+            for chunk in chunked(rows, self.chunk_size):
+                valid = self.validate_chunk(chunk, offset)
+                if valid and not self.dry_run:
+                    self.write_chunk(valid)
+                self.stats['rows'] += len(chunk)
+                offset += len(chunk)
+
+                if self.progress:
+                    self.progress(self.summary(time.perf_counter() - started))
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise InputError(
+                f'Input unreadable in the chunk starting at row {offset}: {e}',
+                self.summary(time.perf_counter() - started)
+            )
+        finally:
+            # Committed chunks get their rollups and caches brought up to
+            # date however the run ends
+            if not self.dry_run:
+                self.finish()
+        return self.summary(time.perf_counter() - started)
+
+    def summary(self, elapsed):
+        return {
+            'model': self.label,
+            'dry_run': self.dry_run,
+            **self.stats,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(self.stats['rows'] / elapsed) if elapsed else 0,
+        }
+
+    def add_error(self, row, errors):
+        self.stats['failed'] += 1
+        if len(self.stats['errors']) < MAX_REPORTED_ERRORS:
+            self.stats['errors'].append({'row': row, 'errors': errors})
+
+    # Returns (row number, values) pairs for the rows that passed
+    def validate_chunk(self, chunk, offset):
+        valid = []
+        seen = {}
+        for position, raw in enumerate(chunk):
+            row = offset + position
+            try:
+                values = parse_fields(raw, self.parsers)
+                key = self.natural_key(values)
+                if key in seen:
+                    raise RowError({'non_field_errors': [f'Duplicate of row {seen[key]}.']})
+                seen[key] = row
+                self.resolve(values)
+            except RowError as e:
+                self.add_error(row, e.errors)
+                continue
+            valid.append((row, values))
+        return self.check_existing(valid)
+
+    def write_chunk(self, valid):
+        try:
+            with transaction.atomic():
+                created, updated = self.write(valid)
+        except IntegrityError as e:
+            # A concurrent writer took one of the keys; report the chunk
+            for row, _ in valid:
+                self.add_error(row, {'non_field_errors': [f'Chunk rejected: {e}']})
+            return
+        self.stats['created'] += created
+        self.stats['updated'] += updated
+
+    def load_maps(self):
+        pass
+
+    def resolve(self, values):
+        pass
+
+    def check_existing(self, valid):
+        return valid
+
+    def finish(self):
+        pass
+
+
+class EmployeeImporter(Importer):
+    """
+    Columns: employee_id, first_name, last_name, email, phone_number,
+    address, department (name), date_joined, position, salary, is_active.
+    Existing employee_ids are updated with `update`, rejected otherwise.
+    Unknown departments are created with `create_departments`.
+    """
+    label = 'employees'
+    update_fields = [
+        'first_name', 'last_name', 'email', 'phone_number', 'address',
+        'department', 'date_joined', 'position', 'salary', 'is_active', 'updated_at'
+    ]
+
+    parsers = {
+        'employee_id': lambda value: parse_text(value, 20),
+        'first_name': lambda value: parse_text(value, 50),
+        'last_name': lambda value: parse_text(value, 50),
+        'email': lambda value: parse_text(value, 254),
+        'phone_number': lambda value: parse_text(value, 17),
+        'address': parse_text,
+        'department': lambda value: parse_text(value, 100),
+        'date_joined': parse_date,
+        'position': lambda value: parse_text(value, 100, required=False),
+        'salary': parse_salary,
+        'is_active': lambda value: parse_bool(value, True),
+    }
+
+    def __init__(self, create_departments=False, **kwargs):
+        super().__init__(**kwargs)
+        self.create_departments = create_departments
+
+    def natural_key(self, values):
+        return values['employee_id']
+
+    def load_maps(self):
+        self.departments = {
+            name.casefold(): pk for pk, name in Department.objects.values_list('pk', 'name')
+        }
+        self.employees = {}
+        self.emails = {}
+        for pk, employee_id, email, department_id in Employee.objects.values_list(
+            'pk', 'employee_id', 'email', 'department_id'
+        ).iterator(chunk_size=5000):
+            self.employees[employee_id] = (pk, department_id)
+            self.emails[email.lower()] = employee_id
+
+    def resolve(self, values):
+        errors = {}
+        if not PHONE_RE.match(values['phone_number']):
+            errors['phone_number'] = [
+                "Phone number must be entered in the format: '+999999999'. Up to 15 digits allowed."
+            ]
+        try:
+            validate_email(values['email'])
+        except ValidationError:
+            errors['email'] = ['Enter a valid email address.']
+
+        owner = self.emails.get(values['email'].lower())
+        if owner is not None and owner != values['employee_id']:
+            errors['email'] = ['Employee with this email already exists.']
+
+        if values['department'].casefold() not in self.departments and not self.create_departments:
+            errors['department'] = [f'Department "{values["department"]}" does not exist.']
+
+        if values['employee_id'] in self.employees and not self.update:
+            errors['employee_id'] = ['Employee with this employee_id already exists.']
+
+        if errors:
+            raise RowError(errors)
+        # Later rows see this row's email, so in-file duplicates are caught
+        self.emails[values['email'].lower()] = values['employee_id']
+
+    def write_chunk(self, valid):
+        # Created outside the chunk transaction so a rejected chunk cannot
+        # leave ids of rolled-back departments in the map
+        for _, values in valid:
+            key = values['department'].casefold()
+            if key not in self.departments:
+                department, _ = Department.objects.get_or_create(name=values['department'])
+                self.departments[key] = department.pk
+        super().write_chunk(valid)
+
+    def write(self, valid):
+        objs = []
+        updated = 0
+        moved = []
+        for _, values in valid:
+            department_id = self.departments[values.pop('department').casefold()]
+            existing = self.employees.get(values['employee_id'])
+            if existing is not None:
+                updated += 1
+                if existing[1] != department_id:
+                    moved.append(existing[0])
+            objs.append(Employee(department_id=department_id, **values))
+
+        # Existing employee_ids are upserted with INSERT ... ON CONFLICT,
+        # one statement per batch instead of bulk_update()'s CASE per field
+        options = {'batch_size': self.chunk_size}
+        if updated:
+            options.update(
+                update_conflicts=True,
+                unique_fields=['employee_id'],
+                update_fields=self.update_fields,
+            )
+        # Department moves shift the employees' daily attendance rollups
+        with rollups.track_rollups(Attendance.objects.filter(employee_id__in=moved)):
+            Employee.objects.bulk_create(objs, **options)
+
+        # Primary keys are not returned for upserts on every backend, so re-read them
+        keys = dict(Employee.objects.filter(
+            employee_id__in=[employee.employee_id for employee in objs]
+        ).values_list('employee_id', 'pk'))
+        for employee in objs:
+            self.employees[employee.employee_id] = (keys[employee.employee_id], employee.department_id)
+        return len(objs) - updated, updated
+
+    def finish(self):
+        if self.stats['created'] or self.stats['updated']:
+            typeahead.invalidate()
+            analytics_cache.invalidate(analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS)
+
+
+class AttendanceImporter(Importer):
+    """
+    Columns: employee_id (the EMP code), date, status, check_in_time,
+    check_out_time, notes. Existing (employee, date) records are
+    overwritten with `update`, rejected otherwise. Rollup maintenance is
+    deferred during the run and the imported date window rebuilt at the end.
+    """
+    label = 'attendance'
+    update_fields = ['status', 'check_in_time', 'check_out_time', 'notes', 'updated_at']
+
+    parsers = {
+        'employee_id': lambda value: parse_text(value, 20),
+        'date': parse_date,
+        'status': lambda value: parse_text(value, 10),
+        'check_in_time': parse_time,
+        'check_out_time': parse_time,
+        'notes': lambda value: parse_text(value, required=False),
+    }
+
+    def natural_key(self, values):
+        return values['employee_id'], values['date']
+
+    def load_maps(self):
+        self.employees = dict(
+            Employee.objects.values_list('employee_id', 'pk').iterator(chunk_size=5000)
+        )
+        self.first_date = None
+        self.last_date = None
+
+    def resolve(self, values):
+        errors = {}
+        employee = self.employees.get(values['employee_id'])
+        if employee is None:
+            errors['employee_id'] = [f'Employee "{values["employee_id"]}" does not exist.']
+        if values['status'] not in ATTENDANCE_STATUSES:
+            errors['status'] = [f'"{values["status"]}" is not a valid choice.']
+        elif values['status'] == 'present' and not values['check_in_time']:
+            errors['non_field_errors'] = ['Check-in time is required for present status.']
+        if errors:
+            raise RowError(errors)
+        values['employee'] = employee
+
+    # One query for the (employee, date) duplicates in the whole chunk
+    def check_existing(self, valid):
+        if not valid:
+            return valid
+        self.existing = set(Attendance.objects.filter(
+            employee_id__in={values['employee'] for _, values in valid},
+            date__in={values['date'] for _, values in valid}
+        ).values_list('employee_id', 'date'))
+        if self.update:
+            return valid
+
+        remaining = []
+        for row, values in valid:
+            if (values['employee'], values['date']) in self.existing:
+                self.add_error(row, {'non_field_errors': [
+                    'Attendance record already exists for this employee on this date.'
+                ]})
+            else:
+                remaining.append((row, values))
+        return remaining
+
+    def write(self, valid):
+        objs = [
+            Attendance(
+                employee_id=values['employee'],
+                date=values['date'],
+                status=values['status'],
+                check_in_time=values['check_in_time'],
+                check_out_time=values['check_out_time'],
+                notes=values['notes'],
+            )
+            for _, values in valid
+        ]
+        options = {'batch_size': self.chunk_size}
+        if self.update:
+            options.update(
+                update_conflicts=True,
+                unique_fields=['employee', 'date'],
+                update_fields=self.update_fields,
+            )
+        with rollups.deferred():
+            Attendance.objects.bulk_create(objs, **options)
+
+        first_date = min(obj.date for obj in objs)
+        last_date = max(obj.date for obj in objs)
+        self.first_date = first_date if self.first_date is None else min(self.first_date, first_date)
+        self.last_date = last_date if self.last_date is None else max(self.last_date, last_date)
+        updated = sum((obj.employee_id, obj.date) in self.existing for obj in objs)
+        return len(objs) - updated, updated
+
+    def finish(self):
+        if self.first_date:
+            rollups.rebuild(self.first_date, self.last_date)
+
+
+IMPORTERS = {
+    'employees': EmployeeImporter,
+    'attendance': AttendanceImporter,
+}
@@ -0,0 +1,263 @@
+import contextvars
+import os
+import threading
+import time
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR (set in gunicorn.conf.py before
+# this module is imported) makes every worker write its samples to
+# memory-mapped files there; a scrape sums the files of all workers, live
+# and recycled. Without it, metrics are kept in this process only.
+
+REQUESTS = Counter(
+    'http_requests_total',
+    'HTTP requests by route, method and status',
+    ['route', 'method', 'status']
+)
+LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Time from the metrics middleware receiving a request to returning its response',
+    ['route', 'method']
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'SQL queries per request',
+    ['route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float('inf'))
+)
+DB_TIME = Histogram(
+    'http_request_db_duration_seconds',
+    'Time per request spent executing SQL',
+    ['route'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float('inf'))
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Cache lookups by caching layer and result (hit or miss)',
+    ['cache', 'result']
+)
+
+# Connection pools of the pooled backend (employee_project.pooled_postgresql).
+# Gauges are summed over live workers, except utilization, which reports
+# the busiest worker's pool; average wait is
+# rate(db_pool_wait_seconds_total) / rate(db_pool_requests_total).
+POOL_CONNECTIONS = Gauge(
+    'db_pool_connections',
+    'Pooled database connections by state (in_use or idle)',
+    ['alias', 'state'],
+    multiprocess_mode='livesum'
+)
+POOL_MAX_CONNECTIONS = Gauge(
+    'db_pool_max_connections',
+    'Connections the pools may open (max_size per worker)',
+    ['alias'],
+    multiprocess_mode='livesum'
+)
+POOL_WAITING = Gauge(
+    'db_pool_requests_waiting',
+    'Requests queued for a pooled connection',
+    ['alias'],
+    multiprocess_mode='livesum'
+)
+POOL_UTILIZATION = Gauge(
+    'db_pool_utilization',
+    'Share of max_size checked out, in the busiest worker',
+    ['alias'],
+    multiprocess_mode='livemax'
+)
+POOL_REQUESTS = Counter(
+    'db_pool_requests',
+    'Connections requested from the pools',
+    ['alias']
+)
+POOL_WAIT = Counter(
+    'db_pool_wait_seconds',
+    'Time requests spent waiting for a pooled connection',
+    ['alias']
+)
+
+# Seconds between refreshes of a worker's pool metrics
+POOL_UPDATE_INTERVAL = 1.0
+
+# Requests that resolve to no URL pattern share one label value, as do
+# methods outside this set
+UNMATCHED_ROUTE = 'unmatched'
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+# [query count, seconds in SQL] of the request being served
+_queries = contextvars.ContextVar('request_queries', default=None)
+
+
+def record_cache(cache, hit):
+    """
+    Counts one lookup in a caching layer; hit ratio is
+    hits / (hits + misses) of cache_requests_total for that cache.
+    """
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+# True when a database uses the pooled backend
+def pools_configured():
+    return any(
+        database['ENGINE'] == 'employee_project.pooled_postgresql'
+        for database in settings.DATABASES.values()
+    )
+
+
+# Requests and wait time already counted, per alias: psycopg_pool reports totals
+_pool_totals = {}
+_pool_lock = threading.Lock()
+_pool_updated = 0.0
+
+
+# Copies this worker's pool statistics into the pool metrics
+def update_pool_metrics(force=False):
+    """
+    Called from the middleware at most once per POOL_UPDATE_INTERVAL, so
+    every worker's gauges stay current, and on every scrape. A thread that
+    finds another one updating skips instead of waiting.
+    """
+    global _pool_updated
+    now = time.monotonic()
+    if not force and now - _pool_updated < POOL_UPDATE_INTERVAL:
+        return
+    if not _pool_lock.acquire(blocking=False):
+        return
+
+    try:
+        _pool_updated = now
+        from .pooled_postgresql.base import get_pool_stats
+
+        for alias, stats in get_pool_stats().items():
+            POOL_CONNECTIONS.labels(alias, 'in_use').set(stats['in_use'])
+            POOL_CONNECTIONS.labels(alias, 'idle').set(stats.get('pool_available', 0))
+            POOL_MAX_CONNECTIONS.labels(alias).set(stats.get('pool_max', 0))
+            POOL_WAITING.labels(alias).set(stats.get('requests_waiting', 0))
+            POOL_UTILIZATION.labels(alias).set(stats['utilization'])
+
+            requests = stats.get('requests_num', 0)
+            wait_ms = stats.get('requests_wait_ms', 0)
+            counted_requests, counted_wait_ms = _pool_totals.get(alias, (0, 0))
+            POOL_REQUESTS.labels(alias).inc(max(0, requests - counted_requests))
+            POOL_WAIT.labels(alias).inc(max(0, wait_ms - counted_wait_ms) / 1000)
+            _pool_totals[alias] = (requests, wait_ms)
+    finally:
+        _pool_lock.release()
+
+
+# Prometheus text exposition of every worker's metrics
+def render():
+    if pools_configured():
+        update_pool_metrics(force=True)
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+# (route, method, status) -> the labelled metrics a request updates;
+# labels() validates and locks on every call, this is a dict lookup
+_children = {}
+
+
+def _label_children(route, method, status):
+    return (
+        REQUESTS.labels(route, method, status),
+        LATENCY.labels(route, method),
+        DB_QUERIES.labels(route),
+        DB_TIME.labels(route),
+    )
+
+
+# Execute wrapper on every connection; counts while a request is measured
+def _count_query(execute, sql, params, many, context):
+    tally = _queries.get()
+    if tally is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        tally[0] += 1
+        tally[1] += time.perf_counter() - start
+
+
+def _install_wrapper(sender, connection, **kwargs):
+    # Fires on every reconnect of the same DatabaseWrapper
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+# Records latency, status and SQL per route for every request
+class MetricsMiddleware:
+    """
+    Routes are URL patterns (api/v1/employees/<int:pk>/), not paths, so
+    label values stay bounded. Queries run by the async views' ORM pool are
+    counted as well, since the tally is a context variable; their SQL time
+    can overlap, so db time may exceed latency there.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+        connection_created.connect(_install_wrapper, dispatch_uid='request-metrics')
+        from django.db import connections
+        for connection in connections.all(initialized_only=True):
+            _install_wrapper(None, connection)
+        self.pooled = pools_configured()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        tally = [0, 0.0]
+        token = _queries.set(tally)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _queries.reset(token)
+        self.observe(request, response, tally, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        tally = [0, 0.0]
+        token = _queries.set(tally)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _queries.reset(token)
+        self.observe(request, response, tally, time.perf_counter() - start)
+        return response
+
+    def observe(self, request, response, tally, elapsed):
+        match = request.resolver_match
+        key = (
+            match.route if match else UNMATCHED_ROUTE,
+            request.method if request.method in METHODS else 'other',
+            response.status_code
+        )
+        children = _children.get(key)
+        if children is None:
+            children = _children.setdefault(key, _label_children(*key))
+        requests, latency, queries, db_time = children
+        requests.inc()
+        latency.observe(elapsed)
+        queries.observe(tally[0])
+        db_time.observe(tally[1])
+        if self.pooled:
+            update_pool_metrics()
@@ -0,0 +1,208 @@
+import base64
+import json
+from collections import OrderedDict
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Keyset pagination over a unique, indexed ordering such as ('-date', '-id')
+class KeysetPagination(BasePagination):
+    """
+    Pages by filtering on the last row seen instead of OFFSET, so page 5000
+    costs the same index range scan as page 1 and no COUNT(*) is run.
+
+    The ordering comes from `view.cursor_ordering`: columns of the listed
+    model, ending in a unique one. The cursor is an opaque base64 token
+    holding the boundary row's ordering values and the paging direction.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, page_size=None):
+        if page_size:
+            self.page_size = page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(view.cursor_ordering)
+
+        position, reverse = self.decode_cursor(request, queryset.model)
+        ordering = self.reverse_ordering(self.ordering) if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position, ordering))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.first_position = self.position_of(rows[0]) if rows else position
+        self.last_position = self.position_of(rows[-1]) if rows else position
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or self.last_position is None:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    # Builds "strictly after `position`" for a multi-column ordering
+    def after(self, position, ordering):
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def position_of(self, obj):
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            # Rows are model instances, or dicts from the .values() fast path
+            value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+            position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return position
+
+    def reverse_ordering(self, ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    def encode_cursor(self, position, reverse):
+        token = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(token.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    # Returns (position, reverse); raises NotFound for a cursor this
+    # paginator did not produce
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            token = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            position = token['p']
+            reverse = bool(token.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        # Each value goes into a lookup on its column, so parse and range
+        # check it the way the field would; a tampered value is a bad
+        # cursor, not a 500
+        values = []
+        for field, value in zip(self.ordering, position):
+            field = model._meta.get_field(field.lstrip('-'))
+            try:
+                value = field.to_python(value)
+                if value is None:
+                    raise ValidationError('Missing value')
+                field.run_validators(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            values.append(value)
+        return values, reverse
+
+
+# Default pagination for the API
+class ApiPagination(PageNumberPagination):
+    """
+    Page-number pagination with two opt-in modes:
+
+    - `?cursor=` switches to keyset pagination on views that define
+      `cursor_ordering` (an empty value requests the first page).
+    - `?count=false` skips the COUNT(*) and returns only next/previous
+      links, for clients that just scroll forward.
+    """
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        self.counted = True
+
+        if KeysetPagination.cursor_query_param in request.query_params and getattr(view, 'cursor_ordering', None):
+            self.keyset = KeysetPagination(page_size=self.page_size)
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        if request.query_params.get(self.count_query_param, '').lower() in ('false', '0'):
+            self.counted = False
+            return self.paginate_without_count(queryset, request)
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def paginate_without_count(self, queryset, request):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message)
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next_page = len(rows) > page_size
+        self.request = request
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        if not self.counted:
+            return Response(OrderedDict([
+                ('next', self.get_uncounted_link(self.page_number + 1) if self.has_next_page else None),
+                ('previous', self.get_uncounted_link(self.page_number - 1) if self.page_number > 1 else None),
+                ('results', data)
+            ]))
+        return super().get_paginated_response(data)
+
+    def get_uncounted_link(self, page_number):
+        url = self.request.build_absolute_uri()
+        if page_number == 1:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, page_number)
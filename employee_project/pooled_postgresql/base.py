@@ -0,0 +1,98 @@
+import threading
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from psycopg import IsolationLevel
+
+# One pool per database alias per process, created on first use so forked
+# workers never inherit the parent's pool threads
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool_stats():
+    """
+    Per-alias counters from psycopg_pool plus the derived figures worth
+    graphing: connections in use, utilization of max_size, and the mean
+    time a request waited for a connection.
+    """
+    stats = {}
+    for alias, pool in list(_pools.items()):
+        counters = pool.get_stats()
+        in_use = counters.get('pool_size', 0) - counters.get('pool_available', 0)
+        requests = counters.get('requests_num', 0)
+        stats[alias] = {
+            **counters,
+            'in_use': in_use,
+            'utilization': round(in_use / pool.max_size, 3) if pool.max_size else 0,
+            'average_wait_ms': round(counters.get('requests_wait_ms', 0) / requests, 2) if requests else 0,
+        }
+    return stats
+
+
+# PostgreSQL backend that checks connections out of a psycopg 3 pool
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Configured by the POOL entry of the database settings (min_size,
+    max_size, timeout, max_idle, max_lifetime; see psycopg_pool.ConnectionPool).
+    Django's connection lifecycle is unchanged, except that closing a
+    connection returns it to the pool; keep CONN_MAX_AGE at 0 so that
+    happens at the end of every request, and let the pool hold connections.
+    The short-lived connections to the 'postgres' database that migrations
+    and test setup open are not pooled.
+    """
+
+    @property
+    def pooled(self):
+        return self.alias != NO_DB_ALIAS
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None:
+                try:
+                    from psycopg_pool import ConnectionPool
+                except ImportError as error:
+                    raise ImproperlyConfigured(
+                        'DATABASE_POOL needs the psycopg-pool package'
+                    ) from error
+
+                pool = ConnectionPool(
+                    kwargs=conn_params,
+                    check=ConnectionPool.check_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None,
+                    name=self.alias,
+                    open=True,
+                    **self.settings_dict.get('POOL', {})
+                )
+                _pools[self.alias] = pool
+            return pool
+
+    def get_new_connection(self, conn_params):
+        if not self.pooled:
+            return super().get_new_connection(conn_params)
+
+        # As in the stock backend: the isolation level from OPTIONS, else the
+        # server default of READ COMMITTED
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        try:
+            self.isolation_level = IsolationLevel(
+                IsolationLevel.READ_COMMITTED if isolation_level is None else isolation_level
+            )
+        except ValueError:
+            raise ImproperlyConfigured(
+                f'Invalid transaction isolation level {isolation_level} specified. '
+                f'Use one of the psycopg.IsolationLevel values.'
+            )
+
+        connection = self.get_pool(conn_params).getconn()
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if not self.pooled:
+            return super()._close()
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # Rolled back and reset by the pool if left mid-transaction
+                _pools[self.alias].putconn(self.connection)
@@ -0,0 +1,239 @@
+import contextvars
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+logger = logging.getLogger(__name__)
+
+# The profile of the sampled request being served, if any. Context variables
+# follow the request into the async ORM pool (employee_project.aio) and the
+# threads sync views run in under ASGI, so their queries are counted too.
+_current = contextvars.ContextVar('request_profile', default=None)
+_serializing = contextvars.ContextVar('serializing', default=False)
+
+# Collapses IN (%s, %s, ...) so lists of any length share a template
+IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+
+_samples = None
+_samples_lock = threading.Lock()
+
+
+def get_config():
+    config = {
+        # Fraction of requests profiled; 0 disables profiling and installs
+        # none of its hooks
+        'SAMPLE_RATE': 0.01,
+        # Profiles kept per worker process for the metrics endpoint
+        'BUFFER_SIZE': 200,
+        # A query template repeated this often in one request is an N+1
+        'N_PLUS_ONE_THRESHOLD': 5,
+    }
+    config.update(getattr(settings, 'REQUEST_PROFILING', {}))
+    return config
+
+
+def get_samples():
+    with _samples_lock:
+        return list(reversed(_samples)) if _samples is not None else []
+
+
+def _record_sample(sample, size):
+    global _samples
+    with _samples_lock:
+        if _samples is None or _samples.maxlen != size:
+            _samples = deque(_samples or (), maxlen=size)
+        _samples.append(sample)
+
+
+# Queries and serializer time of one sampled request
+class Profile:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_queries = 0
+        self.templates = {}
+
+    def add_query(self, sql, elapsed, serializing):
+        template = IN_LIST.sub('(%s...)', sql)
+        with self.lock:
+            self.query_count += 1
+            self.db_time += elapsed
+            if serializing:
+                self.serializer_queries += 1
+            count, total = self.templates.get(template, (0, 0.0))
+            self.templates[template] = (count + 1, total + elapsed)
+
+    def add_serializer_time(self, elapsed):
+        with self.lock:
+            self.serializer_time += elapsed
+
+    def repeated(self, threshold):
+        return sorted((
+            {'sql': template, 'count': count, 'time_ms': round(total * 1000, 2)}
+            for template, (count, total) in self.templates.items() if count >= threshold
+        ), key=lambda query: -query['count'])
+
+
+# Execute wrapper on every connection; a no-op outside sampled requests
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add_query(sql, time.perf_counter() - start, _serializing.get())
+
+
+def _install_wrapper(sender, connection, **kwargs):
+    # Fires on every reconnect of the same DatabaseWrapper
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+# Times the enclosed serialization into the sampled request's profile
+@contextmanager
+def serializing():
+    """
+    A no-op outside sampled requests and inside an outer serializer, so
+    nested serializers are counted once. Serializers that bypass DRF's
+    .data, like employee_project.fast.ValuesSerializer, use it directly.
+    """
+    profile = _current.get()
+    if profile is None or _serializing.get():
+        yield
+        return
+
+    token = _serializing.set(True)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_serializer_time(time.perf_counter() - start)
+        _serializing.reset(token)
+
+
+# Wraps BaseSerializer.data in serializing(); only installed while
+# profiling is enabled, since the wrapper replaces it for the whole process
+def _install_serializer_timer():
+    from rest_framework.serializers import BaseSerializer
+
+    # .data is where every DRF serializer, list or nested, runs to_representation
+    data = BaseSerializer.data
+    if getattr(data.fget, 'profiled', False):
+        return
+
+    def timed_data(serializer):
+        with serializing():
+            return data.fget(serializer)
+
+    timed_data.profiled = True
+    BaseSerializer.data = property(timed_data)
+
+
+# Samples requests, records their queries and serializer time, and reports
+# them in a Server-Timing header and the per-process ring buffer
+class QueryProfilerMiddleware:
+    """
+    Unsampled requests cost one random() call; sampled ones add a timer
+    per query and per top-level serializer. With SAMPLE_RATE 0 nothing is
+    installed: no execute wrapper, no serializer timer. Repeated query templates, the
+    N+1 signature, are logged as warnings. Queries made while a serializer
+    renders (SerializerMethodField lookups) are counted separately.
+    Settings: REQUEST_PROFILING (see get_config).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+        config = get_config()
+        self.sample_rate = config['SAMPLE_RATE']
+        self.buffer_size = config['BUFFER_SIZE']
+        self.threshold = config['N_PLUS_ONE_THRESHOLD']
+
+        if self.sample_rate <= 0:
+            return
+
+        connection_created.connect(_install_wrapper, dispatch_uid='query-profiler')
+        from django.db import connections
+        for connection in connections.all(initialized_only=True):
+            _install_wrapper(None, connection)
+        _install_serializer_timer()
+
+    def sampled(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        profile = Profile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        profile = Profile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile, time.perf_counter() - start)
+
+    def finish(self, request, response, profile, elapsed):
+        repeated = profile.repeated(self.threshold)
+        match = request.resolver_match
+        sample = {
+            'timestamp': time.time(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 2),
+            'query_count': profile.query_count,
+            'db_time_ms': round(profile.db_time * 1000, 2),
+            'serializer_time_ms': round(profile.serializer_time * 1000, 2),
+            'serializer_queries': profile.serializer_queries,
+            'repeated_queries': repeated,
+        }
+        _record_sample(sample, self.buffer_size)
+
+        if repeated:
+            logger.warning(
+                'Possible N+1 in %s %s: %s',
+                request.method, sample['path'],
+                '; '.join(f"{query['count']}x {query['sql'][:200]}" for query in repeated)
+            )
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={sample["db_time_ms"]};desc="{profile.query_count} queries"',
+            f'serializer;dur={sample["serializer_time_ms"]}',
+            f'total;dur={sample["duration_ms"]}',
+        ])
+        return response
@@ -54,6 +54,8 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "employee_project.metrics.MetricsMiddleware",
+    "employee_project.profiling.QueryProfilerMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -82,18 +84,58 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "employee_project.wsgi.application"
 
-# PostgreSQL
+# PostgreSQL. Connections persist for DATABASE_CONN_MAX_AGE seconds (0 opens
+# one per request) and are checked before reuse. DATABASE_POOL=True instead
+# checks them out of a per-process psycopg pool (employee_project/pooled_postgresql);
+# size it so workers x DATABASE_POOL_MAX_SIZE stays under max_connections.
+DATABASE_POOL = env.bool('DATABASE_POOL', default=False)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'employee_project.pooled_postgresql' if DATABASE_POOL
+            else 'django.db.backends.postgresql'
+        ),
         'NAME': env('DATABASE_NAME'),
         'USER': env('DATABASE_USER'),
         'PASSWORD': env('DATABASE_PASSWORD'),
         'HOST': env('DATABASE_HOST'),
         'PORT': env('DATABASE_PORT'),
+        # The pool holds connections between requests; Django must hand them back
+        'CONN_MAX_AGE': 0 if DATABASE_POOL else env.int('DATABASE_CONN_MAX_AGE', default=60),
+        'CONN_HEALTH_CHECKS': env.bool('DATABASE_CONN_HEALTH_CHECKS', default=True),
+        'OPTIONS': {
+            'connect_timeout': env.int('DATABASE_CONNECT_TIMEOUT', default=5),
+        },
+        'POOL': {
+            'min_size': env.int('DATABASE_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DATABASE_POOL_MAX_SIZE', default=10),
+            # Seconds a request waits for a free connection before failing
+            'timeout': env.float('DATABASE_POOL_TIMEOUT', default=10.0),
+            'max_idle': env.float('DATABASE_POOL_MAX_IDLE', default=300.0),
+            'max_lifetime': env.float('DATABASE_POOL_MAX_LIFETIME', default=3600.0),
+        },
     }
 }
 
+# Cache (locmem per process by default; e.g. CACHE_URL=rediscache://host:6379/1
+# or filecache:///var/tmp/django_cache to share entries between workers).
+# The analytics cache and the API's ETags both read per-model generation
+# counters from here, so run several workers against a shared cache: with
+# locmem a worker does not see writes handled by the others. gunicorn.conf.py
+# refuses locmem with several workers, and `manage.py check` warns about it
+# outside DEBUG (employee_project.W001).
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Seconds an analytics response may be served from cache (employee_project/cache.py)
+ANALYTICS_CACHE_TIMEOUT = env.int('ANALYTICS_CACHE_TIMEOUT', default=300)
+
+# Threads the async analytics views run queries in; each holds its own
+# database connection (employee_project/aio.py)
+ASYNC_ORM_WORKERS = env.int('ASYNC_ORM_WORKERS', default=8)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -144,7 +186,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'employee_project.pagination.ApiPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -153,6 +195,27 @@ REST_FRAMEWORK = {
     ],
 }
 
+# In-process employee typeahead index (employees/typeahead.py). When enabled,
+# employee_search matches prefixes only, not the database search's substrings
+EMPLOYEE_TYPEAHEAD = {
+    'ENABLED': env.bool('EMPLOYEE_TYPEAHEAD_ENABLED', default=False),
+    # Per-worker memory budget; the search falls back to the database above it
+    'MAX_MEMORY_MB': env.int('EMPLOYEE_TYPEAHEAD_MAX_MEMORY_MB', default=64),
+    # Seconds before a rebuild, to pick up writes that bypass signals
+    'MAX_AGE': env.int('EMPLOYEE_TYPEAHEAD_MAX_AGE', default=300),
+}
+
+# Bearer token Prometheus scrapes /metrics with; without one only staff
+# sessions can read it
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+# Sampled per-request query profiling (employee_project/profiling.py)
+REQUEST_PROFILING = {
+    'SAMPLE_RATE': env.float('REQUEST_PROFILING_SAMPLE_RATE', default=0.01),
+    'BUFFER_SIZE': env.int('REQUEST_PROFILING_BUFFER_SIZE', default=200),
+    'N_PLUS_ONE_THRESHOLD': env.int('REQUEST_PROFILING_N_PLUS_ONE_THRESHOLD', default=5),
+}
+
 # JWT
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
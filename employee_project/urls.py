@@ -8,7 +8,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
-from . import views
+from . import async_views, views
 
 # Swagger / OpenAPI configuration
 schema_view = get_schema_view(
@@ -32,8 +32,19 @@ urlpatterns = [
     path('', views.dashboard_view, name='dashboard'),
     
     # API URLs
+    path('api/v1/dashboard/', views.dashboard_data, name='dashboard-data'),
+    path('api/v1/metrics/database/', views.database_metrics, name='database-metrics'),
+    path('api/v1/metrics/requests/', views.request_profiles, name='request-profiles'),
+    path('metrics', views.metrics, name='metrics'),
     path('api/v1/', include('employees.urls')),
     path('api/v1/', include('attendance.urls')),
+
+    # Async variants of the analytics and stats endpoints, for the ASGI app
+    path('api/v1/async/analytics/', async_views.employee_analytics, name='async-employee-analytics'),
+    path('api/v1/async/attendances/analytics/', async_views.attendance_analytics, name='async-attendance-analytics'),
+    path('api/v1/async/dashboard/', async_views.dashboard_data, name='async-dashboard-data'),
+    path('api/v1/async/employees/<int:employee_id>/stats/', async_views.employee_attendance_stats, name='async-employee-attendance-stats'),
+    path('api/v1/async/bulk-stats/', async_views.bulk_attendance_stats, name='async-bulk-attendance-stats'),
     
     # Authentication URLs  
     path('api/v1/auth/token/', csrf_exempt(TokenObtainPairView.as_view()), name='token_obtain_pair'),
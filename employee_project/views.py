@@ -1,22 +1,98 @@
+import hmac
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
-from django.http import HttpResponse
-from employees.models import Employee, Department
+from django.utils import timezone
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from .conditional import conditional_get
+from .dashboard import DEPENDS_ON, get_dashboard
+from .metrics import render as render_metrics
+from .profiling import get_config as get_profiling_config, get_samples
 
 # Serves the dashboard template with data
 def dashboard_view(request):
-    # Get data from the database
-    total_employees = Employee.objects.count()
-    total_departments = Department.objects.count()
-    recent_employees = Employee.objects.filter(
-        date_joined__gte='2025-06-26'  # Last 30 days
-    ).count()
-    
+    """
+    Signed-in users get the whole dashboard payload embedded in the page,
+    so the charts draw without an API round trip. Anonymous visitors only
+    see the head-counts; the script then asks them to authenticate.
+    """
+    dashboard = get_dashboard(timezone.localdate())
+
     context = {
-        'total_employees': total_employees,
-        'total_departments': total_departments,
-        'recent_employees': recent_employees,
-        'server_message': 'Hello from Django server! 🖥️',
-        'current_time': '2025-07-26 12:15:00'  # Could use timezone.now()
+        'stats': dashboard['stats'],
+        'dashboard': dashboard if request.user.is_authenticated else None,
+        'current_time': timezone.now(),
     }
-    
-    return render(request, 'dashboard.html', context)
\ No newline at end of file
+
+    return render(request, 'dashboard.html', context)
+
+
+# Every dashboard widget's data in one response
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_get(*DEPENDS_ON)
+def dashboard_data(request):
+    return Response(get_dashboard(timezone.localdate()))
+
+
+# Connection settings per database, and pool wait time and utilization
+# for those on the pooled backend (this worker process only)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def database_metrics(request):
+    databases = {}
+    pooled = False
+    for alias in connections:
+        settings_dict = connections.settings[alias]
+        pooled = pooled or settings_dict['ENGINE'] == 'employee_project.pooled_postgresql'
+        databases[alias] = {
+            'engine': settings_dict['ENGINE'],
+            'conn_max_age': settings_dict['CONN_MAX_AGE'],
+            'conn_health_checks': settings_dict['CONN_HEALTH_CHECKS'],
+        }
+
+    pools = {}
+    if pooled:
+        from .pooled_postgresql.base import get_pool_stats
+        pools = get_pool_stats()
+
+    return Response({'databases': databases, 'pools': pools})
+
+
+# Sampled request profiles from this worker process, newest first;
+# ?n_plus_one=true keeps only those with repeated queries
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def request_profiles(request):
+    samples = get_samples()
+    if request.GET.get('n_plus_one', '').lower() == 'true':
+        samples = [sample for sample in samples if sample['repeated_queries']]
+
+    return Response({
+        'sample_rate': get_profiling_config()['SAMPLE_RATE'],
+        'count': len(samples),
+        'results': samples,
+    })
+
+
+# Prometheus scrape endpoint, summed over every worker process
+def metrics(request):
+    """
+    Readable with `Authorization: Bearer <METRICS_TOKEN>` (Prometheus'
+    `authorization` scrape setting) or a staff session. Client addresses
+    are not trusted: behind a proxy on the same host every request would
+    come from localhost.
+    """
+    scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    allowed = (
+        settings.METRICS_TOKEN and scheme.lower() == 'bearer'
+        and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+    ) or request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
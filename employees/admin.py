@@ -9,10 +9,14 @@ class DepartmentAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     ordering = ['name']
     
-    # Counts active employees in the department
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_employee_count()
+
+    # Active employees in the department, annotated by get_queryset
     def employee_count(self, obj):
-        return obj.employees.filter(is_active=True).count()
+        return obj.active_employee_count
     employee_count.short_description = 'Active Employees'
+    employee_count.admin_order_field = 'active_employee_count'
 
 
 # Employee admin
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class EmployeesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "employees"
\ No newline at end of file
+    name = "employees"
+
+    def ready(self):
+        # Registers the typeahead invalidation signal handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+import asyncio
+import math
+import threading
+import time
+
+# (endpoint, sync URL name, async URL name)
+ENDPOINTS = [
+    ('analytics', 'employees:employee-analytics', 'async-employee-analytics'),
+    ('attendance', 'attendance:attendance-analytics', 'async-attendance-analytics'),
+    ('dashboard', 'dashboard-data', 'async-dashboard-data'),
+    ('bulk-stats', 'attendance:bulk-attendance-stats', 'async-bulk-attendance-stats'),
+]
+
+# Replaces the analytics cache so every request runs its aggregates
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare latency of the sync analytics views through the WSGI handler '
+        'with their async variants through the ASGI handler, under concurrent load'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Requests per endpoint and path (default: 200)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='Requests in flight at once (default: 16)'
+        )
+        parser.add_argument(
+            '--username',
+            help='User to authenticate as (default: the first active superuser)'
+        )
+        parser.add_argument(
+            '--cached',
+            action='store_true',
+            help='Keep the analytics cache; by default every request computes its aggregates'
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(is_active=True)
+        if options['username']:
+            user = users.filter(username=options['username']).first()
+        else:
+            user = users.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('No such active user; pass --username')
+
+        login = Client()
+        login.force_login(user)
+        cookies = login.cookies
+
+        self.stdout.write(
+            f'{options["requests"]} requests per path, {options["concurrency"]} in flight, '
+            f'cache {"on" if options["cached"] else "off"}'
+        )
+        self.stdout.write(
+            f'{"endpoint":<12} {"wsgi p50":>9} {"wsgi p99":>9} {"wsgi rps":>9} '
+            f'{"asgi p50":>9} {"asgi p99":>9} {"asgi rps":>9}'
+        )
+        with override_settings(**({} if options['cached'] else {'CACHES': NO_CACHE})):
+            for name, sync_name, async_name in ENDPOINTS:
+                sync_times, sync_seconds = self.run_wsgi(
+                    reverse(sync_name), cookies, options['requests'], options['concurrency']
+                )
+                async_times, async_seconds = asyncio.run(self.run_asgi(
+                    reverse(async_name), cookies, options['requests'], options['concurrency']
+                ))
+                self.stdout.write(
+                    f'{name:<12} '
+                    f'{percentile(sync_times, 50):>9.1f} {percentile(sync_times, 99):>9.1f} '
+                    f'{len(sync_times) / sync_seconds:>9.1f} '
+                    f'{percentile(async_times, 50):>9.1f} {percentile(async_times, 99):>9.1f} '
+                    f'{len(async_times) / async_seconds:>9.1f}'
+                )
+        self.stdout.write('Latencies in ms; rps is completed requests per wall-clock second')
+
+    def ensure_ok(self, path, response):
+        if response.status_code != 200:
+            raise CommandError(f'{path} returned {response.status_code}')
+
+    # Sync views through the WSGI handler, one client per worker thread
+    def run_wsgi(self, path, cookies, requests, concurrency):
+        local = threading.local()
+
+        def timed(_):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+                local.client.cookies = cookies
+            start = time.perf_counter()
+            response = local.client.get(path, headers={'Accept': 'application/json'})
+            elapsed = (time.perf_counter() - start) * 1000
+            # The test client skips request_finished, which would do this
+            close_old_connections()
+            self.ensure_ok(path, response)
+            return elapsed
+
+        timed(None)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            start = time.perf_counter()
+            times = list(pool.map(timed, range(requests)))
+            return times, time.perf_counter() - start
+
+    # Async views through the ASGI handler, on one event loop
+    async def run_asgi(self, path, cookies, requests, concurrency):
+        client = AsyncClient()
+        client.cookies = cookies
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path, headers={'Accept': 'application/json'})
+                elapsed = (time.perf_counter() - start) * 1000
+            self.ensure_ok(path, response)
+            return elapsed
+
+        await timed()
+        start = time.perf_counter()
+        times = await asyncio.gather(*(timed() for _ in range(requests)))
+        return times, time.perf_counter() - start
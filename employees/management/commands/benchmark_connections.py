@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.urls import reverse
+import math
+import threading
+import time
+
+POOLED_ENGINE = 'employee_project.pooled_postgresql'
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests/sec of a cheap endpoint with a new database connection '
+        'per request against persistent (or pooled) connections'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Requests per mode (default: 500)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Worker threads, each with its own connection (default: 8)'
+        )
+        parser.add_argument(
+            '--path',
+            help='Path to request (default: the public stats endpoint)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path'] or reverse('employees:public-stats')
+        settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+
+        # The pooled backend always hands connections back to the pool, so
+        # with DATABASE_POOL=True there is one mode; run again without it to
+        # compare against the stock backend
+        if settings_dict['ENGINE'] == POOLED_ENGINE:
+            modes = [('pooled', 0)]
+        else:
+            modes = [('per-request', 0), ('persistent', None)]
+
+        connects = []
+        connects_lock = threading.Lock()
+
+        def count_connect(sender, connection, **kwargs):
+            if connection.alias == DEFAULT_DB_ALIAS:
+                with connects_lock:
+                    connects.append(1)
+
+        self.stdout.write(
+            f'{path}: {options["requests"]} requests per mode, {options["concurrency"]} threads'
+        )
+        self.stdout.write(
+            f'{"mode":<12} {"p50":>7} {"p99":>7} {"rps":>8} {"connects":>9}'
+        )
+        original_max_age = settings_dict['CONN_MAX_AGE']
+        connection_created.connect(count_connect)
+        try:
+            for name, max_age in modes:
+                # Every thread's DatabaseWrapper reads this same dict
+                settings_dict['CONN_MAX_AGE'] = max_age
+                connects.clear()
+                times, seconds = self.run(path, options['requests'], options['concurrency'])
+                self.stdout.write(
+                    f'{name:<12} {percentile(times, 50):>7.2f} {percentile(times, 99):>7.2f} '
+                    f'{len(times) / seconds:>8.1f} {len(connects):>9}'
+                )
+        finally:
+            connection_created.disconnect(count_connect)
+            settings_dict['CONN_MAX_AGE'] = original_max_age
+
+        if modes[0][0] == 'pooled':
+            from employee_project.pooled_postgresql.base import get_pool_stats
+            for alias, stats in get_pool_stats().items():
+                self.stdout.write(
+                    f'pool {alias}: {stats["in_use"]} in use, '
+                    f'average wait {stats["average_wait_ms"]} ms, '
+                    f'{stats.get("connections_num", 0)} connections opened'
+                )
+        self.stdout.write(
+            'Latencies in ms; rps is completed requests per wall-clock second; '
+            'connects counts connections handed to Django (pool checkouts when pooled)'
+        )
+
+    def run(self, path, requests, concurrency):
+        local = threading.local()
+
+        def timed(_):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            start = time.perf_counter()
+            response = local.client.get(path, headers={'Accept': 'application/json'})
+            # The test client skips request_finished, which would do this
+            close_old_connections()
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                raise CommandError(f'{path} returned {response.status_code}')
+            return elapsed
+
+        # Each thread closes its own connection once all of them are idle
+        barrier = threading.Barrier(concurrency)
+
+        def close(_):
+            barrier.wait()
+            connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            start = time.perf_counter()
+            times = list(pool.map(timed, range(requests)))
+            seconds = time.perf_counter() - start
+            list(pool.map(close, range(concurrency)))
+        return times, seconds
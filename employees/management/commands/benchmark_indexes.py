@@ -0,0 +1,158 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from datetime import date, timedelta
+import statistics
+import time
+from employees.models import Department, Employee
+from attendance.models import Attendance
+
+# Indexes added for the hot filter paths; dropped for the "before" run
+BENCHMARKED_INDEXES = [
+    'attendance_date_id_idx',
+    'employee_active_name_idx',
+    'employee_active_joined_idx',
+    'employee_dept_active_idx',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Print EXPLAIN plans and timings for the hot query shapes, with and '
+        'without the composite/partial indexes. Seed first, e.g. '
+        'seed_data --employees 5000'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed runs per query (default: 5)'
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Run without the indexes first, then with them'
+        )
+        parser.add_argument(
+            '--without-indexes',
+            action='store_true',
+            help='Only run with the indexes dropped (rolled back afterwards)'
+        )
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Use EXPLAIN ANALYZE on PostgreSQL'
+        )
+        parser.add_argument(
+            '--no-plans',
+            action='store_true',
+            help='Only print timings'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.stdout.write(
+            f'{connection.vendor}: {Employee.objects.count()} employees, '
+            f'{Attendance.objects.count()} attendance records'
+        )
+
+        results = {}
+        if options['compare'] or options['without_indexes']:
+            results['before'] = self.run_without_indexes()
+        if not options['without_indexes']:
+            results['after'] = self.run_queries('after')
+
+        if len(results) == 2:
+            self.stdout.write(self.style.MIGRATE_HEADING('\nSummary (median ms)'))
+            for name, after in results['after'].items():
+                before = results['before'][name]
+                speedup = before / after if after else 0
+                self.stdout.write(f'{name:<34} {before:>9.2f} {after:>9.2f}   x{speedup:.1f}')
+
+    # Drops the indexes inside a transaction that is always rolled back
+    def run_without_indexes(self):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for name in BENCHMARKED_INDEXES:
+                    cursor.execute(f'DROP INDEX IF EXISTS {connection.ops.quote_name(name)}')
+            results = self.run_queries('before')
+            transaction.set_rollback(True)
+        return results
+
+    def run_queries(self, label):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {label} =='))
+        results = {}
+        for name, build, evaluate in self.query_shapes():
+            queryset = build()
+            timings = []
+            for _ in range(self.options['repeat']):
+                started = time.perf_counter()
+                evaluate(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+
+            median = statistics.median(timings)
+            results[name] = median
+            self.stdout.write(
+                self.style.SUCCESS(f'{name}: median {median:.2f} ms, min {min(timings):.2f} ms')
+            )
+            if not self.options['no_plans']:
+                self.stdout.write(self.explain(queryset))
+        return results
+
+    def explain(self, queryset):
+        if self.options['analyze'] and connection.vendor == 'postgresql':
+            return queryset.explain(analyze=True)
+        return queryset.explain()
+
+    # The query shapes used by attendance/views.py and employees/views.py
+    def query_shapes(self):
+        today = date.today()
+        month_ago = today - timedelta(days=30)
+        department = Department.objects.first()
+
+        return [
+            (
+                'attendance_window_by_employee',
+                lambda: Attendance.objects.filter(
+                    date__range=[month_ago, today]
+                ).values('employee_id').annotate(count=Count('id')).order_by(),
+                list,
+            ),
+            (
+                'attendance_status_list',
+                lambda: Attendance.objects.filter(status='late').order_by('-date')[:20],
+                list,
+            ),
+            (
+                'attendance_keyset_page',
+                lambda: Attendance.objects.filter(date__lt=month_ago).order_by('-date', '-id')[:21],
+                list,
+            ),
+            (
+                'employee_active_count',
+                lambda: Employee.objects.filter(is_active=True),
+                lambda queryset: queryset.count(),
+            ),
+            (
+                'employee_recent_joiners',
+                lambda: Employee.objects.filter(is_active=True, date_joined__gte=month_ago),
+                lambda queryset: queryset.count(),
+            ),
+            (
+                'employee_active_list',
+                lambda: Employee.objects.filter(is_active=True).order_by('last_name', 'first_name')[:20],
+                list,
+            ),
+            (
+                'employee_department_filter',
+                lambda: Employee.objects.filter(department=department, is_active=True)[:20],
+                list,
+            ),
+            (
+                'department_head_count',
+                lambda: Department.objects.with_employee_count(),
+                list,
+            ),
+        ]
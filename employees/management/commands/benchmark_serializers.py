@@ -0,0 +1,99 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+import statistics
+import time
+from employees.models import Employee, Performance
+from employees.serializers import (
+    EmployeeFastListSerializer,
+    EmployeeListSerializer,
+    PerformanceFastSerializer,
+    PerformanceSerializer,
+)
+from attendance.models import Attendance
+from attendance.serializers import AttendanceFastSerializer, AttendanceSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the ModelSerializer and .values() fast paths used by the list '
+        'endpoints: median time to fetch, serialize and render a page, and '
+        'whether both produce the same JSON bytes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1000,
+            help='Rows per rendered page (default: 1000)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed runs per path (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        rows = options['rows']
+        mismatched = []
+
+        self.stdout.write(f'{"endpoint":<12} {"model ms":>10} {"fast ms":>10} {"speedup":>8}  identical')
+        for name, queryset, serializer_class, fast_serializer_class in self.endpoints():
+            queryset = queryset[:rows]
+
+            def model_path():
+                return renderer.render(serializer_class(queryset.all(), many=True).data)
+
+            def fast_path():
+                return renderer.render(fast_serializer_class(fast_serializer_class.values(queryset.all())).data)
+
+            model_ms, model_output = self.time(model_path, options['repeat'])
+            fast_ms, fast_output = self.time(fast_path, options['repeat'])
+            identical = model_output == fast_output
+            if not identical:
+                mismatched.append(name)
+
+            speedup = model_ms / fast_ms if fast_ms else 0
+            style = self.style.SUCCESS if identical else self.style.ERROR
+            self.stdout.write(style(
+                f'{name:<12} {model_ms:>10.2f} {fast_ms:>10.2f} {speedup:>7.1f}x  {"yes" if identical else "NO"}'
+            ))
+
+        if mismatched:
+            raise CommandError(f'Fast serializers differ from the ModelSerializers for: {", ".join(mismatched)}')
+
+    def time(self, render, repeat):
+        timings = []
+        output = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = render()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), output
+
+    # The list views' querysets in their default order
+    def endpoints(self):
+        return [
+            (
+                'attendance',
+                Attendance.objects.select_related('employee').with_hours_worked().order_by(
+                    '-date', 'employee__last_name', 'id'
+                ),
+                AttendanceSerializer,
+                AttendanceFastSerializer,
+            ),
+            (
+                'employees',
+                Employee.objects.select_related('department').order_by('last_name', 'first_name', 'id'),
+                EmployeeListSerializer,
+                EmployeeFastListSerializer,
+            ),
+            (
+                'performance',
+                Performance.objects.select_related('employee').order_by('-review_date', 'id'),
+                PerformanceSerializer,
+                PerformanceFastSerializer,
+            ),
+        ]
@@ -0,0 +1,208 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+import http.client
+import importlib.util
+import math
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+# (endpoint, URL name, authenticated)
+ENDPOINTS = [
+    ('stats', 'employees:public-stats', False),
+    ('employees', 'employees:employee-list-create', True),
+    ('analytics', 'employees:employee-analytics', True),
+    ('dashboard', 'dashboard-data', True),
+    ('async-dash', 'async-dashboard-data', True),
+]
+
+# gunicorn.conf.py names; uvicorn needs the uvicorn-worker package
+WORKER_CLASSES = ['sync', 'gthread', 'uvicorn']
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Start gunicorn with gunicorn.conf.py under each worker class and report '
+        'throughput and latency of the main endpoints over real HTTP'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--worker-classes',
+            default=','.join(WORKER_CLASSES),
+            help=f'Comma-separated worker classes to run (default: {",".join(WORKER_CLASSES)})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Worker processes, fixed so runs compare across machines (default: 2)'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=4,
+            help='Threads per gthread worker (default: 4)'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=300,
+            help='Requests per endpoint (default: 300)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='Keep-alive client connections in flight (default: 16)'
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8765,
+            help='Local port for the server under test (default: 8765)'
+        )
+        parser.add_argument(
+            '--username',
+            help='User to authenticate as (default: the first active superuser)'
+        )
+
+    def handle(self, *args, **options):
+        kinds = [kind.strip() for kind in options['worker_classes'].split(',') if kind.strip()]
+        unknown = [kind for kind in kinds if kind not in WORKER_CLASSES]
+        if unknown:
+            raise CommandError(f"Unknown worker classes: {', '.join(unknown)}")
+
+        users = get_user_model().objects.filter(is_active=True)
+        if options['username']:
+            user = users.filter(username=options['username']).first()
+        else:
+            user = users.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('No such active user; pass --username')
+        token = str(AccessToken.for_user(user))
+
+        self.stdout.write(
+            f'{options["workers"]} workers, {options["requests"]} requests per endpoint, '
+            f'{options["concurrency"]} connections'
+        )
+        self.stdout.write(
+            f'{"class":<8} {"endpoint":<11} {"p50":>7} {"p99":>7} {"rps":>8}'
+        )
+        for kind in kinds:
+            if kind == 'uvicorn' and importlib.util.find_spec('uvicorn_worker') is None:
+                self.stdout.write(f'{kind:<8} skipped: uvicorn-worker is not installed')
+                continue
+
+            server = self.start_server(kind, options)
+            try:
+                totals = []
+                for name, url_name, authenticated in ENDPOINTS:
+                    headers = {'Accept': 'application/json'}
+                    if authenticated:
+                        headers['Authorization'] = f'Bearer {token}'
+                    times, seconds = self.load(
+                        options['port'], reverse(url_name), headers,
+                        options['requests'], options['concurrency']
+                    )
+                    totals.append((len(times), seconds))
+                    self.stdout.write(
+                        f'{kind:<8} {name:<11} {percentile(times, 50):>7.1f} '
+                        f'{percentile(times, 99):>7.1f} {len(times) / seconds:>8.1f}'
+                    )
+                requests = sum(count for count, _ in totals)
+                seconds = sum(elapsed for _, elapsed in totals)
+                self.stdout.write(f'{kind:<8} {"all":<11} {"":>7} {"":>7} {requests / seconds:>8.1f}')
+            finally:
+                self.stop_server(server)
+        self.stdout.write('Latencies in ms; rps is completed requests per wall-clock second')
+
+    def start_server(self, kind, options):
+        env = {
+            **os.environ,
+            'GUNICORN_WORKER_CLASS': kind,
+            'GUNICORN_WORKERS': str(options['workers']),
+            'GUNICORN_THREADS': str(options['threads']),
+            'GUNICORN_BIND': f'127.0.0.1:{options["port"]}',
+            'GUNICORN_ACCESS_LOG': '',
+        }
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', str(settings.BASE_DIR / 'gunicorn.conf.py')],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+        path = reverse('employees:public-stats')
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'gunicorn ({kind}) exited with status {server.returncode}')
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', options['port'], timeout=5)
+                connection.request('GET', path)
+                if connection.getresponse().status == 200:
+                    connection.close()
+                    return server
+            except OSError:
+                pass
+            time.sleep(0.2)
+
+        self.stop_server(server)
+        raise CommandError(f'gunicorn ({kind}) did not answer within 30 seconds')
+
+    def stop_server(self, server):
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=35)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+    # One keep-alive connection per client thread, reopened when the server
+    # closes it (worker recycling, keep-alive timeout)
+    def load(self, port, path, headers, requests, concurrency):
+        local = threading.local()
+
+        def fetch():
+            if getattr(local, 'connection', None) is None:
+                local.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            local.connection.request('GET', path, headers=headers)
+            response = local.connection.getresponse()
+            response.read()
+            if response.will_close:
+                local.connection.close()
+                local.connection = None
+            return response.status
+
+        def timed(_):
+            start = time.perf_counter()
+            try:
+                status = fetch()
+            except (http.client.HTTPException, OSError):
+                local.connection = None
+                status = fetch()
+            elapsed = (time.perf_counter() - start) * 1000
+            if status != 200:
+                raise CommandError(f'{path} returned {status}')
+            return elapsed
+
+        # Warm every worker's caches and connections before timing
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(timed, range(concurrency)))
+            start = time.perf_counter()
+            times = list(pool.map(timed, range(requests)))
+            return times, time.perf_counter() - start
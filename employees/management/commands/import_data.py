@@ -0,0 +1,117 @@
+from django.core.management.base import BaseCommand, CommandError
+import codecs
+import os
+import sys
+import time
+from employee_project.importer import DEFAULT_CHUNK_SIZE, IMPORTERS, READERS, InputError
+
+
+class Command(BaseCommand):
+    help = (
+        'Import employees or attendance from a CSV or NDJSON file in chunks, '
+        'e.g. import_data employees staff.csv --create-departments'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'model',
+            choices=sorted(IMPORTERS),
+            help='What the file contains'
+        )
+        parser.add_argument(
+            'path',
+            help="File to import, or '-' for stdin"
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS),
+            help='Input format (default: from the file extension, else csv)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows validated and written per transaction (default: {DEFAULT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row without writing anything'
+        )
+        parser.add_argument(
+            '--update',
+            action='store_true',
+            help='Overwrite existing employees / attendance records instead of rejecting them'
+        )
+        parser.add_argument(
+            '--create-departments',
+            action='store_true',
+            help='Create departments that do not exist yet (employees only)'
+        )
+        parser.add_argument(
+            '--show-errors',
+            type=int,
+            default=20,
+            help='Row errors to print (default: 20)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format']
+        if not input_format:
+            extension = os.path.splitext(path)[1].lstrip('.').lower()
+            input_format = 'ndjson' if extension in ('ndjson', 'jsonl') else 'csv'
+
+        kwargs = {
+            'dry_run': options['dry_run'],
+            'update': options['update'],
+            'chunk_size': options['chunk_size'],
+            'progress': self.report_progress,
+        }
+        if options['model'] == 'employees':
+            kwargs['create_departments'] = options['create_departments']
+        importer = IMPORTERS[options['model']](**kwargs)
+
+        self.last_report = 0
+        try:
+            stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        except OSError as e:
+            raise CommandError(f'Cannot open {path}: {e}')
+
+        with stream:
+            # utf-8-sig drops the BOM spreadsheet exports start with
+            lines = codecs.iterdecode(stream, 'utf-8-sig')
+            try:
+                summary = importer.run(READERS[input_format](lines))
+            except InputError as e:
+                self.report_progress(e.summary, force=True)
+                raise CommandError(
+                    f'{e}. {e.summary["created"]:,} created and {e.summary["updated"]:,} '
+                    f'updated before it are kept.'
+                )
+
+        self.report_progress(summary, force=True)
+        for error in summary['errors'][:options['show_errors']]:
+            self.stdout.write(self.style.ERROR(f'  row {error["row"]}: {error["errors"]}'))
+
+        mode = 'Validated (dry run)' if summary['dry_run'] else 'Imported'
+        style = self.style.WARNING if summary['failed'] else self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f'{mode} {summary["rows"]:,} {summary["model"]} rows in {summary["seconds"]:.2f}s:\n'
+                f'- {summary["created"]:,} created\n'
+                f'- {summary["updated"]:,} updated\n'
+                f'- {summary["failed"]:,} failed\n'
+                f'- {summary["rows_per_second"]:,} rows/sec'
+            )
+        )
+
+    def report_progress(self, summary, force=False):
+        now = time.perf_counter()
+        if not force and now - self.last_report < 2:
+            return
+        self.last_report = now
+        self.stdout.write(
+            f'  {summary["rows"]:,} rows, {summary["failed"]:,} failed '
+            f'({summary["rows_per_second"]:,} rows/sec)'
+        )
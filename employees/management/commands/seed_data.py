@@ -1,10 +1,34 @@
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import connection, transaction
+from django.utils import timezone
 from faker import Faker
+from bisect import bisect
+from decimal import Decimal
+from itertools import accumulate
 import random
-from datetime import datetime, timedelta, date
+import time as clock
+from datetime import datetime, timedelta, date, time
 from employees.models import Department, Employee, Performance
+from employees import typeahead
 from attendance.models import Attendance
+from attendance import rollups
+from employee_project import cache as analytics_cache
+
+# Attendance status mix used by both seeding modes
+STATUS_CHOICES = ['present', 'absent', 'late', 'half_day']
+STATUS_WEIGHTS = [0.85, 0.05, 0.08, 0.02]
+
+POSITIONS = [
+    'Software Engineer', 'Senior Developer', 'Team Lead', 'Manager',
+    'Analyst', 'Coordinator', 'Specialist', 'Assistant', 'Director',
+    'Consultant', 'Associate', 'Executive', 'Supervisor'
+]
+
+# Columns written by the PostgreSQL COPY path, in order
+ATTENDANCE_COPY_COLUMNS = [
+    'employee_id', 'date', 'status', 'check_in_time', 'check_out_time',
+    'notes', 'created_at', 'updated_at'
+]
 
 
 class Command(BaseCommand):
@@ -22,10 +46,44 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing data before seeding'
         )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Random seed, for reproducible datasets'
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='High-volume mode: batched bulk inserts (COPY on PostgreSQL)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Days of attendance history (default: 60, or 730 with --bulk)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per insert batch in --bulk mode (default: 5000)'
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Use bulk_create instead of COPY on PostgreSQL'
+        )
 
     def handle(self, *args, **options):
         fake = Faker()
         num_employees = options['employees']
+
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+            fake.seed_instance(options['seed'])
+
+        if options['bulk']:
+            return self.handle_bulk(fake, options)
         
         if options['clear']:
             self.stdout.write('Clearing existing data...')
@@ -51,7 +109,7 @@ class Command(BaseCommand):
                 
                 # Creates attendance records
                 self.stdout.write('Creating attendance records...')
-                self.create_attendance_records(fake, employees)
+                self.create_attendance_records(fake, employees, options['days'] or 60)
                 
                 self.stdout.write(
                     self.style.SUCCESS(
@@ -59,7 +117,7 @@ class Command(BaseCommand):
                         f'- {len(departments)} departments\n'
                         f'- {len(employees)} employees\n'
                         f'- Performance records for all employees\n'
-                        f'- Attendance records for the last 60 days'
+                        f'- Attendance records for the last {options["days"] or 60} days'
                     )
                 )
         except Exception as e:
@@ -85,11 +143,7 @@ class Command(BaseCommand):
         return departments
 
     def create_employees(self, fake, departments, num_employees):
-        positions = [
-            'Software Engineer', 'Senior Developer', 'Team Lead', 'Manager',
-            'Analyst', 'Coordinator', 'Specialist', 'Assistant', 'Director',
-            'Consultant', 'Associate', 'Executive', 'Supervisor'
-        ]
+        positions = POSITIONS
         
         employees = []
         for i in range(num_employees):
@@ -149,10 +203,10 @@ class Command(BaseCommand):
                     reviewer=fake.name()
                 )
 
-    def create_attendance_records(self, fake, employees):
-        """Create attendance records for the last 60 days"""
+    def create_attendance_records(self, fake, employees, days=60):
+        """Create attendance records for the last `days` days"""
         end_date = date.today()
-        start_date = end_date - timedelta(days=60)
+        start_date = end_date - timedelta(days=days)
         
         current_date = start_date
         while current_date <= end_date:
@@ -176,9 +230,7 @@ class Command(BaseCommand):
                         continue
                     
                     # Determine status with weights
-                    status_choices = ['present', 'absent', 'late', 'half_day']
-                    status_weights = [0.85, 0.05, 0.08, 0.02] 
-                    status = random.choices(status_choices, weights=status_weights)[0]
+                    status = random.choices(STATUS_CHOICES, weights=STATUS_WEIGHTS)[0]
                     
                     # Generate times based on status
                     check_in_time = None
@@ -221,3 +273,234 @@ class Command(BaseCommand):
                     )
             
             current_date += timedelta(days=1)
+
+    # High-volume mode
+    def handle_bulk(self, fake, options):
+        num_employees = options['employees']
+        days = options['days'] or 730
+        batch_size = options['batch_size']
+        use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+
+        # Rollups are rebuilt once at the end instead of per batch
+        with rollups.deferred():
+            if options['clear']:
+                self.clear_bulk()
+
+            with transaction.atomic():
+                self.stdout.write('Creating departments...')
+                departments = self.create_departments(fake)
+
+                self.stdout.write(f'Creating {num_employees} employees...')
+                employees = self.bulk_create_employees(fake, departments, num_employees, batch_size)
+
+                self.stdout.write('Creating performance records...')
+                performance_count = self.bulk_create_performance_records(fake, employees, batch_size)
+
+                method = 'COPY' if use_copy else 'bulk_create'
+                self.stdout.write(f'Creating attendance records for the last {days} days ({method})...')
+                attendance_count = self.bulk_create_attendance_records(fake, employees, days, batch_size, use_copy)
+
+                self.stdout.write('Rebuilding attendance rollups...')
+                rollups.rebuild()
+
+        # Bulk inserts skip the model signals that normally do this
+        analytics_cache.invalidate(
+            analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS,
+            analytics_cache.PERFORMANCES, analytics_cache.ATTENDANCES
+        )
+        typeahead.invalidate()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Successfully seeded database with:\n'
+                f'- {len(departments)} departments\n'
+                f'- {len(employees)} employees\n'
+                f'- {performance_count} performance records\n'
+                f'- {attendance_count} attendance records for the last {days} days'
+            )
+        )
+
+    def clear_bulk(self):
+        self.stdout.write('Clearing existing data...')
+        # A plain DELETE: the ORM collector would load every attendance row
+        Attendance.objects.all()._raw_delete(Attendance.objects.db)
+        Performance.objects.all().delete()
+        Employee.objects.all().delete()
+        Department.objects.all().delete()
+        self.stdout.write(self.style.SUCCESS('Existing data cleared.'))
+
+    def report_progress(self, label, written, started, force=False):
+        now = clock.perf_counter()
+        if not force and now - self.last_report < 2:
+            return
+        self.last_report = now
+        elapsed = now - started
+        rate = written / elapsed if elapsed else 0
+        self.stdout.write(f'  {written:,} {label} ({rate:,.0f} rows/sec)')
+
+    # Employees from small Faker pools; IDs and emails are unique by construction
+    def bulk_create_employees(self, fake, departments, num_employees, batch_size):
+        first_names = [fake.first_name() for _ in range(1000)]
+        last_names = [fake.last_name() for _ in range(1000)]
+        addresses = [fake.address() for _ in range(500)]
+        phone_numbers = [fake.numerify('+1##########') for _ in range(500)]
+
+        existing_ids = set(Employee.objects.values_list('employee_id', flat=True))
+        width = max(4, len(str(len(existing_ids) + num_employees)))
+        today = date.today()
+
+        employees = []
+        batch = []
+        number = 0
+        started = self.last_report = clock.perf_counter()
+
+        while len(employees) + len(batch) < num_employees:
+            number += 1
+            employee_id = f"EMP{str(number).zfill(width)}"
+            if employee_id in existing_ids:
+                continue
+
+            first_name = random.choice(first_names)
+            last_name = random.choice(last_names)
+            batch.append(Employee(
+                employee_id=employee_id,
+                first_name=first_name,
+                last_name=last_name,
+                email=f"{first_name.lower()}.{last_name.lower()}.{employee_id.lower()}@company.com",
+                phone_number=random.choice(phone_numbers),
+                address=random.choice(addresses),
+                department=random.choice(departments),
+                date_joined=today - timedelta(days=random.randint(0, 730)),
+                position=random.choice(POSITIONS),
+                salary=Decimal(random.randint(3000000, 25000000)) / 100,
+                is_active=random.random() < 0.75
+            ))
+
+            if len(batch) >= batch_size:
+                employees.extend(self.insert_employees(batch))
+                batch = []
+                self.report_progress('employees', len(employees), started)
+
+        if batch:
+            employees.extend(self.insert_employees(batch))
+        self.report_progress('employees', len(employees), started, force=True)
+        return employees
+
+    # Inserts a batch and returns compact (id, date_joined, is_active) rows
+    def insert_employees(self, batch):
+        Employee.objects.bulk_create(batch)
+        return list(
+            Employee.objects.filter(
+                employee_id__in=[employee.employee_id for employee in batch]
+            ).order_by('employee_id').values_list('id', 'date_joined', 'is_active')
+        )
+
+    def bulk_create_performance_records(self, fake, employees, batch_size):
+        comments = [fake.text(max_nb_chars=300) for _ in range(200)]
+        reviewers = [fake.name() for _ in range(200)]
+        today = date.today()
+
+        written = 0
+        batch = []
+        started = self.last_report = clock.perf_counter()
+        for employee_id, _, is_active in employees:
+            if not is_active:
+                continue
+
+            # 1-3 distinct review dates in the past year
+            for offset in random.sample(range(366), random.randint(1, 3)):
+                batch.append(Performance(
+                    employee_id=employee_id,
+                    rating=random.randint(1, 5),
+                    review_date=today - timedelta(days=offset),
+                    comments=random.choice(comments),
+                    reviewer=random.choice(reviewers)
+                ))
+
+            if len(batch) >= batch_size:
+                Performance.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+                self.report_progress('performance records', written, started)
+
+        if batch:
+            Performance.objects.bulk_create(batch)
+            written += len(batch)
+        self.report_progress('performance records', written, started, force=True)
+        return written
+
+    # One row per (employee, weekday) at most, so no duplicate checks are needed
+    def generate_attendance_rows(self, fake, employees, days):
+        notes = [fake.sentence() for _ in range(200)]
+        cumulative_weights = list(accumulate(STATUS_WEIGHTS))
+        active = [(employee_id, date_joined) for employee_id, date_joined, is_active in employees if is_active]
+
+        end_date = date.today()
+        current_date = end_date - timedelta(days=days)
+        while current_date <= end_date:
+            if current_date.weekday() < 5:
+                for employee_id, date_joined in active:
+                    if current_date < date_joined or random.random() < 0.05:
+                        continue
+
+                    status = STATUS_CHOICES[bisect(cumulative_weights, random.random() * cumulative_weights[-1])]
+                    check_in_time = check_out_time = None
+                    if status != 'absent':
+                        check_in_hour = random.randint(9, 11) if status == 'late' else random.randint(8, 9)
+                        check_in_time = time(check_in_hour, random.randint(0, 59))
+                        checkout_hour = random.randint(13, 15) if status == 'half_day' else random.randint(17, 19)
+                        check_out_time = time(checkout_hour, random.randint(0, 59))
+
+                    yield (
+                        employee_id, current_date, status, check_in_time, check_out_time,
+                        random.choice(notes) if random.random() < 0.2 else ''
+                    )
+            current_date += timedelta(days=1)
+
+    def bulk_create_attendance_records(self, fake, employees, days, batch_size, use_copy):
+        rows = self.generate_attendance_rows(fake, employees, days)
+        if use_copy:
+            return self.copy_attendance(rows, batch_size)
+
+        written = 0
+        batch = []
+        started = self.last_report = clock.perf_counter()
+        for employee_id, day, status, check_in_time, check_out_time, note in rows:
+            batch.append(Attendance(
+                employee_id=employee_id,
+                date=day,
+                status=status,
+                check_in_time=check_in_time,
+                check_out_time=check_out_time,
+                notes=note
+            ))
+            if len(batch) >= batch_size:
+                Attendance.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+                self.report_progress('attendance records', written, started)
+
+        if batch:
+            Attendance.objects.bulk_create(batch)
+            written += len(batch)
+        self.report_progress('attendance records', written, started, force=True)
+        return written
+
+    # Streams rows through PostgreSQL COPY FROM STDIN (psycopg 3)
+    def copy_attendance(self, rows, batch_size):
+        now = timezone.now()
+        table = connection.ops.quote_name(Attendance._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(column) for column in ATTENDANCE_COPY_COLUMNS)
+
+        written = 0
+        started = self.last_report = clock.perf_counter()
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(f'COPY {table} ({columns}) FROM STDIN') as copy:
+                for row in rows:
+                    copy.write_row(row + (now, now))
+                    written += 1
+                    if written % batch_size == 0:
+                        self.report_progress('attendance records', written, started)
+
+        self.report_progress('attendance records', written, started, force=True)
+        return written
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(
+                condition=models.Q(('is_active', True)),
+                fields=['last_name', 'first_name'],
+                name='employee_active_name_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(
+                condition=models.Q(('is_active', True)),
+                fields=['date_joined'],
+                name='employee_active_joined_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['department', 'is_active'], name='employee_dept_active_idx'),
+        ),
+    ]
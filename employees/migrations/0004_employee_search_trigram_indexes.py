@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:30
+
+from django.db import migrations
+
+SEARCH_FIELDS = ['first_name', 'last_name', 'email', 'employee_id']
+
+
+# Trigram indexes on UPPER(col), the expression Django's icontains compiles to
+# on PostgreSQL. Other backends keep the plain scan used by search_employees.
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS employee_{field}_trgm_idx '
+            f'ON employees_employee USING gin ((UPPER({field}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS employee_{field}_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
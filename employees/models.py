@@ -1,6 +1,63 @@
 from django.db import models
 from django.core.validators import RegexValidator
 from django.contrib.auth.models import AbstractUser
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from employee_project import cache as analytics_cache
+
+
+def _count_subquery(queryset):
+    """Correlated COUNT(*) over `queryset`, grouped on its employee column"""
+    return Coalesce(
+        Subquery(
+            queryset.filter(employee=OuterRef('pk')).order_by().values(
+                'employee'
+            ).annotate(n=Count('pk')).values('n')
+        ),
+        0
+    )
+
+
+# Bumps the model's analytics generation on the bulk writes signals miss
+class InvalidatingQuerySet(models.QuerySet):
+    """
+    save() and delete() send the signals employees.signals invalidates on;
+    update() and bulk_create() send none. bulk_update() goes through
+    update(), so it is covered too. update() also sets updated_at, which
+    auto_now leaves alone outside save().
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        self.invalidate()
+        return created
+
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', timezone.now())
+        updated = super().update(**kwargs)
+        self.invalidate()
+        return updated
+
+    def invalidate(self):
+        analytics_cache.invalidate(self.model._meta.label)
+
+
+# Employees and departments also feed the typeahead index
+class TypeaheadQuerySet(InvalidatingQuerySet):
+    def invalidate(self):
+        from . import typeahead
+
+        super().invalidate()
+        typeahead.invalidate()
+
+
+class DepartmentQuerySet(TypeaheadQuerySet):
+    # Annotates the active head-count so serializers don't COUNT per row
+    def with_employee_count(self):
+        return self.annotate(
+            active_employee_count=Count('employees', filter=Q(employees__is_active=True))
+        )
 
 # Department model
 class Department(models.Model):
@@ -18,6 +75,8 @@ class Department(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DepartmentQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -25,6 +84,36 @@ class Department(models.Model):
         ordering = ['name']
 
 
+class EmployeeQuerySet(TypeaheadQuerySet):
+    # Department moves shift the employees' daily attendance rollups, which
+    # save() handles in attendance.signals and update() would skip
+    def update(self, **kwargs):
+        from attendance.models import Attendance
+        from attendance.rollups import track_rollups
+
+        if not {'department', 'department_id'} & kwargs.keys():
+            return super().update(**kwargs)
+
+        # Pinned by primary key: the update may change what self matches
+        attendances = Attendance.objects.filter(employee_id__in=list(self.values_list('pk', flat=True)))
+        with track_rollups(attendances):
+            return super().update(**kwargs)
+
+    # Annotates performance_count and attendance_count as correlated subqueries
+    def with_activity_counts(self):
+        """
+        Subqueries rather than Count() joins, so the two reverse relations
+        don't multiply each other's rows and the result can be combined with
+        other annotations.
+        """
+        from attendance.models import Attendance
+
+        return self.annotate(
+            performance_count=_count_subquery(Performance.objects.all()),
+            attendance_count=_count_subquery(Attendance.objects.all())
+        )
+
+
 class Employee(models.Model):
     """
     Employee data model 
@@ -100,6 +189,8 @@ class Employee(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EmployeeQuerySet.as_manager()
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -109,6 +200,22 @@ class Employee(models.Model):
 
     class Meta:
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Active employee lists in default order, and active head-counts
+            models.Index(
+                fields=['last_name', 'first_name'],
+                condition=Q(is_active=True),
+                name='employee_active_name_idx'
+            ),
+            # Recent joiners: is_active=True AND date_joined >= ...
+            models.Index(
+                fields=['date_joined'],
+                condition=Q(is_active=True),
+                name='employee_active_joined_idx'
+            ),
+            # ?department=&is_active= filters and per-department head-counts
+            models.Index(fields=['department', 'is_active'], name='employee_dept_active_idx'),
+        ]
 
 # Performance model
 class Performance(models.Model):
@@ -157,9 +264,15 @@ class Performance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = InvalidatingQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.employee.full_name} - {self.get_rating_display()} ({self.review_date})"
 
     class Meta:
         ordering = ['-review_date']
-        unique_together = ['employee', 'review_date']
\ No newline at end of file
+        unique_together = ['employee', 'review_date']
+        indexes = [
+            # Keyset pagination on (-review_date, -id)
+            models.Index(fields=['review_date', 'id'], name='performance_date_id_idx'),
+        ]
\ No newline at end of file
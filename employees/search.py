@@ -0,0 +1,84 @@
+from functools import reduce
+from operator import and_, or_
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+from rest_framework import filters
+
+# Columns matched by employee search, in ranking priority
+SEARCH_FIELDS = ['first_name', 'last_name', 'email', 'employee_id']
+
+# Weights for the relevance rank
+EXACT_MATCH_WEIGHT = 100.0
+PREFIX_MATCH_WEIGHT = 10.0
+CONTAINS_MATCH_WEIGHT = 1.0
+
+
+def _any_field(lookup, term):
+    return reduce(or_, (Q(**{f'{field}__{lookup}': term}) for field in SEARCH_FIELDS))
+
+
+# Relevance of a row for the search terms
+def rank_expression(query, terms):
+    """
+    Exact employee_id/email matches first, then rows where every term is a
+    prefix of some field, then substring matches. On PostgreSQL, trigram
+    similarity breaks ties so near-misses sort by closeness.
+    """
+    rank = Case(
+        When(Q(employee_id__iexact=query) | Q(email__iexact=query), then=Value(EXACT_MATCH_WEIGHT)),
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+    for term in terms:
+        rank = rank + Case(
+            When(_any_field('istartswith', term), then=Value(PREFIX_MATCH_WEIGHT)),
+            default=Value(CONTAINS_MATCH_WEIGHT),
+            output_field=FloatField()
+        )
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        rank = rank + Greatest(
+            *(TrigramSimilarity(field, query) for field in SEARCH_FIELDS),
+            output_field=FloatField()
+        )
+    return rank
+
+
+# Filters and ranks employees for a free-text query
+def search_employees(queryset, query, ranked=True):
+    """
+    Every whitespace-separated term has to appear in one of SEARCH_FIELDS,
+    so "jo smi" narrows as the user types. Each term is a case-insensitive
+    substring match, which PostgreSQL serves from the UPPER(col)
+    gin_trgm_ops indexes created by migration 0004; other backends fall
+    back to a scan.
+    """
+    terms = query.split()
+    if not terms:
+        return queryset
+
+    queryset = queryset.filter(reduce(and_, (_any_field('icontains', term) for term in terms)))
+    if not ranked:
+        return queryset
+
+    return queryset.annotate(
+        search_rank=rank_expression(query.strip(), terms)
+    ).order_by('-search_rank', 'last_name', 'first_name')
+
+
+# SearchFilter backed by search_employees, for EmployeeListCreateView
+class EmployeeSearchFilter(filters.SearchFilter):
+    """
+    Uses the same matching as /employees/search/. The view's ordering still
+    applies; pass ?ordering=-search_rank to sort by relevance instead.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            # Keeps ?ordering=-search_rank valid when nothing is searched
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        return search_employees(queryset, ' '.join(terms))
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Department, Employee, Performance
+from employee_project.fast import ValuesSerializer, render_datetime, render_isoformat
 
 # Serializer for the Department model
 class DepartmentSerializer(serializers.ModelSerializer):
@@ -11,6 +12,10 @@ class DepartmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
     
     def get_employee_count(self, obj):
+        # Prefer the Department.objects.with_employee_count() annotation
+        count = getattr(obj, 'active_employee_count', None)
+        if count is not None:
+            return count
         return obj.employees.filter(is_active=True).count()
 
 # Serializer for the Employee model
@@ -26,6 +31,27 @@ class EmployeeListSerializer(serializers.ModelSerializer):
             'email', 'department_name', 'position', 'is_active', 'date_joined'
         ]
 
+# Read-only EmployeeListSerializer built from .values() rows
+class EmployeeFastListSerializer(ValuesSerializer):
+    values_fields = (
+        'id', 'employee_id', 'first_name', 'last_name', 'email',
+        'department__name', 'position', 'is_active', 'date_joined'
+    )
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'employee_id': row['employee_id'],
+            'full_name': f"{row['first_name']} {row['last_name']}",
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'email': row['email'],
+            'department_name': row['department__name'],
+            'position': row['position'],
+            'is_active': row['is_active'],
+            'date_joined': render_isoformat(row['date_joined']),
+        }
+
 # Serializer for employee detail views
 class EmployeeDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for employee detail views"""
@@ -45,10 +71,17 @@ class EmployeeDetailSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at', 'full_name']
     
+    # Prefer the Employee.objects.with_activity_counts() annotations
     def get_performance_count(self, obj):
+        count = getattr(obj, 'performance_count', None)
+        if count is not None:
+            return count
         return obj.performances.count()
     
     def get_attendance_count(self, obj):
+        count = getattr(obj, 'attendance_count', None)
+        if count is not None:
+            return count
         return obj.attendances.count()
 
 # Serializer for creating and updating employees
@@ -88,6 +121,30 @@ class PerformanceSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at']
 
+# Read-only PerformanceSerializer built from .values() rows
+class PerformanceFastSerializer(ValuesSerializer):
+    values_fields = (
+        'id', 'employee_id', 'employee__first_name', 'employee__last_name',
+        'employee__employee_id', 'rating', 'review_date', 'comments',
+        'reviewer', 'created_at', 'updated_at'
+    )
+    rating_labels = dict(Performance.RATING_CHOICES)
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'employee': row['employee_id'],
+            'employee_name': f"{row['employee__first_name']} {row['employee__last_name']}",
+            'employee_id': row['employee__employee_id'],
+            'rating': row['rating'],
+            'rating_display': self.rating_labels.get(row['rating'], str(row['rating'])),
+            'review_date': render_isoformat(row['review_date']),
+            'comments': row['comments'],
+            'reviewer': row['reviewer'],
+            'created_at': render_datetime(row['created_at']),
+            'updated_at': render_datetime(row['updated_at']),
+        }
+
 # Serializer for creating and updating performance records
 class PerformanceCreateUpdateSerializer(serializers.ModelSerializer):
     """Serializer for creating and updating performance records"""
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from employee_project import cache as analytics_cache
+from .models import Department, Employee, Performance
+from . import typeahead
+
+
+# Employee and department edits change what the typeahead returns
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_typeahead(sender, **kwargs):
+    typeahead.invalidate()
+
+
+# Analytics responses embed per-model generations; bump the changed one
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=Performance)
+@receiver(post_delete, sender=Performance)
+def invalidate_analytics(sender, **kwargs):
+    analytics_cache.invalidate(sender._meta.label)
@@ -0,0 +1,587 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import date, time
+from io import StringIO
+from unittest import mock
+from urllib.parse import urlencode
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from attendance import rollups
+from attendance.models import Attendance, AttendanceDailyRollup, EmployeeMonthlyRollup
+from employee_project import analytics, cache as analytics_cache
+from . import typeahead
+from .models import Department, Employee, Performance
+from .search import search_employees
+from .serializers import (
+    EmployeeDetailSerializer, EmployeeFastListSerializer, EmployeeListSerializer,
+    PerformanceFastSerializer, PerformanceSerializer
+)
+from .views import EmployeeDetailView, EmployeeExportView, EmployeeListCreateView, PerformanceListCreateView
+
+# Nothing cached, so every request runs its queries
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+# A cache of the test's own, emptied before each test
+LOCAL_CACHE = {'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'employees-tests',
+}}
+
+
+def create_employee(department, number, **fields):
+    return Employee.objects.create(**{
+        'first_name': 'Test',
+        'last_name': f'Employee{number}',
+        'email': f'employee{number}@example.com',
+        'phone_number': '+1234567890',
+        'address': '1 Main St',
+        'department': department,
+        'date_joined': date(2023, 1, 1),
+        'employee_id': f'EMP{number:03d}',
+        **fields
+    })
+
+
+@override_settings(CACHES=NO_CACHE)
+class DepartmentListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('departments', password='x')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_departments(self, count):
+        start = Department.objects.count()
+        for number in range(start, start + count):
+            department = Department.objects.create(name=f'Department {number}')
+            create_employee(department, number * 2)
+            create_employee(department, number * 2 + 1, is_active=False)
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('employees:department-list-create'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()['results']
+
+    def test_query_count_does_not_grow_with_departments(self):
+        self.add_departments(1)
+        one_queries, one = self.list_queries()
+        self.add_departments(5)
+        many_queries, many = self.list_queries()
+
+        self.assertEqual(len(one), 1)
+        self.assertEqual(len(many), 6)
+        self.assertEqual(one_queries, many_queries)
+        # Active employees only, from the annotation
+        self.assertEqual({department['employee_count'] for department in many}, {1})
+
+
+class EmployeeDetailQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Engineering')
+        cls.employee = create_employee(department, 1)
+        for day in (1, 2, 3):
+            Attendance.objects.create(employee=cls.employee, date=date(2024, 1, day), status='present')
+        Performance.objects.create(
+            employee=cls.employee, rating=4, review_date=date(2024, 1, 31), reviewer='Manager'
+        )
+
+    def test_detail_is_one_query(self):
+        # The department name and both activity counts come with the row
+        with self.assertNumQueries(1):
+            employee = EmployeeDetailView.queryset.get(pk=self.employee.pk)
+            data = EmployeeDetailSerializer(employee).data
+
+        self.assertEqual(data['department_name'], 'Engineering')
+        self.assertEqual(data['attendance_count'], 3)
+        self.assertEqual(data['performance_count'], 1)
+
+
+@override_settings(CACHES=NO_CACHE)
+class FastListSerializerTests(TestCase):
+    """The .values() serializers must render what the ModelSerializers do"""
+
+    @classmethod
+    def setUpTestData(cls):
+        engineering = Department.objects.create(name='Engineering')
+        sales = Department.objects.create(name='Sales')
+        first = create_employee(engineering, 1, position='Lead Engineer', salary='98765.43')
+        second = create_employee(sales, 2, is_active=False, date_joined=date(2020, 2, 29))
+        Performance.objects.create(
+            employee=first, rating=5, review_date=date(2024, 1, 31), reviewer='Manager',
+            comments='Exceeds expectations'
+        )
+        Performance.objects.create(employee=second, rating=2, review_date=date(2023, 12, 31), reviewer='Director')
+        cls.user = get_user_model().objects.create_user('fast', password='x')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertSameRendering(self, view, fast_serializer, model_serializer):
+        queryset = view.queryset.order_by('pk')
+        fast = fast_serializer(fast_serializer.values(queryset)).data
+        model = model_serializer(queryset, many=True).data
+        self.assertEqual(len(fast), queryset.count())
+        # Byte-identical JSON, key order included
+        self.assertEqual(JSONRenderer().render(fast), JSONRenderer().render(model))
+
+    def assertListMatches(self, url, view, model_serializer):
+        results = self.client.get(url).json()['results']
+        model = model_serializer(view.queryset.all(), many=True).data
+        self.assertEqual(
+            {row['id']: row for row in results},
+            {row['id']: row for row in json.loads(JSONRenderer().render(model))}
+        )
+
+    def test_employees(self):
+        self.assertSameRendering(EmployeeListCreateView, EmployeeFastListSerializer, EmployeeListSerializer)
+        self.assertListMatches(
+            reverse('employees:employee-list-create'), EmployeeListCreateView, EmployeeListSerializer
+        )
+
+    def test_performances(self):
+        self.assertSameRendering(PerformanceListCreateView, PerformanceFastSerializer, PerformanceSerializer)
+        self.assertListMatches(
+            reverse('employees:performance-list-create'), PerformanceListCreateView, PerformanceSerializer
+        )
+
+
+@override_settings(CACHES=NO_CACHE)
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.engineering = Department.objects.create(name='Engineering')
+        sales = Department.objects.create(name='Sales')
+        cls.first = create_employee(
+            cls.engineering, 1, position='Lead, "Platform"', salary='98765.43', address='1 Main St\nFloor 2'
+        )
+        cls.second = create_employee(sales, 2, is_active=False)
+        cls.third = create_employee(cls.engineering, 3)
+        Performance.objects.create(
+            employee=cls.first, rating=5, review_date=date(2024, 1, 31), reviewer='Manager',
+            comments='Exceeds expectations'
+        )
+        Performance.objects.create(employee=cls.second, rating=2, review_date=date(2023, 12, 31), reviewer='Director')
+        cls.user = get_user_model().objects.create_user('export', password='x')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, name, **params):
+        response = self.client.get(reverse(f'employees:{name}-export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def read_csv(self, body):
+        return list(csv.DictReader(io.StringIO(body)))
+
+    def read_ndjson(self, body):
+        self.assertTrue(body == '' or body.endswith('\n'))
+        return [json.loads(line) for line in body.splitlines()]
+
+    def assertMatchesSerializer(self, rows, serializer, instances):
+        # Export values must read the way the API serializers render them
+        expected = {row['id']: row for row in json.loads(JSONRenderer().render(serializer(instances, many=True).data))}
+        self.assertEqual(len(rows), len(expected))
+        for row in rows:
+            shared = set(row) & set(expected[row['id']])
+            self.assertEqual({key: row[key] for key in shared}, {key: expected[row['id']][key] for key in shared})
+
+    def test_employees_csv(self):
+        response, body = self.export('employee')
+
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertRegex(response['Content-Disposition'], r'^attachment; filename="employees-\d{8}\.csv"$')
+        rows = self.read_csv(body)
+        self.assertEqual(list(rows[0]), [column for column, _ in EmployeeExportView.export_columns])
+        self.assertEqual([row['employee_id'] for row in rows], ['EMP001', 'EMP002', 'EMP003'])
+
+        first = rows[0]
+        self.assertEqual(first['position'], 'Lead, "Platform"')
+        self.assertEqual(first['address'], '1 Main St\nFloor 2')
+        self.assertEqual(first['salary'], '98765.43')
+        self.assertEqual(first['department_name'], 'Engineering')
+        self.assertEqual(first['is_active'], 'True')
+        self.assertEqual(rows[1]['salary'], '')
+
+        serialized = EmployeeDetailSerializer(self.first).data
+        self.assertEqual(first['date_joined'], serialized['date_joined'])
+        self.assertEqual(first['created_at'], serialized['created_at'])
+
+    def test_employees_ndjson(self):
+        for params, headers in [({'format': 'ndjson'}, {}), ({}, {'HTTP_ACCEPT': 'application/x-ndjson'})]:
+            response = self.client.get(reverse('employees:employee-export'), params, **headers)
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+            rows = self.read_ndjson(b''.join(response.streaming_content).decode())
+            self.assertEqual(rows[1]['salary'], None)
+            self.assertEqual(rows[1]['is_active'], False)
+            self.assertMatchesSerializer(rows, EmployeeDetailSerializer, Employee.objects.all())
+
+    def test_export_takes_the_list_filters(self):
+        _, body = self.export('employee', department=self.engineering.pk, is_active='true', ordering='-last_name')
+        self.assertEqual([row['employee_id'] for row in self.read_csv(body)], ['EMP003', 'EMP001'])
+
+        _, body = self.export('employee', search='EMP002', format='ndjson')
+        self.assertEqual([row['employee_id'] for row in self.read_ndjson(body)], ['EMP002'])
+
+        _, body = self.export('employee', position='Nobody')
+        self.assertEqual(body, ','.join(column for column, _ in EmployeeExportView.export_columns) + '\r\n')
+        _, body = self.export('employee', position='Nobody', format='ndjson')
+        self.assertEqual(body, '')
+
+    def test_invalid_filter_is_bad_request(self):
+        response = self.client.get(reverse('employees:employee-export'), {'department': 0})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('department', json.loads(response.content))
+
+    def test_chunked_output_is_unchanged(self):
+        _, csv_body = self.export('employee')
+        _, ndjson_body = self.export('employee', format='ndjson')
+        with mock.patch('employee_project.export.FLUSH_EVERY', 2):
+            self.assertEqual(self.export('employee')[1], csv_body)
+            response = self.client.get(reverse('employees:employee-export'), {'format': 'ndjson'})
+            chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(''.join(chunks), ndjson_body)
+
+    def test_performances(self):
+        _, body = self.export('performance', ordering='review_date')
+        rows = self.read_csv(body)
+        self.assertEqual([row['employee_name'] for row in rows], ['Test Employee2', 'Test Employee1'])
+        self.assertEqual(rows[0]['comments'], '')
+        self.assertEqual(rows[1]['review_date'], '2024-01-31')
+
+        response, body = self.export('performance', format='ndjson')
+        self.assertRegex(response['Content-Disposition'], r'filename="performances-\d{8}\.ndjson"$')
+        rows = self.read_ndjson(body)
+        self.assertMatchesSerializer(rows, PerformanceSerializer, Performance.objects.select_related('employee'))
+
+    def test_requires_authentication(self):
+        response = APIClient().get(reverse('employees:employee-export'))
+        self.assertIn(response.status_code, (401, 403))
+
+
+class TypeaheadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Engineering')
+        for number, (first_name, last_name) in enumerate([
+            ('John', 'Smith'), ('Joanna', 'Goldsmith'), ('Smita', 'Jones'), ('Bob', 'Brown')
+        ]):
+            create_employee(department, number, first_name=first_name, last_name=last_name)
+
+    def index_search(self, query):
+        index = typeahead.TypeaheadIndex(
+            Employee.objects.order_by().values_list(*typeahead.RECORD_FIELDS), 1024 * 1024
+        )
+        return {row['full_name'] for row in index.search(query)}
+
+    def db_search(self, query):
+        return {
+            f'{employee.first_name} {employee.last_name}'
+            for employee in search_employees(Employee.objects.all(), query)
+        }
+
+    def test_index_matches_prefixes_where_the_database_matches_substrings(self):
+        self.assertEqual(self.index_search('smi'), {'John Smith', 'Smita Jones'})
+        self.assertEqual(self.db_search('smi'), {'John Smith', 'Joanna Goldsmith', 'Smita Jones'})
+
+    def test_every_term_must_match_in_any_order(self):
+        for query, expected in [
+            ('jo smi', {'John Smith', 'Smita Jones'}),
+            ('smi jo', {'John Smith', 'Smita Jones'}),
+            ('SMITH john', {'John Smith'}),
+            ('jo brown', set()),
+        ]:
+            self.assertEqual(self.index_search(query), expected, query)
+
+
+class AnalyticsSectionsTests(TestCase):
+    SHARED_SECTIONS = ['daily', 'status', 'records', 'rate']
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Engineering')
+        employee = create_employee(department, 1)
+        for day, status in [(1, 'present'), (2, 'late'), (3, 'absent')]:
+            Attendance.objects.create(employee=employee, date=date(2024, 1, day), status=status)
+        cls.user = get_user_model().objects.create_user('analytics', password='x')
+        cls.window = analytics.Window(date(2024, 1, 1), date(2024, 1, 31), date(2024, 1, 31))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @override_settings(CACHES=NO_CACHE)
+    def test_sections_of_one_aggregate_share_a_query(self):
+        with self.assertNumQueries(1):
+            data = analytics.get_sections(self.SHARED_SECTIONS, self.window)
+
+        self.assertEqual(data['total_records'], 3)
+        self.assertEqual(
+            data['status_distribution'],
+            [{'status': 'absent', 'count': 1}, {'status': 'late', 'count': 1}, {'status': 'present', 'count': 1}]
+        )
+        self.assertEqual(data['daily_attendance'], [{'date': '2024-01-01', 'count': 1}])
+
+    @override_settings(CACHES=LOCAL_CACHE)
+    def test_cached_aggregates_run_no_queries(self):
+        cache.clear()
+        first = analytics.get_sections(self.SHARED_SECTIONS + ['headcount'], self.window)
+        with self.assertNumQueries(0):
+            second = analytics.get_sections(self.SHARED_SECTIONS + ['headcount'], self.window)
+        self.assertEqual(first, second)
+
+    @override_settings(CACHES=NO_CACHE)
+    def test_default_payloads_keep_their_keys(self):
+        response = self.client.get(reverse('employees:employee-analytics'))
+        self.assertEqual(set(response.json()), {
+            'total_employees', 'recent_joiners', 'department_distribution',
+            'performance_distribution', 'daily_attendance', 'status_distribution',
+        })
+
+        # Read from the rollups; no query scans the attendance table
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('attendance:attendance-analytics'))
+        self.assertEqual(set(response.json()), {
+            'daily_attendance', 'status_distribution', 'attendance_rate', 'date_range',
+        })
+        table = connection.ops.quote_name(Attendance._meta.db_table)
+        self.assertFalse([query for query in queries if table in query['sql']])
+
+    @override_settings(CACHES=NO_CACHE)
+    def test_hours_combine_rollup_months_and_edges(self):
+        employee = Employee.objects.get()
+        Attendance.objects.filter(date=date(2024, 1, 1)).update(check_in_time=time(9), check_out_time=time(17))
+        Attendance.objects.create(
+            employee=employee, date=date(2024, 2, 3), status='present',
+            check_in_time=time(22), check_out_time=time(4)
+        )
+
+        # January from the monthly rollup, February 1-10 from attendance
+        window = analytics.Window(date(2024, 1, 1), date(2024, 2, 10), date(2024, 2, 10))
+        data = analytics.get_sections(['hours'], window)
+        self.assertEqual(data['total_hours'], 14.0)
+        self.assertEqual(data['average_hours'], 7.0)
+        self.assertEqual(
+            data['department_hours'],
+            [{'department': 'Engineering', 'total_hours': 14.0, 'average_hours': 7.0}]
+        )
+
+    def test_unknown_section_is_a_bad_request(self):
+        for url in (reverse('employees:employee-analytics'), reverse('attendance:attendance-analytics')):
+            response = self.client.get(url, {'sections': 'daily,bogus'})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('bogus', response.json()['error'])
+
+    def test_bad_window_is_a_bad_request(self):
+        response = self.client.get(reverse('employees:employee-analytics'), {
+            'sections': 'daily', 'start_date': '2024-02-01', 'end_date': '2024-01-01',
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class CacheInvalidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Engineering')
+        cls.employee = create_employee(cls.department, 1)
+
+    def setUp(self):
+        cache.clear()
+        self.computed = 0
+
+    def compute(self):
+        self.computed += 1
+        return Employee.objects.count()
+
+    def cached_count(self):
+        return analytics_cache.get_or_compute('count', {}, self.compute, [analytics_cache.EMPLOYEES])
+
+    def assertInvalidates(self, write, label=analytics_cache.EMPLOYEES):
+        before = analytics_cache.get_generations([label])
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        self.assertNotEqual(analytics_cache.get_generations([label]), before)
+
+    def test_save_invalidates(self):
+        self.assertEqual(self.cached_count(), 1)
+        self.assertEqual(self.cached_count(), 1)
+        self.assertEqual(self.computed, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_employee(self.department, 2)
+        self.assertEqual(self.cached_count(), 2)
+        self.assertEqual(self.computed, 2)
+
+    def test_bulk_create_invalidates(self):
+        self.assertInvalidates(lambda: Performance.objects.bulk_create([
+            Performance(employee=self.employee, rating=3, review_date=date(2024, 1, 31), reviewer='Manager')
+        ]), analytics_cache.PERFORMANCES)
+
+    def test_update_invalidates(self):
+        self.assertInvalidates(lambda: Employee.objects.filter(pk=self.employee.pk).update(position='Lead'))
+        self.assertInvalidates(
+            lambda: Department.objects.update(description='Platform team'), analytics_cache.DEPARTMENTS
+        )
+
+    def test_delete_invalidates(self):
+        self.assertInvalidates(lambda: Employee.objects.filter(pk=self.employee.pk).delete())
+
+    def test_bump_waits_for_commit(self):
+        before = analytics_cache.get_generations([analytics_cache.EMPLOYEES])
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.employee.save()
+            self.assertEqual(analytics_cache.get_generations([analytics_cache.EMPLOYEES]), before)
+        self.assertTrue(callbacks)
+
+    def test_held_lock_is_waited_for_briefly(self):
+        # Another worker holds the lock and never fills the key
+        key = analytics_cache.make_key('count', {}, [analytics_cache.EMPLOYEES])
+        cache.add(f'{key}:lock', 1, analytics_cache.LOCK_TIMEOUT)
+
+        with mock.patch.object(analytics_cache, 'LOCK_WAIT', 0.2):
+            self.assertEqual(self.cached_count(), 1)
+        self.assertEqual(self.computed, 1)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class DataImportTests(TestCase):
+    HEADER = b'employee_id,date,status,check_in_time,check_out_time\n'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.engineering = Department.objects.create(name='Engineering')
+        cls.sales = Department.objects.create(name='Sales')
+        cls.employee = create_employee(cls.engineering, 1)
+        cls.user = get_user_model().objects.create_user('importer', password='x', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, model, body, **params):
+        url = reverse('employees:data-import', args=[model])
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f'{url}?{urlencode(params)}', data=body, content_type='text/csv')
+
+    def rollup_rows(self):
+        return (
+            sorted(AttendanceDailyRollup.objects.values_list('date', 'department_id', 'status', 'count')),
+            sorted(EmployeeMonthlyRollup.objects.values_list(
+                'employee_id', 'month', 'status', 'count', 'worked_days', 'worked_seconds'
+            )),
+        )
+
+    def assertRollupsCurrent(self):
+        maintained = self.rollup_rows()
+        rollups.rebuild()
+        self.assertEqual(maintained, self.rollup_rows())
+
+    def test_partial_failure_imports_the_valid_rows(self):
+        response = self.post('attendance', self.HEADER + (
+            b'EMP001,2024-01-02,present,09:00,17:00\n'
+            b'EMP999,2024-01-03,present,09:00,17:00\n'
+            b'EMP001,2024-01-04,sick,,\n'
+            b'EMP001,2024-01-05,absent,,\n'
+        ), chunk_size=2)
+
+        self.assertEqual(response.status_code, 201)
+        summary = response.json()
+        self.assertEqual((summary['created'], summary['failed']), (2, 2))
+        self.assertEqual([error['row'] for error in summary['errors']], [1, 2])
+        self.assertEqual(
+            list(Attendance.objects.order_by('date').values_list('date', 'status')),
+            [(date(2024, 1, 2), 'present'), (date(2024, 1, 5), 'absent')]
+        )
+        self.assertRollupsCurrent()
+
+    def test_existing_rows_are_rejected_without_update(self):
+        Attendance.objects.create(employee=self.employee, date=date(2024, 1, 2), status='absent')
+        response = self.post('attendance', self.HEADER + b'EMP001,2024-01-02,present,09:00,17:00\n')
+
+        self.assertEqual(response.json()['failed'], 1)
+        self.assertEqual(Attendance.objects.get().status, 'absent')
+
+    def test_update_upserts_attendance(self):
+        Attendance.objects.create(employee=self.employee, date=date(2024, 1, 2), status='absent')
+        before = analytics_cache.get_generations([analytics_cache.ATTENDANCES])
+
+        response = self.post('attendance', self.HEADER + (
+            b'EMP001,2024-01-02,present,09:00,17:00\n'
+            b'EMP001,2024-01-03,late,09:30,17:00\n'
+        ), update='true')
+
+        summary = response.json()
+        self.assertEqual((summary['created'], summary['updated']), (1, 1))
+        self.assertEqual(Attendance.objects.get(date=date(2024, 1, 2)).status, 'present')
+        self.assertRollupsCurrent()
+        self.assertEqual(
+            EmployeeMonthlyRollup.objects.get(status='present').worked_seconds, 8 * 3600
+        )
+        self.assertNotEqual(analytics_cache.get_generations([analytics_cache.ATTENDANCES]), before)
+
+    def test_update_upserts_employees_and_moves_their_rollups(self):
+        Attendance.objects.create(employee=self.employee, date=date(2024, 1, 2), status='absent')
+        before = analytics_cache.get_generations([analytics_cache.EMPLOYEES, analytics_cache.ATTENDANCES])
+
+        response = self.post('employees', (
+            b'employee_id,first_name,last_name,email,phone_number,address,department,date_joined\n'
+            b'EMP001,Test,Renamed,employee1@example.com,+1234567890,1 Main St,Sales,2023-01-01\n'
+            b'EMP002,New,Hire,new@example.com,+1234567890,2 Main St,Sales,2024-01-01\n'
+        ), update='true')
+
+        summary = response.json()
+        self.assertEqual((summary['created'], summary['updated']), (1, 1))
+        self.employee.refresh_from_db()
+        self.assertEqual((self.employee.last_name, self.employee.department), ('Renamed', self.sales))
+        self.assertEqual(AttendanceDailyRollup.objects.get().department, self.sales)
+        self.assertRollupsCurrent()
+        after = analytics_cache.get_generations([analytics_cache.EMPLOYEES, analytics_cache.ATTENDANCES])
+        self.assertTrue(all(new != old for new, old in zip(after, before)))
+
+    def test_undecodable_input_is_a_bad_request(self):
+        before = analytics_cache.get_generations([analytics_cache.ATTENDANCES])
+        response = self.post('attendance', self.HEADER + (
+            b'EMP001,2024-01-02,present,09:00,17:00\n'
+            b'EMP001,2024-01-03,absent,,\n'
+            b'EMP001,2024-01-04,absent,,\xff\n'
+        ), chunk_size=2)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('row 2', response.json()['error'])
+        self.assertEqual(response.json()['summary']['created'], 2)
+        # The committed chunk still had its rollups rebuilt and caches bumped
+        self.assertEqual(Attendance.objects.count(), 2)
+        self.assertRollupsCurrent()
+        self.assertNotEqual(analytics_cache.get_generations([analytics_cache.ATTENDANCES]), before)
+
+    def test_malformed_csv_is_a_bad_request(self):
+        oversized = b'x' * 200000
+        response = self.post('attendance', self.HEADER + b'EMP001,2024-01-02,absent,,' + oversized + b'\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('field larger than field limit', response.json()['error'])
+
+    def test_command_reports_undecodable_input(self):
+        with tempfile.NamedTemporaryFile(suffix='.csv') as upload:
+            upload.write(self.HEADER + b'EMP001,2024-01-02,absent,,\xff\n')
+            upload.flush()
+            with self.assertRaisesMessage(CommandError, 'Input unreadable'):
+                call_command('import_data', 'attendance', upload.name, stdout=StringIO())
@@ -0,0 +1,213 @@
+import heapq
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from employee_project.metrics import record_cache
+from .models import Employee
+
+logger = logging.getLogger(__name__)
+
+# Bumped on Employee/Department writes. Workers compare it to the generation
+# their index was built at, so it reaches the workers that share the cache
+# backend; with per-process locmem the others serve their index until it is
+# MAX_AGE old.
+GENERATION_CACHE_KEY = 'employees:typeahead:generation'
+
+# Record layout: EmployeeListSerializer fields plus the filter columns
+RECORD_FIELDS = (
+    'id', 'employee_id', 'first_name', 'last_name', 'email',
+    'department__name', 'position', 'is_active', 'date_joined', 'department_id'
+)
+(ID, EMPLOYEE_ID, FIRST_NAME, LAST_NAME, EMAIL,
+ DEPARTMENT_NAME, POSITION, IS_ACTIVE, DATE_JOINED, DEPARTMENT_ID) = range(len(RECORD_FIELDS))
+
+
+def get_config():
+    config = {
+        'ENABLED': False,
+        'MAX_MEMORY_MB': 64,
+        'MAX_AGE': 300,
+    }
+    config.update(getattr(settings, 'EMPLOYEE_TYPEAHEAD', {}))
+    return config
+
+
+def normalize(value):
+    return value.casefold().strip()
+
+
+class IndexTooLarge(Exception):
+    pass
+
+
+# Sorted-array prefix index over names, emails and employee IDs
+class TypeaheadIndex:
+    """
+    `keys` is a sorted list of normalized search keys and `owners[i]` the
+    record position for `keys[i]`, so a prefix lookup is one bisect plus a
+    walk over the matching run. Records are compact tuples in RECORD_FIELDS
+    order with date_joined already rendered, ready to become response dicts.
+
+    Terms match at the start of a first name, last name, email or employee
+    ID only: "smi" finds "Smith" but not "Goldsmith", which the database
+    search (employees.search, a substring match) would also return.
+    """
+
+    def __init__(self, rows, max_bytes):
+        records = []
+        entries = []
+        size = 0
+
+        for row in rows:
+            record = row[:DATE_JOINED] + (row[DATE_JOINED].isoformat(),) + row[DATE_JOINED + 1:]
+            position = len(records)
+            keys = self.record_keys(record)
+            records.append(record)
+
+            for key in keys:
+                entries.append((key, position))
+                size += sys.getsizeof(key) + 64
+
+            size += sys.getsizeof(record) + sum(sys.getsizeof(value) for value in record)
+            if size > max_bytes:
+                raise IndexTooLarge(f'typeahead index exceeds {max_bytes} bytes at {len(records)} employees')
+
+        entries.sort()
+        self.records = records
+        self.keys = [key for key, _ in entries]
+        self.owners = [position for _, position in entries]
+        self.size = size
+        self.built_at = time.monotonic()
+
+    @staticmethod
+    def record_keys(record):
+        first_name = normalize(record[FIRST_NAME])
+        last_name = normalize(record[LAST_NAME])
+        email = normalize(record[EMAIL])
+        return tuple({
+            first_name,
+            last_name,
+            email,
+            normalize(record[EMPLOYEE_ID]),
+        })
+
+    def prefix_positions(self, prefix):
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + '\U0010ffff', start)
+        return set(self.owners[start:end])
+
+    # Records where every term is a prefix of one of the record's keys
+    def search(self, query, department_id=None, is_active=None, limit=50):
+        terms = normalize(query).split()
+        if not terms:
+            return []
+
+        # Every term has to prefix one of the record's keys: intersect the
+        # per-term position sets, longest term first since it usually has
+        # the fewest matches and the set only shrinks from there
+        terms.sort(key=len, reverse=True)
+        query = ' '.join(terms)
+        positions = self.prefix_positions(terms[0])
+        for term in terms[1:]:
+            if not positions:
+                break
+            positions &= self.prefix_positions(term)
+
+        matches = []
+        for position in positions:
+            record = self.records[position]
+            if department_id is not None and record[DEPARTMENT_ID] != department_id:
+                continue
+            if is_active is not None and record[IS_ACTIVE] != is_active:
+                continue
+
+            exact = query in (normalize(record[EMPLOYEE_ID]), normalize(record[EMAIL]))
+            matches.append((not exact, record[LAST_NAME], record[FIRST_NAME], record[ID], record))
+
+        return [to_list_item(match[-1]) for match in heapq.nsmallest(limit, matches)]
+
+
+# Renders a record as EmployeeListSerializer does
+def to_list_item(record):
+    return {
+        'id': record[ID],
+        'employee_id': record[EMPLOYEE_ID],
+        'full_name': f'{record[FIRST_NAME]} {record[LAST_NAME]}',
+        'first_name': record[FIRST_NAME],
+        'last_name': record[LAST_NAME],
+        'email': record[EMAIL],
+        'department_name': record[DEPARTMENT_NAME],
+        'position': record[POSITION],
+        'is_active': record[IS_ACTIVE],
+        'date_joined': record[DATE_JOINED],
+    }
+
+
+# Per-worker index state
+_lock = threading.Lock()
+_index = None
+_generation = None
+_disabled_until = 0
+
+
+def invalidate():
+    """
+    Drops this worker's index and tells the other workers via the cache,
+    once the surrounding transaction commits: an index rebuilt before the
+    commit would hold the old rows under the new generation.
+    """
+    transaction.on_commit(_bump)
+
+
+def _bump():
+    global _index
+    _index = None
+    try:
+        cache.incr(GENERATION_CACHE_KEY)
+    except ValueError:
+        cache.set(GENERATION_CACHE_KEY, 1, None)
+
+
+def _current_generation():
+    return cache.get(GENERATION_CACHE_KEY, 0)
+
+
+# Returns the worker's index, building it on first use or after a change
+def get_index():
+    global _index, _generation, _disabled_until
+
+    config = get_config()
+    if not config['ENABLED'] or time.monotonic() < _disabled_until:
+        return None
+
+    generation = _current_generation()
+    index = _index
+    if index is not None and _generation == generation and time.monotonic() - index.built_at < config['MAX_AGE']:
+        record_cache('typeahead', True)
+        return index
+
+    with _lock:
+        if _index is not None and _index is not index and _generation == generation:
+            # Rebuilt by another thread while this one waited
+            record_cache('typeahead', True)
+            return _index
+
+        record_cache('typeahead', False)
+
+        rows = Employee.objects.order_by().values_list(*RECORD_FIELDS).iterator(chunk_size=5000)
+        try:
+            _index = TypeaheadIndex(rows, config['MAX_MEMORY_MB'] * 1024 * 1024)
+        except IndexTooLarge as e:
+            # Fall back to the database until the data may have shrunk
+            logger.warning('Employee typeahead disabled: %s', e)
+            _index = None
+            _disabled_until = time.monotonic() + config['MAX_AGE']
+            return None
+
+        _generation = generation
+        return _index
@@ -11,12 +11,17 @@ urlpatterns = [
     # Employee URLs
     path('employees/', views.EmployeeListCreateView.as_view(), name='employee-list-create'),
     path('employees/<int:pk>/', views.EmployeeDetailView.as_view(), name='employee-detail'),
+    path('employees/export/', views.EmployeeExportView.as_view(), name='employee-export'),
     path('employees/search/', views.employee_search, name='employee-search'),
     
     # Performance URLs
     path('performances/', views.PerformanceListCreateView.as_view(), name='performance-list-create'),
+    path('performances/export/', views.PerformanceExportView.as_view(), name='performance-export'),
     path('performances/<int:pk>/', views.PerformanceDetailView.as_view(), name='performance-detail'),
     
+    # Bulk import
+    path('import/<str:model>/', views.data_import, name='data-import'),
+    
     # Analytics URLs
     path('analytics/', views.employee_analytics, name='employee-analytics'),
     path('stats/', views.public_stats, name='public-stats'),  # No auth required
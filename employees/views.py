@@ -2,61 +2,101 @@ from django.shortcuts import render
 from rest_framework import generics, status, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Q
+from django.db.models import Value
+from django.db.models.functions import Concat
 from django.utils import timezone
-from datetime import datetime, timedelta
+import codecs
+from employee_project import analytics, cache as analytics_cache
+from employee_project.conditional import ConditionalGetMixin, conditional_get
+from employee_project.export import ExportMixin
+from employee_project.fast import FastListMixin
+from employee_project.importer import DEFAULT_CHUNK_SIZE, IMPORTERS, READERS, InputError
 from .models import Department, Employee, Performance
+from .search import EmployeeSearchFilter, search_employees
+from . import typeahead
 
 from .serializers import (
     DepartmentSerializer,
     EmployeeListSerializer,
+    EmployeeFastListSerializer,
     EmployeeDetailSerializer,
     EmployeeCreateUpdateSerializer,
     PerformanceSerializer,
+    PerformanceFastSerializer,
     PerformanceCreateUpdateSerializer
 )
 
 # This view allows you to retrieve a list of all departments or create a new department
-class DepartmentListCreateView(generics.ListCreateAPIView):
-    queryset = Department.objects.all()
+class DepartmentListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
+    queryset = Department.objects.with_employee_count()
     serializer_class = DepartmentSerializer
     permission_classes = [IsAuthenticated]
+    etag_depends_on = [analytics_cache.DEPARTMENTS, analytics_cache.EMPLOYEES]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
-    ordering_fields = ['name', 'created_at']
+    ordering_fields = ['name', 'created_at', 'active_employee_count']
     ordering = ['name']
 
 # This view allows you to retrieve, update or delete a specific department
-class DepartmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class DepartmentDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a department"""
-    queryset = Department.objects.all()
+    queryset = Department.objects.with_employee_count()
     serializer_class = DepartmentSerializer
     permission_classes = [IsAuthenticated]
+    etag_depends_on = [analytics_cache.DEPARTMENTS, analytics_cache.EMPLOYEES]
 
 
 # This view allows you to retrieve a list of all employees or create a new employee
-class EmployeeListCreateView(generics.ListCreateAPIView):
+class EmployeeListCreateView(ConditionalGetMixin, FastListMixin, generics.ListCreateAPIView):
     """List all employees or create a new employee"""
     queryset = Employee.objects.select_related('department').all()
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    etag_depends_on = [analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS]
+    filter_backends = [DjangoFilterBackend, EmployeeSearchFilter, filters.OrderingFilter]
     filterset_fields = ['department', 'is_active', 'position']
     search_fields = ['first_name', 'last_name', 'email', 'employee_id']
-    ordering_fields = ['first_name', 'last_name', 'date_joined', 'created_at']
+    ordering_fields = ['first_name', 'last_name', 'date_joined', 'created_at', 'search_rank']
     ordering = ['last_name', 'first_name']
+    # GET lists render .values() rows; see employee_project.fast
+    fast_serializer_class = EmployeeFastListSerializer
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return EmployeeCreateUpdateSerializer
         return EmployeeListSerializer
 
+# This view streams the filtered employee list as CSV or NDJSON
+class EmployeeExportView(ExportMixin, EmployeeListCreateView):
+    export_name = 'employees'
+    export_columns = [
+        ('id', 'id'),
+        ('employee_id', 'employee_id'),
+        ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+        ('email', 'email'),
+        ('phone_number', 'phone_number'),
+        ('address', 'address'),
+        ('department', 'department_id'),
+        ('department_name', 'department__name'),
+        ('position', 'position'),
+        ('salary', 'salary'),
+        ('date_joined', 'date_joined'),
+        ('is_active', 'is_active'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ]
+
 # This view allows you to retrieve, update or delete a specific employee
-class EmployeeDetailView(generics.RetrieveUpdateDestroyAPIView):
+class EmployeeDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete an employee"""
-    queryset = Employee.objects.select_related('department').all()
+    queryset = Employee.objects.select_related('department').with_activity_counts()
     permission_classes = [IsAuthenticated]
+    etag_depends_on = [
+        analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS,
+        analytics_cache.PERFORMANCES, analytics_cache.ATTENDANCES
+    ]
     
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
@@ -64,26 +104,48 @@ class EmployeeDetailView(generics.RetrieveUpdateDestroyAPIView):
         return EmployeeDetailSerializer
 
 # This view allows you to index employees that meet certain criteria
-class PerformanceListCreateView(generics.ListCreateAPIView):
+class PerformanceListCreateView(ConditionalGetMixin, FastListMixin, generics.ListCreateAPIView):
     """List all performance records or create a new one"""
     queryset = Performance.objects.select_related('employee').all()
     permission_classes = [IsAuthenticated]
+    etag_depends_on = [analytics_cache.PERFORMANCES, analytics_cache.EMPLOYEES]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['employee', 'rating', 'review_date']
     search_fields = ['employee__first_name', 'employee__last_name', 'employee__employee_id']
     ordering_fields = ['review_date', 'rating', 'created_at']
     ordering = ['-review_date']
+    # Used by ?cursor= keyset pagination, backed by performance_date_id_idx
+    cursor_ordering = ['-review_date', '-id']
+    # GET lists render .values() rows; see employee_project.fast
+    fast_serializer_class = PerformanceFastSerializer
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return PerformanceCreateUpdateSerializer
         return PerformanceSerializer
 
+# This view streams the filtered performance records as CSV or NDJSON
+class PerformanceExportView(ExportMixin, PerformanceListCreateView):
+    export_name = 'performances'
+    export_columns = [
+        ('id', 'id'),
+        ('employee', 'employee_id'),
+        ('employee_id', 'employee__employee_id'),
+        ('employee_name', Concat('employee__first_name', Value(' '), 'employee__last_name')),
+        ('rating', 'rating'),
+        ('review_date', 'review_date'),
+        ('comments', 'comments'),
+        ('reviewer', 'reviewer'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ]
+
 # This view allows you to retrieve, update or delete a specific performance record
-class PerformanceDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PerformanceDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a performance record"""
     queryset = Performance.objects.select_related('employee').all()
     permission_classes = [IsAuthenticated]
+    etag_depends_on = [analytics_cache.PERFORMANCES, analytics_cache.EMPLOYEES]
     
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
@@ -92,67 +154,42 @@ class PerformanceDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # Analytics Views
+
 # Set as GET only because who needs to update analytics?
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(
+    analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS,
+    analytics_cache.PERFORMANCES, analytics_cache.ATTENDANCES
+)
 def employee_analytics(request):
-    """Get employee analytics data"""
-    from attendance.models import Attendance
-    from django.db.models import Count, Q
-    from datetime import datetime, timedelta
-    
-    # Get date range from query params
-    dept_data = Department.objects.annotate(
-        employee_count=Count('employees')
-    ).values('name', 'employee_count')
-
-    # Get total and recent employee counts
-    total_employees = Employee.objects.filter(is_active=True).count()
-    recent_employees = Employee.objects.filter(
-        date_joined__gte=datetime.now() - timedelta(days=30),
-        is_active=True
-    ).count()
-    
-    perf_data = Performance.objects.values('rating').annotate(
-        count=Count('rating')
-    ).order_by('rating')
-    
-    # Get daily attendance from the last 7 days
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=7)
-    
-    daily_attendance = Attendance.objects.filter(
-        date__range=[start_date, end_date],
-        status='present'
-    ).values('date').annotate(
-        count=Count('id')
-    ).order_by('date')
-    
-    # Get status distribution from the last 7 days 
-    status_distribution = Attendance.objects.filter(
-        date__range=[start_date, end_date]
-    ).values('status').annotate(
-        count=Count('id')
-    ).order_by('status')
-    
-    return Response({
-        'total_employees': total_employees,
-        'recent_joiners': recent_employees,
-        'department_distribution': list(dept_data),
-        'performance_distribution': list(perf_data),
-        'daily_attendance': [
-            {
-                'date': item['date'].strftime('%Y-%m-%d'),
-                'count': item['count']
-            } for item in daily_attendance
-        ],
-        'status_distribution': list(status_distribution),
-    })
+    """
+    Get employee analytics data. With ?sections=daily,status,rate only those
+    sections are computed, over ?start_date=&end_date= (default: the last
+    30 days); see employee_project.analytics.SECTIONS.
+    """
+    today = timezone.localdate()
+    try:
+        if 'sections' in request.GET:
+            names = analytics.parse_sections(request.GET['sections'])
+            window = analytics.parse_window(request.GET, today)
+        else:
+            names = analytics.EMPLOYEE_SECTIONS
+            window = analytics.parse_window({}, today, default_days=7)
+    except ValueError as error:
+        return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = analytics.get_sections(names, window)
+    if 'sections' not in request.GET:
+        # The default payload keeps its original keys, without the window
+        del data['date_range']
+    return Response(data)
 
 
 # Public API Test
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_get(analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS)
 def public_stats(request):
     return Response({
         'message': 'Employee Management System Public API Active',
@@ -165,20 +202,28 @@ def public_stats(request):
 # Advanced employee indexing
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_get(analytics_cache.EMPLOYEES, analytics_cache.DEPARTMENTS)
 def employee_search(request):
     query = request.GET.get('q', '')
     department_id = request.GET.get('department')
     is_active = request.GET.get('is_active')
     
+    # Prefix typeahead from the in-process index, when it is enabled. It
+    # matches terms at the start of a name, email or employee ID, where
+    # search_employees() below matches them anywhere in the field
+    index = typeahead.get_index() if query.strip() else None
+    if index is not None and (not department_id or department_id.isdigit()):
+        return Response(index.search(
+            query,
+            department_id=int(department_id) if department_id else None,
+            is_active=None if is_active is None else is_active.lower() == 'true'
+        ))
+    
     employees = Employee.objects.select_related('department').all()
     
     if query:
-        employees = employees.filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(email__icontains=query) |
-            Q(employee_id__icontains=query)
-        )
+        # Every term must match; results come back most relevant first
+        employees = search_employees(employees, query)
     
     if department_id:
         employees = employees.filter(department_id=department_id)
@@ -187,4 +232,55 @@ def employee_search(request):
         employees = employees.filter(is_active=is_active.lower() == 'true')
     
     serializer = EmployeeListSerializer(employees[:50], many=True)  # Limit results
-    return Response(serializer.data)
\ No newline at end of file
+    return Response(serializer.data)
+
+# Content types accepted by data_import
+IMPORT_FORMATS = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+# Imports employees or attendance from a CSV or NDJSON request body
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def data_import(request, model):
+    """
+    Same importer as the import_data command. The body is read line by line
+    and processed in chunks, so it is never held in memory whole. Query
+    params: dry_run, update, create_departments (employees) and chunk_size.
+    A body that stops decoding as UTF-8 or parsing as CSV midway is a 400
+    whose summary counts what the earlier chunks wrote.
+    """
+    if model not in IMPORTERS:
+        return Response({'error': f'Unknown import type: {model}'}, status=status.HTTP_404_NOT_FOUND)
+
+    content_type = request.content_type.split(';')[0].strip().lower()
+    input_format = IMPORT_FORMATS.get(content_type)
+    if input_format is None:
+        return Response(
+            {'error': f'Send the rows as one of: {", ".join(IMPORT_FORMATS)}'},
+            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
+
+    def flag(name):
+        return request.GET.get(name, '').lower() in ('true', '1')
+
+    try:
+        chunk_size = int(request.GET.get('chunk_size', DEFAULT_CHUNK_SIZE))
+    except ValueError:
+        chunk_size = 0
+    if not 1 <= chunk_size <= 10000:
+        return Response({'error': 'chunk_size must be between 1 and 10000'}, status=status.HTTP_400_BAD_REQUEST)
+
+    kwargs = {'dry_run': flag('dry_run'), 'update': flag('update'), 'chunk_size': chunk_size}
+    if model == 'employees':
+        kwargs['create_departments'] = flag('create_departments')
+
+    # request.stream bypasses the parsers, which would buffer the whole body
+    lines = codecs.iterdecode(request.stream or [], 'utf-8-sig')
+    try:
+        summary = IMPORTERS[model](**kwargs).run(READERS[input_format](lines))
+    except InputError as e:
+        return Response({'error': str(e), 'summary': e.summary}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(summary, status=status.HTTP_200_OK if summary['dry_run'] else status.HTTP_201_CREATED)
@@ -0,0 +1,168 @@
+"""
+Gunicorn configuration for production.
+
+    gunicorn -c gunicorn.conf.py
+
+Everything is tuned through environment variables:
+
+GUNICORN_WORKER_CLASS  gthread (default), sync or uvicorn. gthread and sync
+                       serve the WSGI app; uvicorn serves the ASGI app, so
+                       the /api/v1/async/ views run on an event loop.
+GUNICORN_WORKERS       Worker processes (default: detected from the CPUs
+                       this container may use, see default_workers()).
+GUNICORN_THREADS       Threads per gthread worker (default 4).
+GUNICORN_KEEPALIVE     Seconds an idle keep-alive connection stays open
+                       (default 5); keep it above the idle timeout of any
+                       load balancer in front.
+GUNICORN_MAX_REQUESTS  Requests before a worker is recycled, with a random
+                       jitter up to 10% (default 1000, 0 disables). Off by
+                       default for gthread, whose exiting worker drops the
+                       connections it has accepted but not yet served.
+GUNICORN_TIMEOUT       Seconds a silent worker lives before it is killed.
+PORT / GUNICORN_BIND   Where to listen (default 0.0.0.0:$PORT, port 8000).
+
+PROMETHEUS_MULTIPROC_DIR  Where workers share their metrics, emptied when
+                       gunicorn starts (default: a per-server directory on
+                       /dev/shm, removed on exit).
+CACHE_URL              The Django cache (see settings.py). The analytics
+                       cache, the generation counters behind it and the
+                       typeahead generation must be shared by all workers,
+                       so with more than one worker and no CACHE_URL a file
+                       cache in the per-server directory is used, with a
+                       warning; set CACHE_URL=rediscache://... in production.
+
+Every thread (and every async ORM pool thread) holds its own database
+connection, so workers x threads should stay under the database's
+max_connections, or under DATABASE_POOL_MAX_SIZE per worker when pooled.
+"""
+
+import environ
+import math
+import os
+import shutil
+import sys
+import tempfile
+
+# The .env file settings.py reads, so variables set there count here too
+environ.Env.read_env(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env'))
+
+WORKER_CLASSES = {
+    'sync': ('sync', 'employee_project.wsgi:application'),
+    'gthread': ('gthread', 'employee_project.wsgi:application'),
+    'uvicorn': ('uvicorn_worker.UvicornWorker', 'employee_project.asgi:application'),
+}
+
+
+# CPUs this process may run on, honouring affinity and a cgroup v2 quota
+def cpu_count():
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # Containers limited with --cpus see every host CPU but get a quota
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+# Sync workers block on every query, so they need the most processes;
+# gthread workers overlap queries on their threads, and uvicorn workers on
+# their event loop, so one process per CPU (plus one for gthread) suffices
+def default_workers(kind, cpus):
+    if kind == 'sync':
+        return cpus * 2 + 1
+    if kind == 'gthread':
+        return cpus + 1
+    return cpus
+
+
+worker_kind = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_kind not in WORKER_CLASSES:
+    raise RuntimeError(
+        f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, not {worker_kind!r}"
+    )
+worker_class, wsgi_app = WORKER_CLASSES[worker_kind]
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get('GUNICORN_WORKERS') or default_workers(worker_kind, cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 4)) if worker_kind == 'gthread' else 1
+
+# Load Django once in the master so workers share its pages copy-on-write.
+# Nothing opens a database connection or pool at import time, so forked
+# workers never share a socket.
+preload_app = True
+
+# Recycle workers to bound the growth of per-process caches and leaks; the
+# jitter keeps them from restarting all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0 if worker_kind == 'gthread' else 1000))
+max_requests_jitter = max_requests // 10
+
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+
+# Heartbeat files on tmpfs; a disk-backed /tmp can stall workers in Docker
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+
+# Per-server scratch space on tmpfs, so two servers on one host never mix
+# their files; removed on exit
+runtime_dir = os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    f'employee-project-{os.getpid()}'
+)
+
+# Set before preload_app imports prometheus_client, which reads it once
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(runtime_dir, 'metrics'))
+
+# Set before preload_app reads the settings. A per-process locmem cache
+# would give every worker its own analytics entries and generations, so
+# a write handled by one worker would stay invisible to the others.
+if workers > 1 and os.environ.get('CACHE_URL', '').startswith('locmemcache:'):
+    raise RuntimeError(
+        f'CACHE_URL is a per-process locmem cache, which {workers} workers cannot '
+        'share; set a shared cache or GUNICORN_WORKERS=1'
+    )
+if workers > 1 and not os.environ.get('CACHE_URL'):
+    os.environ['CACHE_URL'] = f"filecache://{os.path.join(runtime_dir, 'cache')}"
+    print(
+        f'WARNING: CACHE_URL is not set and {workers} workers would each keep a '
+        f'private cache; sharing a file cache in {runtime_dir} instead. '
+        'Set CACHE_URL (e.g. rediscache://host:6379/1) for production.',
+        file=sys.stderr
+    )
+
+
+def on_starting(server):
+    # Samples left by an earlier server would be summed into this one's
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    # Counters and histograms of exited workers keep counting toward the
+    # totals; this drops only their live gauge samples
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    shutil.rmtree(runtime_dir, ignore_errors=True)
+
+
+def pre_fork(server, worker):
+    # Belt and braces for preload_app: never fork with an open connection
+    from django.apps import apps
+    if apps.ready:
+        from django.db import connections
+        connections.close_all()
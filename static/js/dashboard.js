@@ -8,50 +8,56 @@ const colors = [
     '#9966FF', '#FF9F40', '#FF6384', '#C9CBCF'
 ];
 
+// The dashboard payload is loaded once and shared by every widget
+let dashboardData = null;
+
+// Reads the payload embedded in the page, or fetches it once from the API
+function loadDashboard() {
+    if (!dashboardData) {
+        const embedded = document.getElementById('dashboard-data');
+        dashboardData = embedded
+            ? Promise.resolve(JSON.parse(embedded.textContent))
+            : fetch(`${API_BASE}/dashboard/`).then(response => {
+                if (response.status === 401) {
+                    return null;
+                }
+                if (!response.ok) throw new Error('Failed to fetch dashboard');
+                return response.json();
+            });
+    }
+    return dashboardData;
+}
+
 async function initDashboard() {
     try {
-        await Promise.all([
-            loadEmployeeStats(),
-            loadDepartmentChart(),
-            loadPerformanceChart(),
-            loadAttendanceChart(),
-            loadStatusChart()
-        ]);
+        const data = await loadDashboard();
+        if (!data) {
+            showAuthenticationMessage();
+            return;
+        }
+
+        loadEmployeeStats(data);
+        loadDepartmentChart(data);
+        loadPerformanceChart(data);
+        loadAttendanceChart(data);
+        loadStatusChart(data);
     } catch (error) {
         console.error('Error loading dashboard:', error);
         showError();
     }
 }
 
-async function loadEmployeeStats() {
-    try {
-        const response = await fetch(`${API_BASE}/analytics/`);
-        if (!response.ok) {
-            if (response.status === 401) {
-                showAuthenticationMessage();
-                return;
-            }
-            throw new Error('Failed to fetch analytics');
-        }
-        
-        const data = await response.json();
-        
-        document.getElementById('totalEmployees').textContent = data.total_employees || 0;
-        document.getElementById('recentJoiners').textContent = data.recent_joiners || 0;
-        document.getElementById('totalDepartments').textContent = data.department_distribution?.length || 0;
-        
-        document.getElementById('avgAttendance').textContent = '85%';
-    } catch (error) {
-        console.error('Error loading employee stats:', error);
-    }
+function loadEmployeeStats(data) {
+    const stats = data.stats || {};
+
+    document.getElementById('totalEmployees').textContent = stats.total_employees || 0;
+    document.getElementById('recentJoiners').textContent = stats.recent_joiners || 0;
+    document.getElementById('totalDepartments').textContent = stats.total_departments || 0;
+    document.getElementById('avgAttendance').textContent = `${stats.attendance_rate || 0}%`;
 }
 
-async function loadDepartmentChart() {
+function loadDepartmentChart(data) {
     try {
-        const response = await fetch(`${API_BASE}/analytics/`);
-        if (!response.ok) throw new Error('Failed to fetch analytics');
-        
-        const data = await response.json();
         const deptData = data.department_distribution || [];
         
         const ctx = document.getElementById('departmentChart').getContext('2d');
@@ -77,12 +83,8 @@ async function loadDepartmentChart() {
     }
 }
 
-async function loadPerformanceChart() {
+function loadPerformanceChart(data) {
     try {
-        const response = await fetch(`${API_BASE}/analytics/`);
-        if (!response.ok) throw new Error('Failed to fetch analytics');
-        
-        const data = await response.json();
         const perfData = data.performance_distribution || [];
         
         const labels = ['Poor', 'Below Average', 'Average', 'Good', 'Excellent'];
@@ -120,39 +122,17 @@ async function loadPerformanceChart() {
     }
 }
 
-async function loadAttendanceChart() {
+function loadAttendanceChart(data) {
     try {
-        const response = await fetch(`${API_BASE}/analytics/`);
-        
-        if (!response.ok) {
-            // console.log('Analytics failed, creating demo data');
-            // createAttendanceChartWithDemoData();
-            return;
-        }
-        
-        const data = await response.json();
+        // One entry per day of the window, zero-filled by the server
         const dailyData = data.daily_attendance || [];
         
-        // If no daily attendance data, create demo data
-        if (dailyData.length === 0) {
-            // console.log('No daily attendance data, creating demo data');
-            // createAttendanceChartWithDemoData();
-            return;
-        }
-        
-        const labels = [];
-        const attendanceData = [];
-        
-        for (let i = 6; i >= 0; i--) {
-            const date = new Date(Date.now() - i * 24 * 60 * 60 * 1000);
-            const dateStr = date.toISOString().split('T')[0];
-            labels.push(date.toLocaleDateString('en-US', { weekday: 'short', month: 'short', day: 'numeric' }));
-            
-            const dayData = dailyData.find(d => d.date === dateStr);
-            attendanceData.push(dayData ? dayData.count : 0);
-        }
+        const labels = dailyData.map(d => {
+            const date = new Date(`${d.date}T00:00:00`);
+            return date.toLocaleDateString('en-US', { weekday: 'short', month: 'short', day: 'numeric' });
+        });
         
-        createAttendanceChart(labels, attendanceData);
+        createAttendanceChart(labels, dailyData.map(d => d.count));
         
     } catch (error) {
         console.error('Error loading attendance chart:', error);
@@ -202,23 +182,12 @@ function createAttendanceChart(labels, attendanceData) {
 }
 
 // Load the status chart with data
-async function loadStatusChart() {
+function loadStatusChart(data) {
     try {
-        const response = await fetch(`${API_BASE}/analytics/`);
-        
-        if (!response.ok) {
-            // console.log('Analytics failed, creating demo data');
-            // createDemoStatusChart();
-            return;
-        }
-        
-        const data = await response.json();
         const statusData = data.status_distribution || [];
         
-        // If no status data, create demo data
+        // Nothing recorded in the window
         if (statusData.length === 0) {
-            // console.log('No status data, creating demo data');
-            // createDemoStatusChart();
             return;
         }
         
@@ -226,7 +195,6 @@ async function loadStatusChart() {
         
     } catch (error) {
         console.error('Error loading status chart:', error);
-        // createDemoStatusChart();
     }
 }
 